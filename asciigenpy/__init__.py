@@ -1 +0,0 @@
-import asciigenpy.ui.main_window
@@ -1,8 +1,15 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from asciigenpy.ui.main_window import AsciigenPy
 
 def main():
+    # Headless subcommands are dispatched before anything imports PyQt6
+    if len(sys.argv) > 1:
+        from asciigenpy.cli import COMMANDS, main as cli_main
+        if sys.argv[1] in COMMANDS:
+            sys.exit(cli_main(sys.argv[1:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from asciigenpy.ui.main_window import AsciigenPy
+
     app = QApplication(sys.argv)
     
     import qdarktheme
@@ -0,0 +1,294 @@
+"""
+Animations: converts animated GIF/WebP files and numbered image sequences into ASCII animations
+(a folder of text frames, an animated SVG or an animated GIF). Frames flow through generators from
+the decoder to the writers, so only a handful of them are ever in memory whatever the length.
+Identical consecutive frames are merged into one longer frame, and frames are rendered on a
+process pool in order. Qt is only imported for GIF output.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from PIL import Image
+
+from .engine import fit_height, render_state
+from .export import theme_colors, svg_metrics, write_svg_text
+
+ANIMATION_FORMATS = ("txt", "svg", "gif")
+# SVG layouts animations support, glyph outlines ("symbols") are per document
+ANIMATION_SVG_MODES = ("plain", "compact")
+DEFAULT_FPS = 12
+# Frames queued per worker process, bounds the frames in flight
+_FRAMES_PER_WORKER = 2
+
+_FRAME_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+# printf style frame number, e.g. frame_%04d.png
+_PRINTF_NUMBER = re.compile(r"%(0?\d+)?d")
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _natural_key(path):
+    """Sort key ordering frame2 before frame10."""
+    return [int(part) if part.isdigit() else part for part in _DIGITS.split(path)]
+
+
+def sequence_paths(source):
+    """
+    Frame files of an image sequence given as a directory, a glob or a printf pattern
+    (frames/img_%04d.png), in frame number order. None when source is a single file.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, f) for f in os.listdir(source) if f.lower().endswith(_FRAME_EXTENSIONS)]
+    elif _PRINTF_NUMBER.search(source):
+        parts = _PRINTF_NUMBER.split(source)
+        # split() interleaves the optional width groups, only the literal parts are kept
+        literals = parts[::2]
+        pattern = re.compile("\\d+".join(re.escape(p) for p in literals) + "$")
+        paths = [p for p in glob.glob("*".join(glob.escape(p) for p in literals)) if pattern.match(p)]
+    elif glob.has_magic(source):
+        paths = [p for p in glob.glob(source) if os.path.isfile(p)]
+    else:
+        return None
+    return sorted(paths, key=_natural_key)
+
+
+def animation_stem(source):
+    """Output file name stem for an animation source."""
+    source = os.path.normpath(source)
+    if os.path.isdir(source):
+        return os.path.basename(source)
+    name = os.path.basename(source)
+    if sequence_paths(source) is not None:
+        name = _PRINTF_NUMBER.sub("", name)
+        name = re.sub(r"[*?\[\]]", "", os.path.splitext(name)[0]).strip("_-. ")
+        return name or os.path.basename(os.path.dirname(os.path.abspath(source))) or "animation"
+    return os.path.splitext(name)[0]
+
+
+def read_frames(source, fps=DEFAULT_FPS):
+    """
+    Yields (RGB image, duration in ms) for every frame of an animated image, or for every file of
+    an image sequence (see sequence_paths). One frame is decoded at a time. fps sets the duration
+    of sequence frames and of animation frames that store none.
+    """
+    default = max(1, round(1000 / fps))
+    paths = sequence_paths(source)
+    if paths is None:
+        with Image.open(source) as img:
+            for i in range(getattr(img, "n_frames", 1)):
+                img.seek(i)
+                yield img.convert("RGB"), img.info.get("duration") or default
+        return
+    if not paths:
+        raise ValueError(f"No frames found for {source}")
+    for path in paths:
+        with Image.open(path) as img:
+            yield img.convert("RGB"), default
+
+
+def dedup_frames(frames):
+    """Merges identical consecutive (image, duration) frames into one lasting as long as all of them."""
+    last, last_digest = None, None
+    for img, duration in frames:
+        digest = (img.size, hashlib.blake2b(img.tobytes(), digest_size=16).digest())
+        if digest == last_digest:
+            last[1] += duration
+            continue
+        if last:
+            yield tuple(last)
+        last, last_digest = [img, duration], digest
+    if last:
+        yield tuple(last)
+
+
+def _merge_repeats(frames):
+    last = None
+    for text, duration in frames:
+        if last and last[0] == text:
+            last[1] += duration
+            continue
+        if last:
+            yield tuple(last)
+        last = [text, duration]
+    if last:
+        yield tuple(last)
+
+
+def _render_in_pool(frames, state, jobs):
+    # Futures are consumed in submission order, so frames come out in order. At most
+    # jobs * _FRAMES_PER_WORKER of them are pickled over to the pool or waiting for it
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for img, duration in frames:
+            pending.append((pool.submit(render_state, img, state), duration))
+            if len(pending) >= jobs * _FRAMES_PER_WORKER:
+                future, duration = pending.popleft()
+                yield future.result(), duration
+        while pending:
+            future, duration = pending.popleft()
+            yield future.result(), duration
+
+
+def render_frames(frames, state, jobs=None):
+    """
+    Renders (image, duration) frames with render_state, yielding (text, duration) in frame order.
+    Runs on jobs worker processes (default: CPU count, 1 renders in this process). The grid size
+    is fitted to the first frame so every frame of the animation shares it. Frames that render to
+    the same text as the previous one are merged into it.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return
+    state = dict(state)
+    if state.get("keep_aspect", True):
+        state["height"] = fit_height(state["width"], *first[0].size)
+    frames = chain([first], frames)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        rendered = ((render_state(img, state), duration) for img, duration in frames)
+    else:
+        rendered = _render_in_pool(frames, state, jobs)
+    yield from _merge_repeats(rendered)
+
+
+class TxtFramesWriter:
+    """Writes every frame as frame_00001.txt ... into a directory, plus a timeline.json of file names and durations."""
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.timeline = []
+
+    def add_frame(self, text, duration):
+        name = f"frame_{len(self.timeline) + 1:05d}.txt"
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.timeline.append({"file": name, "duration": duration})
+
+    def close(self):
+        with open(os.path.join(self.directory, "timeline.json"), 'w', encoding='utf-8') as f:
+            json.dump({"frames": self.timeline}, f, indent=1)
+
+    def discard(self):
+        """Removes the frames written so far, after a failure."""
+        for entry in self.timeline:
+            os.remove(os.path.join(self.directory, entry["file"]))
+        if not os.listdir(self.directory):
+            os.rmdir(self.directory)
+
+
+class SvgAnimationWriter:
+    """
+    Streams an animated SVG: each frame is a hidden <g> a SMIL <set> shows for its duration, chained
+    to the end of the previous one and looping forever. Frames are written one behind, since the
+    first one can only reference the last once it is known.
+    """
+    def __init__(self, path, font_family, font_size, is_inverted, mode="plain"):
+        if mode not in ANIMATION_SVG_MODES:
+            raise ValueError(f"SVG mode {mode} is not supported for animations")
+        self.font_family = font_family
+        self.font_size = font_size
+        self.mode = mode
+        self.bg_hex, self.t_color = theme_colors(is_inverted)
+        self.f = open(path, 'w', encoding='utf-8')
+        self.count = 0
+        self._pending = None
+
+    def add_frame(self, text, duration):
+        if self._pending:
+            self._write(*self._pending, last=False)
+        self._pending = (text, duration)
+
+    def _write(self, text, duration, last):
+        f = self.f
+        if self.count == 0:
+            _, _, doc_w, doc_h = svg_metrics(text, self.font_size)
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {doc_w} {doc_h}" width="{doc_w}" height="{doc_h}">')
+            f.write(f'\n  <rect width="100%" height="100%" fill="{self.bg_hex}"/>')
+        if self.count == 0 and last:
+            # A single frame is just a still
+            f.write('\n  <g>')
+        else:
+            frame_id = "last" if last else f"f{self.count}"
+            begin = "0s;last.end" if self.count == 0 else f"f{self.count - 1}.end"
+            f.write(f'\n  <g visibility="hidden">')
+            f.write(f'\n    <set id="{frame_id}" attributeName="visibility" to="visible" begin="{begin}" dur="{duration}ms"/>')
+        write_svg_text(f, text, self.font_family, self.font_size, self.t_color, self.mode, indent="    ")
+        f.write('\n  </g>')
+        self.count += 1
+
+    def close(self):
+        if self._pending:
+            self._write(*self._pending, last=True)
+        self.f.write('\n</svg>')
+        self.f.close()
+
+    def discard(self):
+        self.f.close()
+        os.remove(self.f.name)
+
+
+class GifAnimationWriter:
+    """
+    Streams an animated, looping grayscale GIF. Frames are rasterized from a glyph atlas shared by
+    all of them (like write_png) and encoded one at a time, durations are rounded to 10 ms.
+    """
+    def __init__(self, path, font, font_size, is_inverted):
+        from .export import _ensure_qt_app, make_font
+        _ensure_qt_app()
+        from PyQt6.QtGui import QFont
+        from .glyphs import GlyphAtlas, coverage_lut, hex_to_rgb
+
+        font = make_font(font) if isinstance(font, str) else QFont(font)
+        font.setPointSize(font_size)
+        self.atlas = GlyphAtlas(font)
+        bg_hex, t_color = theme_colors(is_inverted)
+        # The workspace themes are black and white, so coverage maps straight to gray levels
+        self.gray = coverage_lut(hex_to_rgb(bg_hex), hex_to_rgb(t_color))[:, 0]
+        self.f = open(path, 'wb')
+        self.count = 0
+
+    def _rasterize(self, text):
+        import numpy as np
+        from .export import png_canvas_size
+        from .glyphs import text_to_codes
+
+        atlas = self.atlas
+        cw, ch = atlas.cell_width, atlas.cell_height
+        width, height = png_canvas_size(text, cw, ch)
+        codes = text_to_codes(text)
+        slots = atlas.slots(codes)
+        rows, cols = codes.shape
+        pixels = np.full((height, width), self.gray[0], dtype=np.uint8)
+        if cols:
+            # Centered in the spare cell around the grid, like write_png
+            x0, y0 = cw // 2, ch // 2
+            atlas.compose_rows_into(pixels[y0:y0 + rows * ch, x0:x0 + cols * cw], slots, 0, self.gray[atlas.masks])
+        return Image.fromarray(pixels, "L")
+
+    def add_frame(self, text, duration):
+        from PIL import GifImagePlugin
+
+        frame = self._rasterize(text)
+        if self.count == 0:
+            header, _ = GifImagePlugin.getheader(frame.copy(), info={"loop": 0})
+            for block in header:
+                self.f.write(block)
+        for block in GifImagePlugin.getdata(frame, duration=duration):
+            self.f.write(block)
+        self.count += 1
+
+    def close(self):
+        # Trailer
+        self.f.write(b";")
+        self.f.close()
+
+    def discard(self):
+        self.f.close()
+        os.remove(self.f.name)
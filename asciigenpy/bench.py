@@ -0,0 +1,310 @@
+"""
+Benchmark Suite: `python -m asciigenpy bench` times every stage of the generation pipeline on
+synthetic images and reports median/p95 timings plus peak memory as JSON, so runs can be
+compared between commits. Qt stages (output widgets, PNG export) are skipped when PyQt6 is unavailable.
+"""
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from . import engine, export
+from .dither import DITHER_MODES, DRAFT_MODE, dither
+
+DEFAULT_SIZES = "1,10,100"
+DEFAULT_GRIDS = "20x10,120x60,600x300"
+DEFAULT_CHARSETS = "standard,detailed,blocks"
+
+# Median ms a Braille resolution dither may take. The draft mode renders on every debounced edit
+# (35 ms), error diffusion only once the input settles
+DITHER_BUDGET_MS = 35
+DIFFUSION_BUDGET_MS = 100
+
+CHARSETS = {
+    "standard": engine.CHARSET_PRESETS["Standard (10 chars)"],
+    "detailed": engine.CHARSET_PRESETS["Detailed (70 chars)"],
+    "blocks": engine.CHARSET_PRESETS["Blocks"],
+}
+
+
+def synthetic_image(megapixels, seed=0):
+    """Deterministic 3:2 test image mixing smooth gradients (banding) with noise (detail)."""
+    w = int(round(math.sqrt(megapixels * 1e6 * 1.5)))
+    h = int(round(w / 1.5))
+    rng = np.random.default_rng(seed)
+    img = np.empty((h, w, 3), dtype=np.uint8)
+    xs = np.linspace(0, 255, w, dtype=np.float32)
+    # Filled row by row to keep the temporary float arrays small on 100 MP images
+    for y0 in range(0, h, 512):
+        y1 = min(h, y0 + 512)
+        ys = np.linspace(y0 / h * 255, y1 / h * 255, y1 - y0, endpoint=False, dtype=np.float32)[:, None]
+        noise = rng.integers(0, 48, (y1 - y0, w, 3), dtype=np.uint8)
+        img[y0:y1, :, 0] = (xs[None, :] * 0.8 + noise[..., 0]).astype(np.uint8)
+        img[y0:y1, :, 1] = ((xs[None, :] + ys) * 0.4 + noise[..., 1]).astype(np.uint8)
+        img[y0:y1, :, 2] = (ys * 0.8 + noise[..., 2]).astype(np.uint8)
+    return Image.fromarray(img, "RGB")
+
+
+def _proc_status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise OSError(field)
+
+
+def _can_reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        _proc_status_kb("VmHWM")
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory(fn):
+    """
+    Runs fn once and returns (result, peak bytes it added, method). On Linux the kernel's RSS
+    high-water mark is reset first, which also sees Pillow's native allocations. Elsewhere
+    tracemalloc is used, which only sees Python and NumPy memory.
+    """
+    if _can_reset_peak_rss():
+        before = _proc_status_kb("VmRSS")
+        result = fn()
+        return result, max(0, _proc_status_kb("VmHWM") - before) * 1024, "rss_hwm"
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1], "tracemalloc"
+    finally:
+        tracemalloc.stop()
+
+
+def _percentile(samples, q):
+    return float(np.percentile(np.asarray(samples), q))
+
+
+class _Recorder:
+    def __init__(self, repeat, measure_memory):
+        self.repeat = repeat
+        self.measure_memory = measure_memory
+        self.results = []
+
+    def time(self, stage, fn, budget_ms=None, **labels):
+        """
+        Runs fn once to measure its peak memory, then `repeat` more times for timings. Entries with
+        a budget_ms record whether their median went over it.
+        """
+        peak = method = None
+        if self.measure_memory:
+            _, peak, method = peak_memory(fn)
+
+        samples = []
+        result = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = fn()
+            samples.append((time.perf_counter() - start) * 1000.0)
+
+        entry = {"stage": stage}
+        entry.update(labels)
+        entry.update({
+            "runs": len(samples),
+            "median_ms": round(statistics.median(samples), 4),
+            "p95_ms": round(_percentile(samples, 95), 4),
+            "min_ms": round(min(samples), 4),
+            "peak_bytes": peak,
+            "memory_method": method,
+        })
+        if budget_ms is not None:
+            entry["budget_ms"] = budget_ms
+            entry["over_budget"] = entry["median_ms"] > budget_ms
+        self.results.append(entry)
+        return result
+
+    def skip(self, stage, reason, **labels):
+        entry = {"stage": stage}
+        entry.update(labels)
+        entry["skipped"] = reason
+        self.results.append(entry)
+
+
+def _qt_widgets():
+    """
+    Builds the two output widgets (the old QTextEdit and the workspace GlyphGridView) once an
+    (offscreen) QApplication exists. Returns None without PyQt6.
+    """
+    try:
+        from PyQt6.QtWidgets import QApplication, QTextEdit
+    except ImportError:
+        return None
+    if QApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _qt_widgets.app = QApplication([])
+    from .ui.glyph_grid import GlyphGridView
+
+    font = export.make_font("Consolas")
+    font.setPointSize(8)
+    text_edit = QTextEdit()
+    text_edit.setFont(font)
+    text_edit.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+    grid = GlyphGridView()
+    grid.setFont(font)
+    for widget in (text_edit, grid):
+        widget.resize(1100, 750)
+        widget.show()
+    return text_edit, grid
+
+
+def _max_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_suite(sizes, grids, charsets, repeat=5, use_qt=True, measure_memory=True, font_size=12, log=None):
+    rec = _Recorder(repeat, measure_memory)
+    widgets = _qt_widgets() if use_qt else None
+    text_edit, grid_view = widgets or (None, None)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for mp in sizes:
+            if log:
+                log(f"{mp} MP ...")
+            source = synthetic_image(mp)
+            buf = io.BytesIO()
+            source.save(buf, "JPEG", quality=90)
+            encoded = buf.getvalue()
+            del source
+            size = {"size_mp": mp}
+
+            img = rec.time("decode", lambda: Image.open(io.BytesIO(encoded)).convert("RGB"), **size)
+            size["pixels"] = img.width * img.height
+
+            mean = rec.time("contrast_mean", lambda: engine.contrast_mean(img), **size)
+            lut = engine.tone_lut(mean, 1.2, 1.1, False, True)
+            toned = rec.time("tone", lambda: engine.apply_tone(img, lut), **size)
+            del img
+
+            box = (toned.width // 4, toned.height // 4, toned.width * 3 // 4, toned.height * 3 // 4)
+            cropped = rec.time("crop", lambda: toned.crop(box), **size)
+            del toned
+
+            for gw, gh in grids:
+                grid = dict(size, grid=f"{gw}x{gh}")
+                resized = rec.time("resize", lambda: cropped.resize((gw, gh), Image.Resampling.LANCZOS), **grid)
+                lum = engine.to_luminance(resized)
+
+                for name in charsets:
+                    labels = dict(grid, charset=name)
+                    chars = CHARSETS[name]
+                    text = rec.time("char_map", lambda: engine.map_luminance(lum, chars), **labels)
+                    if text_edit:
+                        # Both include painting a full viewport, like a frame in the workspace
+                        rec.time("qtextedit_set", lambda: (text_edit.setPlainText(text), text_edit.viewport().repaint()), **labels)
+                        rec.time("grid_set", lambda: (grid_view.setPlainText(text), grid_view.viewport().repaint()), **labels)
+                    else:
+                        rec.skip("qtextedit_set", "PyQt6 unavailable", **labels)
+                        rec.skip("grid_set", "PyQt6 unavailable", **labels)
+
+                levels = len(CHARSETS[charsets[0]])
+                for method in DITHER_MODES[1:]:
+                    rec.time("dither", lambda: dither(lum, method, levels), **dict(grid, charset=charsets[0], method=method))
+                # Braille samples 2x4 dots per cell, the largest grid a dither runs on
+                dots = engine.to_luminance(cropped.resize((gw * 2, gh * 4), Image.Resampling.LANCZOS))
+                for method in DITHER_MODES[1:]:
+                    budget = DITHER_BUDGET_MS if method == DRAFT_MODE else DIFFUSION_BUDGET_MS
+                    rec.time("dither", lambda: dither(dots, method, 2), budget_ms=budget,
+                             **dict(grid, render_mode="braille", method=method))
+
+                text = engine.map_luminance(lum, CHARSETS[charsets[0]])
+                labels = dict(grid, charset=charsets[0], font_size=font_size)
+                svg_path = os.path.join(tmpdir, "bench.svg")
+                rec.time("export_svg", lambda: export.write_svg(svg_path, text, "Consolas", font_size, False), **labels)
+                if text_edit:
+                    png_path = os.path.join(tmpdir, "bench.png")
+                    rec.time("export_png", lambda: export.write_png(png_path, text, "Consolas", font_size, False), **labels)
+                else:
+                    rec.skip("export_png", "PyQt6 unavailable", **labels)
+            del cropped
+
+    return rec.results
+
+
+def _parse_grids(text):
+    grids = []
+    for item in text.split(","):
+        w, h = item.lower().split("x")
+        grids.append((int(w), int(h)))
+    return grids
+
+
+def run_bench(args):
+    sizes = [float(s) if "." in s else int(s) for s in args.sizes.split(",")]
+    grids = _parse_grids(args.grids)
+    charsets = [c.strip() for c in args.charsets.split(",")]
+    unknown = [c for c in charsets if c not in CHARSETS]
+    if unknown:
+        print(f"Unknown charset(s): {', '.join(unknown)} (choose from {', '.join(CHARSETS)})", file=sys.stderr)
+        return 2
+
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+    results = run_suite(sizes, grids, charsets, repeat=args.repeat, use_qt=not args.no_qt,
+                        measure_memory=not args.no_memory, font_size=args.font_size, log=log)
+    import PIL
+    report = {
+        "label": args.label,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pillow": PIL.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+        },
+        "max_rss_bytes": _max_rss_bytes(),
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    over = [r for r in results if r.get("over_budget")]
+    for r in over:
+        print(f"Over budget: {r['stage']} {r.get('method', '')} {r['grid']} on {r['size_mp']} MP, "
+              f"{r['median_ms']} ms > {r['budget_ms']} ms", file=sys.stderr)
+    return 1 if over and args.check else 0
+
+
+def add_parser(sub):
+    bench = sub.add_parser("bench", help="Benchmark every stage of the generation pipeline.")
+    bench.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Synthetic image sizes in megapixels (default: {DEFAULT_SIZES}).")
+    bench.add_argument("--grids", default=DEFAULT_GRIDS, help=f"Output grids as WxH (default: {DEFAULT_GRIDS}).")
+    bench.add_argument("--charsets", default=DEFAULT_CHARSETS, help=f"Charsets to map with (default: {DEFAULT_CHARSETS}).")
+    bench.add_argument("-n", "--repeat", type=int, default=5, help="Timed runs per stage (default: 5).")
+    bench.add_argument("--font-size", type=int, default=12, help="Font size for export stages.")
+    bench.add_argument("--no-qt", action="store_true", help="Skip the output widget and PNG stages.")
+    bench.add_argument("--no-memory", action="store_true", help="Only skip peak memory tracking (the extra untimed run per stage under the RSS "
+                       "high-water mark or tracemalloc), every stage is still timed.")
+    bench.add_argument("--label", default=None, help="Free-form label stored in the report, e.g. a commit hash.")
+    bench.add_argument("-o", "--output", help="Write the JSON report to a file instead of stdout.")
+    bench.add_argument("--check", action="store_true", help="Exit with status 1 when a stage goes over its time budget.")
+    bench.add_argument("-q", "--quiet", action="store_true", help="Don't print progress to stderr.")
+    bench.set_defaults(func=run_bench)
+    return bench
@@ -0,0 +1,324 @@
+"""
+Headless command line interface: `python -m asciigenpy convert ...` batch converts images
+over a process pool without starting the GUI, `animate` converts animations and image sequences.
+PyQt6 is only imported for PNG and GIF output, outlined SVGs and the structure mode.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .engine import CHARSET_PRESETS, RENDER_MODES, SourceImage, fit_height, render_state, text_state
+from .export import SVG_MODES
+from .color import COLOR_MODES, render_colors
+from .dither import DITHER_MODES
+from .render_cache import RenderCache, cache_key, DEFAULT_MAX_MB
+from .animation import (ANIMATION_FORMATS, ANIMATION_SVG_MODES, DEFAULT_FPS, animation_stem, read_frames,
+                        dedup_frames, render_frames, TxtFramesWriter, SvgAnimationWriter, GifAnimationWriter)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+FORMATS = ("txt", "svg", "png", "ans", "html")
+
+# Short names for the GUI charset presets, e.g. "Standard (10 chars)" -> "standard"
+PRESET_NAMES = {name.split()[0].lower(): chars for name, chars in CHARSET_PRESETS.items()}
+
+
+def load_project_state(path):
+    """Reads the serialize_state() dict stored in an .agp project's config.json."""
+    with zipfile.ZipFile(path, 'r') as zf:
+        if 'config.json' not in zf.namelist():
+            raise ValueError(f"Invalid .agp project format: {path}")
+        return json.loads(zf.read('config.json'))
+
+
+def expand_inputs(patterns, recursive=False):
+    """Resolves files, glob patterns and directories into a de-duplicated, ordered list of image paths."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                found = [os.path.join(root, f) for root, _, files in os.walk(pattern) for f in files]
+            else:
+                found = [os.path.join(pattern, f) for f in os.listdir(pattern)]
+            paths.extend(sorted(p for p in found if p.lower().endswith(IMAGE_EXTENSIONS)))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(p for p in glob.glob(pattern, recursive=recursive) if os.path.isfile(p)))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def build_state(args):
+    """Merges project config and command line options into a serialize_state() style dict."""
+    state = {
+        "contrast": 10,
+        "brightness": 10,
+        "width": 120,
+        "height": 60,
+        "keep_aspect": True,
+        "charset": CHARSET_PRESETS["Standard (10 chars)"],
+        "sampling": "lanczos",
+        "render_mode": "ramp",
+        "color_mode": "none",
+        "dither": "none",
+        "invert": False,
+    }
+    if args.project:
+        state.update(load_project_state(args.project))
+    # Crop settings belong to the project's own image, they don't carry over to other files
+    for key in ("crop_x", "crop_y", "crop_w", "crop_h"):
+        state.pop(key, None)
+
+    if args.width is not None:
+        state["width"] = args.width
+    if args.height is not None:
+        state["height"] = args.height
+        state["keep_aspect"] = False
+    if args.preset is not None:
+        state["charset"] = PRESET_NAMES[args.preset]
+    if args.charset is not None:
+        state["charset"] = args.charset
+    if args.contrast is not None:
+        state["contrast"] = round(args.contrast * 10)
+    if args.brightness is not None:
+        state["brightness"] = round(args.brightness * 10)
+    if args.sampling is not None:
+        state["sampling"] = args.sampling
+    if args.mode is not None:
+        state["render_mode"] = args.mode
+    if args.dither is not None:
+        state["dither"] = args.dither
+    if getattr(args, "color", None) is not None:
+        state["color_mode"] = args.color
+    if args.invert is not None:
+        state["invert"] = args.invert
+    # Glyphs the structure mode matches against, same font the outputs are drawn in
+    state["font_family"] = args.font_family
+    return state
+
+
+# Per-process job settings, set once by the pool initializer
+_job = {}
+
+
+def _init_worker(state, formats, output_dir, font_family, font_size, svg_mode, cache_mb=None):
+    _job.update(state=state, formats=formats, output_dir=output_dir,
+                font_family=font_family, font_size=font_size, svg_mode=svg_mode,
+                cache=RenderCache(max_bytes=cache_mb * 1024 * 1024) if cache_mb else None)
+
+
+def convert_file(path):
+    """
+    Renders one image (or takes its grid from the render cache) and writes every requested format.
+    Returns the written paths and whether the grid was a cache hit (None with the cache disabled).
+    """
+    from . import export
+
+    state = dict(_job["state"])
+    # Only the header is read here, pixels are decoded on a cache miss
+    source = SourceImage.open(path)
+    if state.get("keep_aspect", True):
+        state["height"] = fit_height(state["width"], source.width, source.height)
+
+    cache = _job.get("cache")
+    # Only the text is cached, colors are averaged again from the source
+    key = cache_key("convert", source.digest, text_state(state)) if cache else None
+    ascii_text = cache.get_grid(key) if cache else None
+    hit = ascii_text is not None if cache else None
+    if ascii_text is None:
+        ascii_text = render_state(source.full(), state, source.contrast_mean(state["invert"]))
+        if cache:
+            cache.put_grid(key, ascii_text)
+    # Monochrome hits never decode the pixels
+    if state.get("color_mode", "none") != "none":
+        colors = render_colors(source.full(), state, source.contrast_mean(state["invert"]))
+    else:
+        colors = None
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    written = []
+    for fmt in _job["formats"]:
+        out_path = os.path.join(_job["output_dir"], f"{stem}.{fmt}")
+        if fmt == "txt":
+            export.write_txt(out_path, ascii_text)
+        elif fmt == "ans":
+            export.write_ansi(out_path, ascii_text, colors)
+        elif fmt == "html":
+            export.write_html(out_path, ascii_text, colors, _job["font_family"], _job["font_size"], state["invert"])
+        elif fmt == "svg":
+            export.write_svg(out_path, ascii_text, _job["font_family"], _job["font_size"], state["invert"], _job["svg_mode"], colors=colors)
+        elif fmt == "png":
+            export.write_png(out_path, ascii_text, _job["font_family"], _job["font_size"], state["invert"], colors=colors)
+        written.append(out_path)
+    return written, hit
+
+
+def _convert_safely(path):
+    try:
+        return (path, *convert_file(path), None)
+    except Exception as e:
+        return path, [], None, str(e) or e.__class__.__name__
+
+
+def run_convert(args):
+    formats = [f.strip().lstrip(".").lower() for f in args.format.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        print(f"Unknown output format(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    paths = expand_inputs(args.inputs, args.recursive)
+    if not paths:
+        print("No input images found.", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+
+    state = build_state(args)
+    cache_mb = None if args.no_cache else args.cache_mb
+    init_args = (state, formats, args.output, args.font_family, args.font_size, args.svg_mode, cache_mb)
+    failed = 0
+    done = 0
+    hits = misses = 0
+
+    # Results are streamed as each worker finishes, every file is decoded exactly once inside its worker
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=init_args) as pool:
+        futures = [pool.submit(_convert_safely, p) for p in paths]
+        for future in as_completed(futures):
+            path, written, hit, error = future.result()
+            done += 1
+            if hit is not None:
+                hits += hit
+                misses += not hit
+            if error:
+                failed += 1
+                print(f"[{done}/{len(paths)}] FAILED {path}: {error}", file=sys.stderr)
+            elif not args.quiet:
+                print(f"[{done}/{len(paths)}] {path} -> {', '.join(os.path.basename(w) for w in written)}")
+
+    if cache_mb and not args.quiet:
+        print(f"Render cache: {hits} hits, {misses} misses")
+    if failed:
+        print(f"{failed} of {len(paths)} images failed.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_animate(args):
+    formats = [f.strip().lstrip(".").lower() for f in args.format.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in ANIMATION_FORMATS]
+    if unknown:
+        print(f"Unknown output format(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+
+    state = build_state(args)
+    stem = os.path.join(args.output, animation_stem(args.input))
+    counts = {"in": 0, "out": 0}
+
+    def count(frames, key):
+        for frame in frames:
+            counts[key] += 1
+            yield frame
+
+    writers = []
+    try:
+        for fmt in formats:
+            if fmt == "txt":
+                writers.append(TxtFramesWriter(stem))
+            elif fmt == "svg":
+                writers.append(SvgAnimationWriter(f"{stem}.svg", args.font_family, args.font_size, state["invert"], args.svg_mode))
+            elif fmt == "gif":
+                writers.append(GifAnimationWriter(f"{stem}.gif", args.font_family, args.font_size, state["invert"]))
+        # Decode -> dedup -> render (in order, on the pool) -> write, one frame after another
+        frames = dedup_frames(count(read_frames(args.input, args.fps), "in"))
+        for text, duration in count(render_frames(frames, state, args.jobs), "out"):
+            for writer in writers:
+                writer.add_frame(text, duration)
+        if not counts["out"]:
+            raise ValueError("No frames to convert")
+    except Exception as e:
+        # Half written animations are removed, like failed GUI exports
+        for writer in writers:
+            writer.discard()
+        print(f"FAILED {args.input}: {str(e) or e.__class__.__name__}", file=sys.stderr)
+        return 1
+    for writer in writers:
+        writer.close()
+
+    if not args.quiet:
+        print(f"{args.input}: {counts['in']} frames, {counts['out']} after merging repeats -> "
+              f"{', '.join(os.path.basename(stem) + ('/' if f == 'txt' else f'.{f}') for f in formats)}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="asciigenpy", description="AsciigenPy headless tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="Batch convert images to ASCII art.")
+    conv.add_argument("inputs", nargs="+", help="Image files, glob patterns or directories.")
+    conv.add_argument("-o", "--output", required=True, help="Output directory.")
+    conv.add_argument("-f", "--format", default="txt",
+                      help="Comma separated output formats: txt, svg, png, ans (ANSI escapes), html (default: txt).")
+    conv.add_argument("-r", "--recursive", action="store_true", help="Recurse into directories and ** globs.")
+    _add_render_arguments(conv)
+    conv.add_argument("--color", choices=COLOR_MODES,
+                      help="Tint every character with its cell's average color, as 24-bit truecolor, 18-bit truecolor "
+                           "(fewer escape sequences, some banding) or the nearest of the 256 or 16 xterm colors.")
+    conv.add_argument("--svg-mode", choices=SVG_MODES, default="plain",
+                      help="SVG layout: plain text, compact (space runs as dx offsets) or symbols (outlined glyphs placed with <use>).")
+    conv.add_argument("--cache-mb", type=int, default=DEFAULT_MAX_MB,
+                      help=f"Size limit of the render cache shared with the GUI, in MB (default: {DEFAULT_MAX_MB}).")
+    conv.add_argument("--no-cache", action="store_true", help="Don't read or write the render cache.")
+    conv.add_argument("-q", "--quiet", action="store_true", help="Only report failures.")
+    conv.set_defaults(func=run_convert)
+
+    anim = sub.add_parser("animate", help="Convert an animated GIF/WebP or an image sequence to an ASCII animation.")
+    anim.add_argument("input", help="Animated GIF/WebP, a directory of numbered frames, a glob or a printf pattern like frames/img_%%04d.png.")
+    anim.add_argument("-o", "--output", required=True, help="Output directory.")
+    anim.add_argument("-f", "--format", default="gif",
+                      help="Comma separated output formats: txt (a folder of frames plus timeline.json), svg, gif (default: gif).")
+    anim.add_argument("--fps", type=float, default=DEFAULT_FPS,
+                      help=f"Frame rate of image sequences and of frames without a stored duration (default: {DEFAULT_FPS}).")
+    _add_render_arguments(anim)
+    anim.add_argument("--svg-mode", choices=ANIMATION_SVG_MODES, default="plain",
+                      help="SVG layout: plain text or compact (space runs as dx offsets).")
+    anim.add_argument("-q", "--quiet", action="store_true", help="Only report failures.")
+    anim.set_defaults(func=run_animate)
+
+    from .bench import add_parser as add_bench_parser
+    add_bench_parser(sub)
+    return parser
+
+
+def _add_render_arguments(parser):
+    """Render settings and fonts shared by convert and animate."""
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("-p", "--project", help="Load settings from an existing .agp project's config.json.")
+    parser.add_argument("-W", "--width", type=int, help="Output width in characters.")
+    parser.add_argument("-H", "--height", type=int, help="Output height in characters (disables aspect fitting).")
+    parser.add_argument("--preset", choices=sorted(PRESET_NAMES), help="Charset preset.")
+    parser.add_argument("--charset", help="Custom charset ramp, from light to dark areas.")
+    parser.add_argument("--contrast", type=float, help="Contrast factor (1.0 = unchanged).")
+    parser.add_argument("--brightness", type=float, help="Brightness factor (1.0 = unchanged).")
+    parser.add_argument("--sampling", choices=("lanczos", "area"), help="Resampling mode.")
+    parser.add_argument("--mode", choices=RENDER_MODES,
+                        help="Render mode: ramp (charset by luminance), braille (2x4 dots per character), halfblock "
+                             "(two square pixels per character, with fg/bg colors under --color) or structure "
+                             "(charset glyph of the closest shape in --font-family).")
+    parser.add_argument("--dither", choices=DITHER_MODES,
+                        help="Dither the luminance down to the levels the mode can show before mapping (default: none).")
+    parser.add_argument("--invert", dest="invert", action="store_const", const=True, default=None, help="Invert the ASCII calculation.")
+    parser.add_argument("--no-invert", dest="invert", action="store_const", const=False, help="Don't invert, even if the project does.")
+    parser.add_argument("--font-family", default="Consolas", help="Font family for SVG, PNG and GIF output.")
+    parser.add_argument("--font-size", type=int, default=12, help="Font size for SVG, PNG and GIF output.")
+
+
+COMMANDS = ("convert", "animate", "bench")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
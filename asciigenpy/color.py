@@ -0,0 +1,244 @@
+"""
+Cell Colors: keeps the average color behind every character cell and quantizes it for output.
+Truecolor keeps the full 24 bits, its compact variant 6 bits per channel so near-identical
+neighbours share runs. The 256 and 16 color modes map every color to the nearest xterm palette
+entry through a lookup table precomputed over 15-bit RGB. Runs of cells sharing a color are coalesced so ANSI, HTML and SVG output emit one escape sequence or span per run.
+Half-block cells carry a (foreground, background) color pair, their runs share both.
+"""
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+# "none" keeps the monochrome theme colors
+COLOR_MODES = ("none", "truecolor", "truecolor-18", "256", "16")
+
+# Low bits dropped from every channel per truecolor mode. The 18-bit one trades smooth gradients for
+# longer runs, i.e. smaller ANSI and HTML output
+_TRUECOLOR_DROP = {"truecolor": 0, "truecolor-18": 2}
+# Channel bits of the palette lookup tables (32768 entries)
+_LUT_BITS = 5
+
+# xterm's default system colors
+_ANSI_16 = [
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0), (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0), (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+]
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+# Cells without ink, their foreground color never shows
+_BLANKS = (ord(" "), 0x2800)
+
+
+def xterm_palette():
+    """The 256 xterm colors as a (256, 3) uint8 array: system colors, 6x6x6 cube, gray ramp."""
+    cube = [(r, g, b) for r in _CUBE_LEVELS for g in _CUBE_LEVELS for b in _CUBE_LEVELS]
+    grays = [(v, v, v) for v in range(8, 248, 10)]
+    return np.array(_ANSI_16 + cube + grays, dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def palette_lut(mode):
+    """
+    Nearest palette index for every 15-bit RGB color, as a read-only (32768,) uint8 table.
+    The 256 color mode only picks from the cube and gray ramp: terminals theme the system colors.
+    """
+    palette = xterm_palette()[:16] if mode == "16" else xterm_palette()
+    first = 0 if mode == "16" else 16
+    candidates = palette[first:].astype(np.float32)
+
+    levels = np.arange(1 << _LUT_BITS, dtype=np.float32) * 255 / ((1 << _LUT_BITS) - 1)
+    r, g, b = np.meshgrid(levels, levels, levels, indexing="ij")
+    colors = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+    # |c - p|^2 without the |c|^2 term, which is the same for every candidate
+    dist = (candidates ** 2).sum(axis=1)[None, :] - 2 * colors @ candidates.T
+    lut = (dist.argmin(axis=1) + first).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def render_colors(img, state, mean=None):
+    """
+    Headless counterpart of render_state for colors: the quantized average color of every cell of
+    the state's grid, toned like the preview (no ascii inversion). None in the "none" color mode.
+    mean is the contrast pivot like in render_state.
+    """
+    from .engine import apply_tone, contrast_mean, tone_lut
+
+    mode = state.get("color_mode", "none")
+    if mode == "none":
+        return None
+    invert = state.get("invert", False)
+    if mean is None:
+        mean = contrast_mean(img, invert)
+    lut = tone_lut(mean, state.get("contrast", 10) / 10.0, state.get("brightness", 10) / 10.0, invert)
+    return grid_colors(apply_tone(img, lut), state, state.get("crop_box"))
+
+
+def grid_colors(img, state, box=None):
+    """CellColors of the state's grid over an already toned img (or its box), color pairs for half-blocks."""
+    width, height, mode = state.get("width", 120), state.get("height", 60), state["color_mode"]
+    if state.get("render_mode", "ramp") == "halfblock":
+        return quantize_pairs(cell_colors(img, width, height * 2, box), mode)
+    return quantize_colors(cell_colors(img, width, height, box), mode)
+
+
+def cell_colors(img, width, height, box=None):
+    """Average RGB of every cell of a width x height grid over img (or its box), as (height, width, 3) uint8."""
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return np.asarray(img.resize((width, height), Image.Resampling.BOX, box=box))
+
+
+def quantize_colors(rgb, mode):
+    """Quantizes a (rows, cols, 3) uint8 color grid for a COLOR_MODES mode into CellColors."""
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if mode in _TRUECOLOR_DROP:
+        drop = _TRUECOLOR_DROP[mode]
+        q = rgb
+        if drop:
+            q = rgb >> drop
+            # Back to 8 bits by bit replication, so white stays 255
+            q = (q << drop) | (q >> (8 - 2 * drop))
+        keys = (q[..., 0].astype(np.uint32) << 16) | (q[..., 1].astype(np.uint32) << 8) | q[..., 2]
+        unique, indices = np.unique(keys, return_inverse=True)
+        palette = np.stack([unique >> 16, (unique >> 8) & 0xFF, unique & 0xFF], axis=1).astype(np.uint8)
+        return CellColors(indices.reshape(keys.shape), palette, mode)
+    if mode in ("256", "16"):
+        shift = 8 - _LUT_BITS
+        keys = ((rgb[..., 0].astype(np.uint16) >> shift) << (2 * _LUT_BITS)) \
+            | ((rgb[..., 1].astype(np.uint16) >> shift) << _LUT_BITS) | (rgb[..., 2] >> shift)
+        palette = xterm_palette()[:16] if mode == "16" else xterm_palette()
+        return CellColors(palette_lut(mode)[keys], palette, mode)
+    raise ValueError(f"Unknown color mode: {mode}")
+
+
+def quantize_pairs(rgb, mode):
+    """
+    Quantizes a (2 * rows, cols, 3) color grid of half cells into CellColors of rows x cols
+    half-block cells: the top halves as foreground colors, the bottom ones as background.
+    """
+    colors = quantize_colors(rgb, mode)
+    rows = colors.indices.shape[0] // 2
+    halves = colors.indices[:rows * 2].reshape(rows, 2, -1)
+    return CellColors(halves[:, 0], colors.palette, mode, background=halves[:, 1])
+
+
+class CellColors:
+    """
+    CellColors: quantized colors of a character grid, as a (rows, cols) index grid into a palette
+    of RGB colors. mode is the COLOR_MODES entry they were quantized for, which decides how they
+    are written as ANSI escape sequences. background, when given, is a second index grid of cell
+    background colors (half-blocks), otherwise cells sit on the theme background.
+    """
+    def __init__(self, indices, palette, mode, background=None):
+        self.indices = indices
+        self.palette = palette
+        self.mode = mode
+        self.background = background
+
+    @property
+    def shape(self):
+        return self.indices.shape
+
+    @property
+    def nbytes(self):
+        extra = 0 if self.background is None else self.background.nbytes
+        return self.indices.nbytes + self.palette.nbytes + extra
+
+    def rgb(self):
+        """(rows, cols, 3) uint8 colors of every cell."""
+        return self.palette[self.indices]
+
+    def background_rgb(self):
+        """(rows, cols, 3) uint8 background colors of every cell, None without backgrounds."""
+        return None if self.background is None else self.palette[self.background]
+
+    def split_key(self, key):
+        """(foreground, background) palette indices of a row_runs key, background None without backgrounds."""
+        if self.background is None:
+            return key, None
+        return divmod(key, len(self.palette))
+
+    def hex_codes(self):
+        """'#rrggbb' of every palette entry."""
+        return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in self.palette.tolist()]
+
+    def sgr_codes(self, background=False):
+        """SGR parameters setting each palette entry as the foreground (or background) color."""
+        if self.mode == "256":
+            return [f"{48 if background else 38};5;{i}" for i in range(len(self.palette))]
+        if self.mode == "16":
+            base = 40 if background else 30
+            return [f"{base + i}" if i < 8 else f"{base + 60 + i - 8}" for i in range(16)]
+        return [f"{48 if background else 38};2;{r};{g};{b}" for r, g, b in self.palette.tolist()]
+
+    def row_runs(self, codes):
+        """
+        Yields, for every row of a (rows, cols) codepoint grid, its (start, stop, key) runs, key being
+        the palette index or, with backgrounds, the (foreground, background) pair (see split_key).
+        Blank cells take the color of their neighbours first, so they never break a run.
+        """
+        idx = self.indices
+        if idx.size == 0:
+            return
+        rows, cols = idx.shape
+        if self.background is not None:
+            # Blank cells still show their background, every cell counts
+            filled = idx.astype(np.int64) * len(self.palette) + self.background
+        else:
+            blank = np.isin(codes, _BLANKS)
+            # Index of the last inked cell up to every column (forward fill), rows starting blank use their first inked cell
+            pos = np.where(blank, -1, np.arange(cols))
+            np.maximum.accumulate(pos, axis=1, out=pos)
+            first = (~blank).argmax(axis=1)
+            pos = np.where(pos < 0, first[:, None], pos)
+            filled = np.take_along_axis(idx, pos, axis=1)
+
+        # Run starts of the whole grid at once, then split per row
+        change = np.ones((rows, cols), dtype=bool)
+        change[:, 1:] = filled[:, 1:] != filled[:, :-1]
+        for r in range(rows):
+            starts = np.flatnonzero(change[r]).tolist()
+            values = filled[r, starts].tolist()
+            stops = starts[1:] + [cols]
+            yield list(zip(starts, stops, values))
+
+
+def to_ansi(text, colors):
+    """The art as text with ANSI color escapes, one per run of same colored cells, reset at every line end."""
+    from .glyphs import text_to_codes
+
+    lines = text.split("\n")
+    trailing = len(lines) > 1 and lines[-1] == ""
+    if trailing:
+        lines.pop()
+    codes = text_to_codes(text)
+    out = []
+    if colors.background is not None:
+        fg_codes, bg_codes = colors.sgr_codes(), colors.sgr_codes(background=True)
+        for line, runs in zip(lines, colors.row_runs(codes)):
+            out.append(_ansi_pair_line(line.ljust(codes.shape[1]), runs, fg_codes, bg_codes))
+        return "\n".join(out) + ("\n" if trailing else "")
+
+    escapes = [f"\x1b[{code}m" for code in colors.sgr_codes()]
+    for line, runs in zip(lines, colors.row_runs(codes)):
+        line = line.ljust(codes.shape[1])
+        out.append("".join([escapes[i] + line[a:b] for a, b, i in runs]) + "\x1b[0m")
+    return "\n".join(out) + ("\n" if trailing else "")
+
+
+def _ansi_pair_line(line, runs, fg_codes, bg_codes):
+    # Only the side of the pair that changed from the previous run is set again
+    n = len(fg_codes)
+    parts = []
+    last_fg = last_bg = None
+    for a, b, key in runs:
+        fg, bg = divmod(key, n)
+        if fg != last_fg and bg != last_bg:
+            parts.append(f"\x1b[{fg_codes[fg]};{bg_codes[bg]}m")
+        else:
+            parts.append(f"\x1b[{fg_codes[fg] if fg != last_fg else bg_codes[bg]}m")
+        parts.append(line[a:b])
+        last_fg, last_bg = fg, bg
+    parts.append("\x1b[0m")
+    return "".join(parts)
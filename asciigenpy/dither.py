@@ -0,0 +1,145 @@
+"""
+Dithering: spreads the quantization error of the character mapping so gradients don't band.
+Luminance grids are snapped to the levels a render mode can show (one per charset character,
+two for Braille dots and half-blocks) before they are mapped to text. Bayer ordered dithering is
+a single vectorized comparison. Floyd-Steinberg and Atkinson diffuse the error over the level
+indices in integer fixed point, swept in diagonal wavefronts that are each a NumPy slice. All of
+them are deterministic.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+DITHER_MODES = ("none", "floyd-steinberg", "atkinson", "bayer")
+# The sequential methods. At Braille resolution of a 600x300 grid (1200x1200 dots) they take ~55-75 ms,
+# past the 35 ms render debounce, so interactive renders stand in DRAFT_MODE for them while an input moves
+DIFFUSION_MODES = ("floyd-steinberg", "atkinson")
+DRAFT_MODE = "bayer"
+
+# Luminance only has 256 values, a grid dithered to as many levels is already exact
+MAX_LEVELS = 256
+
+# Error diffusion keeps values in 1/8 steps. Floyd-Steinberg passes on the whole error, Atkinson
+# 6/8 of it, and the error is at most half a level (127.5), so values stay within [-128, 383];
+# the lookup tables cover a bit more for the rounding of the shares
+_FIXED_SCALE = 8
+_FIXED_LO, _FIXED_HI = -160 * _FIXED_SCALE, 416 * _FIXED_SCALE
+# (down, across, sixteenths of the error) each neighbour gets
+_FLOYD_STEINBERG = ((0, 1, 7), (1, -1, 3), (1, 0, 5), (1, 1, 1))
+# 1/8 to each of 6 neighbours (right 1 and 2, the 3 below, 2 below), 2/8 is dropped
+_ATKINSON = ((0, 1, 2), (0, 2, 2), (1, -1, 2), (1, 0, 2), (1, 1, 2), (2, 0, 2))
+
+
+def bayer_matrix(order=3):
+    """(2**order, 2**order) Bayer index matrix, values 0 .. 4**order - 1."""
+    m = np.zeros((1, 1), dtype=np.int32)
+    for _ in range(order):
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return m
+
+
+# Thresholds in (0, 1), centered in their slots
+_BAYER = ((bayer_matrix() + 0.5) / 64).astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def level_values(levels):
+    """
+    The uint8 luminance each of `levels` (at most MAX_LEVELS) output levels is written as, chosen
+    so mapping it back lands on that level: the first value of its charset_lut bin. Two levels are
+    0 and 255, on either side of the Braille threshold.
+    """
+    if not 2 <= levels <= MAX_LEVELS:
+        raise ValueError(f"Levels must be within 2 .. {MAX_LEVELS}, got {levels}")
+    last = levels - 1
+    # Same float expression as engine.charset_lut
+    bins = np.array([int(v / 255 * last) for v in range(256)])
+    values = np.searchsorted(bins, np.arange(levels)).astype(np.uint8)
+    values.setflags(write=False)
+    return values
+
+
+def _bayer(lum, levels):
+    h, w = lum.shape
+    step = 255 / (levels - 1)
+    tiled = np.tile(_BAYER, (h // 8 + 1, w // 8 + 1))[:h, :w]
+    return np.floor(lum * np.float32(1 / step) + tiled)
+
+
+@lru_cache(maxsize=32)
+def _diffusion_luts(levels, weights):
+    """
+    Over every fixed-point value a pixel can reach: its level, and a (len(weights), values) table
+    of the error share each neighbour gets. When the weights add up to the whole error the last
+    share takes the rounding remainder, so no error is lost.
+    """
+    step = 255 * _FIXED_SCALE / (levels - 1)
+    v = np.arange(_FIXED_LO, _FIXED_HI)
+    k = np.clip(np.rint(v / step), 0, levels - 1).astype(np.intp)
+    error = v - k * step
+    shares = np.rint(error[:, None] * (np.array(weights) / 16)).astype(np.int32)
+    if sum(weights) == 16:
+        shares[:, -1] = np.rint(error).astype(np.int32) - shares[:, :-1].sum(axis=1)
+    # One contiguous row per neighbour, gathers from a strided column are much slower
+    return k, np.ascontiguousarray(shares.T)
+
+
+def _skew(lum):
+    # With both kernels pixel (y, x) only depends on pixels of earlier wavefronts t = x + 2y, so every
+    # pixel of a wavefront is independent. Skewed so wavefront t is row t: sk[t, y] = (y, t - 2y),
+    # in fixed point and offset so values index the lookup tables directly
+    h, w = lum.shape
+    n = w + 2 * (h - 1)
+    sk = np.zeros((n + 5, h + 2), dtype=np.int32)
+    # (h, w) view of the pixels in sk: one row down is 2 wavefronts and a column on, one pixel right a wavefront
+    s0, s1 = sk.strides
+    pixels = np.lib.stride_tricks.as_strided(sk, (h, w), (2 * s0 + s1, s0), writeable=True)
+    pixels[:] = lum.astype(np.int32) * _FIXED_SCALE - _FIXED_LO
+    # ahead[t, i] is wavefront t + i
+    ahead = np.lib.stride_tricks.as_strided(sk, (n, 5, h + 2), (s0, s0, s1), writeable=True)
+    wavefronts = [(t, max(0, (t - w) // 2 + 1), min(h - 1, t // 2) + 1) for t in range(n)]
+    return sk, pixels, ahead, wavefronts
+
+
+def _floyd_steinberg(lum, levels):
+    # The wavefront is the critical path, the loop body is kept to one gather and two adds: the right
+    # neighbour is wavefront t + 1, the 3 below are wavefronts t + 1 .. t + 3 one pixel down
+    k, shares = _diffusion_luts(levels, tuple(wt for _, _, wt in _FLOYD_STEINBERG))
+    take = shares.take
+    sk, pixels, ahead, wavefronts = _skew(lum)
+    for t, y0, y1 in wavefronts:
+        e = take(sk[t, y0:y1], axis=1)
+        sk[t + 1, y0:y1] += e[0]
+        ahead[t, 1:4, y0 + 1:y1 + 1] += e[1:]
+    return k[pixels]
+
+
+def _atkinson(lum, levels):
+    # Every neighbour gets the same share. The 6 neighbours are 3 slices: (t+1, t+2) and (t+1 .. t+3)
+    # one pixel down, t+4 two down
+    k, shares = _diffusion_luts(levels, tuple(wt for _, _, wt in _ATKINSON))
+    take = shares[0].take
+    sk, pixels, ahead, wavefronts = _skew(lum)
+    for t, y0, y1 in wavefronts:
+        e = take(sk[t, y0:y1])
+        ahead[t, 1:3, y0:y1] += e
+        ahead[t, 1:4, y0 + 1:y1 + 1] += e
+        sk[t + 4, y0 + 2:y1 + 2] += e
+    return k[pixels]
+
+
+_METHODS = {"floyd-steinberg": _floyd_steinberg, "atkinson": _atkinson, "bayer": _bayer}
+
+
+def dither(lum, method, levels):
+    """
+    Dithers a 2D uint8 luminance grid down to `levels` levels with a DITHER_MODES method, returned
+    as uint8 luminance (see level_values). MAX_LEVELS levels or more leave it unchanged.
+    """
+    lum = np.asarray(lum, dtype=np.uint8)
+    if method == "none" or not 2 <= levels < MAX_LEVELS or lum.size == 0:
+        return lum
+    if method not in _METHODS:
+        raise ValueError(f"Unknown dither mode: {method}")
+    k = np.clip(_METHODS[method](lum, levels), 0, levels - 1).astype(np.intp)
+    return level_values(levels)[k]
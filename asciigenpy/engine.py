@@ -0,0 +1,476 @@
+"""
+Headless ASCII Engine: converts images into character grids using NumPy only.
+Has no Qt or ascii_magic dependency so it can be driven from the GUI, scripts or tests alike,
+only the structure mode loads Qt to rasterize the glyphs it matches against.
+"""
+import hashlib
+import io
+import math
+import threading
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageStat
+
+from .dither import dither
+from .structure import DEFAULT_FONT_FAMILY, FEATURE_GRID, map_structure
+
+# Fallback ramp used by ascii_magic when an empty charset is supplied, kept for output parity
+DEFAULT_CHARSET = ' .`-_\':,;^=+/"|)\\<>)iv%xclrs{*}I?!][1taeo7zjLunT#JCwfy325Fp6mqSghVd4EgXPGZbYkOA&8U$@KHDBWNMR0QQ'
+
+CHARSET_PRESETS = {
+    "Standard (10 chars)": " .:-=+*#%@",
+    "Detailed (70 chars)": " .'`^\",:;Il!i><~+_-?][}{1)(|\\/tfjrxnuvczXYUJCLQ0OZmwqpdbkhao*#MW&8%B@$",
+    "Blocks": " ░▒▓█",
+    "Binary": " 01",
+}
+
+# Monospace terminal chars are roughly 2:1 aspect ratio (twice as tall as they are wide)
+CHAR_ASPECT = 0.5
+
+_NEWLINE = ord("\n")
+
+# "ramp" maps every cell's luminance to a charset character, "braille" packs a 2x4 grid of
+# thresholded dots per cell into a U+2800 pattern, "halfblock" splits every cell into two square
+# halves (block elements in monochrome, an upper half block with its own fg/bg colors in color),
+# "structure" picks the charset glyph whose shape in the output font best matches the cell
+RENDER_MODES = ("ramp", "braille", "halfblock", "structure")
+# Luminance samples (across, down) each render mode takes per character cell
+CELL_SAMPLES = {"ramp": (1, 1), "braille": (2, 4), "halfblock": (1, 2), "structure": (FEATURE_GRID, FEATURE_GRID)}
+
+BRAILLE_BASE = 0x2800
+# Samples at or above this (after the ascii inversion, i.e. dark in the preview) raise a dot
+BRAILLE_THRESHOLD = 128
+# Cell samples in row-major order (r0c0, r0c1, r1c0, ...) reordered as Braille dots 1-8, the codepoint's bits 0-7
+_BRAILLE_DOT_ORDER = [0, 2, 4, 1, 3, 5, 6, 7]
+
+UPPER_HALF_BLOCK = 0x2580
+# Half-block cells indexed by (top raised) | (bottom raised) << 1: space, upper half, lower half, full block
+_HALF_BLOCKS = np.array([0x20, UPPER_HALF_BLOCK, 0x2584, 0x2588], dtype=np.uint32)
+
+INVERT_LUT = tuple(range(255, -1, -1))
+
+
+def contrast_mean(img, invert=False):
+    """
+    Mean luminance the contrast curve pivots around, rounded exactly like ImageEnhance.Contrast.
+    It only depends on the source pixels, so callers should compute it once per image and invert state.
+    """
+    if invert:
+        img = img.point(list(INVERT_LUT) * len(img.getbands()))
+    if img.mode != "L":
+        img = img.convert("L")
+    return int(ImageStat.Stat(img).mean[0] + 0.5)
+
+
+@lru_cache(maxsize=64)
+def tone_lut(mean, contrast, brightness, invert=False, ascii_invert=False):
+    """
+    Compiles invert -> contrast -> brightness (-> ascii inversion) into a single 256-entry curve.
+    Each stage is evaluated by PIL itself on a 256 pixel ramp, so applying the curve once is
+    bit-exact with chaining ImageOps.invert and ImageEnhance on the full image.
+    """
+    size = (256, 1)
+    ramp = Image.frombytes("L", size, bytes(range(256)))
+    if invert:
+        ramp = ramp.point(list(INVERT_LUT))
+    ramp = Image.blend(Image.new("L", size, mean), ramp, contrast)
+    ramp = Image.blend(Image.new("L", size, 0), ramp, brightness)
+    if ascii_invert:
+        ramp = ramp.point(list(INVERT_LUT))
+    return tuple(ramp.tobytes())
+
+
+def apply_tone(img, lut):
+    """Applies a tone curve to every band of a PIL image in a single pass."""
+    return img.point(list(lut) * len(img.getbands()))
+
+
+@lru_cache(maxsize=32)
+def charset_lut(charset):
+    """
+    Builds a 256-entry luminance -> codepoint lookup table for a charset ramp.
+    Index 0 (dark) maps to the first character and 255 (light) to the last, using the
+    exact same float expression as ascii_magic so the output stays byte-identical.
+    """
+    chars = charset or DEFAULT_CHARSET
+    last = len(chars) - 1
+    lut = np.array([ord(chars[int(v / 255 * last)]) for v in range(256)], dtype=np.uint32)
+    lut.setflags(write=False)
+    return lut
+
+
+def to_luminance(source):
+    """Returns a 2D uint8 luminance array for a PIL image or a NumPy L/RGB/RGBA array."""
+    if isinstance(source, Image.Image):
+        if source.mode != "L":
+            source = source.convert("L")
+        return np.asarray(source, dtype=np.uint8)
+
+    arr = np.asarray(source)
+    if arr.ndim == 2:
+        return arr.astype(np.uint8, copy=False)
+    if arr.ndim == 3 and arr.shape[2] in (3, 4):
+        # Same fixed-point ITU-R 601-2 weights PIL uses in convert("L")
+        rgb = arr[..., :3].astype(np.uint32)
+        lum = rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000
+        return (lum >> 16).astype(np.uint8)
+    raise ValueError(f"Unsupported array shape for luminance: {arr.shape}")
+
+
+def codes_to_text(codes):
+    """Turns a 2D codepoint grid into text, one line per row with a trailing newline each."""
+    h, w = codes.shape
+    grid = np.empty((h, w + 1), dtype="<u4")
+    grid[:, :w] = codes
+    grid[:, w] = _NEWLINE
+    return grid.tobytes().decode("utf-32-le")
+
+
+def map_luminance(lum, charset):
+    """Maps a 2D luminance grid straight to text, one line per row with a trailing newline each."""
+    lum = np.asarray(lum, dtype=np.uint8)
+    return codes_to_text(charset_lut(charset)[lum])
+
+
+def map_braille(lum, threshold=BRAILLE_THRESHOLD):
+    """
+    Packs a (4 * rows, 2 * cols) luminance grid into rows x cols Braille characters, raising the
+    dots whose sample is at or above threshold. The whole grid is thresholded and bit packed at once.
+    """
+    lum = np.asarray(lum, dtype=np.uint8)
+    rows, cols = lum.shape[0] // 4, lum.shape[1] // 2
+    dots = (lum[:rows * 4, :cols * 2] >= threshold).reshape(rows, 4, cols, 2)
+    # (rows, cols, 8) dots of every cell in bit order, packed into one byte each
+    cells = dots.transpose(0, 2, 1, 3).reshape(rows, cols, 8)[..., _BRAILLE_DOT_ORDER]
+    bits = np.packbits(cells, axis=-1, bitorder="little")[..., 0]
+    return codes_to_text(BRAILLE_BASE + bits.astype(np.uint32))
+
+
+def map_half_blocks(lum, threshold=BRAILLE_THRESHOLD):
+    """Maps a (2 * rows, cols) luminance grid to block elements, raising the halves at or above threshold."""
+    lum = np.asarray(lum, dtype=np.uint8)
+    rows = lum.shape[0] // 2
+    halves = (lum[:rows * 2] >= threshold).reshape(rows, 2, lum.shape[1])
+    return codes_to_text(_HALF_BLOCKS[halves[:, 0] | (halves[:, 1].astype(np.uint8) << 1)])
+
+
+def colored_half_blocks(state):
+    """True when a state renders half-blocks in color: every cell is then an upper half block, the colors carry the image."""
+    return state.get("render_mode", "ramp") == "halfblock" and state.get("color_mode", "none") != "none"
+
+
+def text_state(state):
+    """
+    state without the settings its text doesn't depend on, for cache keys: the color mode unless
+    colored_half_blocks, the font family outside the structure mode.
+    """
+    unused = set()
+    if not colored_half_blocks(state):
+        unused.add("color_mode")
+    if state.get("render_mode", "ramp") != "structure":
+        unused.add("font_family")
+    return {k: v for k, v in state.items() if k not in unused}
+
+
+def sample_size(state):
+    """Luminance samples (width, height) a state's render mode maps onto its character grid."""
+    sx, sy = CELL_SAMPLES[state.get("render_mode", "ramp")]
+    return state.get("width", 120) * sx, state.get("height", 60) * sy
+
+
+def map_cells(lum, state):
+    """
+    Maps a luminance grid of sample_size(state) to text in the state's render mode, dithered
+    first with its "dither" method down to the levels the mode can show. The structure mode matches
+    glyphs of the state's "font_family" and isn't dithered.
+    """
+    mode = state.get("render_mode", "ramp")
+    method = state.get("dither", "none")
+    charset = state.get("charset", CHARSET_PRESETS["Standard (10 chars)"]) or DEFAULT_CHARSET
+    if mode == "structure":
+        return codes_to_text(map_structure(lum, charset, state.get("font_family", DEFAULT_FONT_FAMILY)))
+    if mode == "braille":
+        return map_braille(dither(lum, method, 2))
+    if mode == "halfblock":
+        if colored_half_blocks(state):
+            rows, cols = np.shape(lum)
+            return codes_to_text(np.full((rows // 2, cols), UPPER_HALF_BLOCK, dtype=np.uint32))
+        return map_half_blocks(dither(lum, method, 2))
+    return map_luminance(dither(lum, method, len(charset)), charset)
+
+
+def build_integral(lum):
+    """
+    Summed-area table of a luminance array, padded with a leading zero row and column.
+    Stored as float64 so sums stay exact (integers below 2**53) even for 100+ MP sources.
+    """
+    lum = np.asarray(lum)
+    h, w = lum.shape
+    sat = np.zeros((h + 1, w + 1), dtype=np.float64)
+    np.cumsum(lum, axis=0, dtype=np.float64, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    return sat
+
+
+def integral_level(size, max_bytes):
+    """
+    Smallest ImagePyramid level (each halving both sides, rounding up) of an image of size whose
+    build_integral table takes at most max_bytes.
+    """
+    w, h = size
+    k = 0
+    while 2 ** k < max(w, h) and ((h - 1) // 2 ** k + 2) * ((w - 1) // 2 ** k + 2) * 8 > max_bytes:
+        k += 1
+    return k
+
+
+def _integral_at(sat, ys, xs):
+    # Bilinear interpolation of the table is exact for areas of a piecewise constant image,
+    # which lets cell edges fall anywhere between pixels
+    iy = np.clip(np.floor(ys).astype(np.intp), 0, sat.shape[0] - 2)
+    ix = np.clip(np.floor(xs).astype(np.intp), 0, sat.shape[1] - 2)
+    fy = (ys - iy)[:, None]
+    fx = (xs - ix)[None, :]
+    iy, ix = iy[:, None], ix[None, :]
+    top = sat[iy, ix] * (1 - fx) + sat[iy, ix + 1] * fx
+    bottom = sat[iy + 1, ix] * (1 - fx) + sat[iy + 1, ix + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def sample_integral(sat, box, width, height):
+    """
+    Area-averages the (x0, y0, x1, y1) box of a summed-area table into a height x width
+    uint8 luminance grid. Costs a handful of lookups per cell, independent of the source size.
+    """
+    x0, y0, x1, y1 = box
+    xs = np.linspace(x0, x1, width + 1)
+    ys = np.linspace(y0, y1, height + 1)
+    corners = _integral_at(sat, ys, xs)
+    sums = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+    area = np.outer(np.diff(ys), np.diff(xs))
+    return np.clip(np.rint(sums / area), 0, 255).astype(np.uint8)
+
+
+def build_proxy(img, scale):
+    """
+    Returns a downscaled working copy of img for interactive edits, or img itself when the
+    requested scale would not reduce it. Uses reducing_gap so huge sources shrink quickly.
+    """
+    if scale >= 1:
+        return img
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+# JPEG DCT scale SourceImage.contrast_mean decodes at
+_MEAN_DRAFT = 8
+
+
+class SourceImage:
+    """
+    Lazily decoded source image. Only the file header is read up front (for the size), pixels are
+    decoded on demand: JPEGs through PIL's draft mode at the smallest DCT scale (1/2, 1/4, 1/8)
+    that still covers the requested scale, everything else once at full resolution. The largest
+    decode so far is kept and reused. The encoded bytes stay in memory, so the original file may
+    go away. Safe to share with the render worker threads.
+    """
+    def __init__(self, data=None, image=None, digest=None):
+        self.data = data
+        self._image = image
+        self._digest = digest
+        self._means = {}
+        self._lock = threading.Lock()
+        if image is not None:
+            self.size = image.size
+            self.format = None
+        else:
+            with Image.open(io.BytesIO(data)) as header:
+                self.size = header.size
+                self.format = header.format
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(data=f.read())
+
+    @classmethod
+    def from_image(cls, img):
+        """Wraps an already decoded image, e.g. a pasted one."""
+        return cls(image=img if img.mode == "RGB" else img.convert("RGB"))
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    @property
+    def digest(self):
+        """sha256 hex digest of the encoded bytes (see encoded), identifying the source content."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.encoded()[0]).hexdigest()
+        return self._digest
+
+    def encoded(self):
+        """The encoded file bytes and their PIL format. Pasted images are encoded as PNG, once."""
+        with self._lock:
+            if self.data is None:
+                buf = io.BytesIO()
+                self._image.save(buf, "PNG")
+                self.data, self.format = buf.getvalue(), "PNG"
+            return self.data, self.format
+
+    @property
+    def is_full(self):
+        return self._image is not None and self._image.size == self.size
+
+    def decode(self, scale=1.0):
+        """RGB image at least scale times the full resolution (scale 0 takes whatever is decoded)."""
+        with self._lock:
+            img = self._image
+            if img is not None and (img.size == self.size or img.width >= self.width * scale):
+                return img
+            img = Image.open(io.BytesIO(self.data))
+            if scale < 1 and img.format == "JPEG":
+                img.draft("RGB", (max(1, math.ceil(self.width * scale)), max(1, math.ceil(self.height * scale))))
+            img.load()
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            self._image = img
+            return img
+
+    def full(self):
+        """Full resolution pixels, decoded now if only a draft was needed so far."""
+        return self.decode(1.0)
+
+    def contrast_mean(self, invert=False):
+        """
+        contrast_mean of the source taken from a fixed decode, the 1/8 draft for JPEGs and the full
+        image otherwise, so it never depends on which decodes happened before. The GUI and convert
+        share it, remembered per invert state.
+        """
+        with self._lock:
+            if invert in self._means:
+                return self._means[invert]
+        if self.format == "JPEG":
+            img = Image.open(io.BytesIO(self.data))
+            img.draft("RGB", (max(1, math.ceil(self.width / _MEAN_DRAFT)), max(1, math.ceil(self.height / _MEAN_DRAFT))))
+            img.load()
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+        else:
+            img = self.full()
+        mean = contrast_mean(img, invert)
+        with self._lock:
+            self._means[invert] = mean
+        return mean
+
+    def proxy(self, scale):
+        """build_proxy of the source from the cheapest decode that still covers scale."""
+        img = self.decode(scale)
+        return build_proxy(img, scale * self.width / img.width)
+
+
+def _image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+class ImagePyramid:
+    """
+    Mipmap chain of an image where each level is half the previous one (2x2 box reduce).
+    Levels are built lazily on first use and kept for reuse while they fit in max_bytes.
+    """
+    def __init__(self, base, max_bytes=None):
+        self.base = base
+        self.max_bytes = max_bytes
+        self._levels = [base]
+
+    @property
+    def nbytes(self):
+        return sum(_image_nbytes(level) for level in self._levels)
+
+    def level(self, k):
+        img = self._levels[min(k, len(self._levels) - 1)]
+        keep = True
+        for _ in range(len(self._levels), k + 1):
+            img = img.reduce(2)
+            # Levels must stay contiguous, so once one does not fit none of the deeper ones are kept
+            keep = keep and (self.max_bytes is None or self.nbytes + _image_nbytes(img) <= self.max_bytes)
+            if keep:
+                self._levels.append(img)
+        return img
+
+    def resize(self, size, box=None):
+        """
+        LANCZOS-resamples box (in base pixels) to size, starting from the smallest level
+        whose region is still at least the target size.
+        """
+        if box is None:
+            box = (0, 0) + self.base.size
+        box_w, box_h = box[2] - box[0], box[3] - box[1]
+        k = 0
+        while box_w / 2 ** (k + 1) >= size[0] and box_h / 2 ** (k + 1) >= size[1]:
+            k += 1
+        if k == 0:
+            # Full resolution keeps the exact crop -> resize behaviour
+            return self.base.crop(box).resize(size, Image.Resampling.LANCZOS)
+        f = 2 ** k
+        return self.level(k).resize(size, Image.Resampling.LANCZOS, box=tuple(v / f for v in box))
+
+
+def resample(img, width, height, box=None):
+    """LANCZOS-resizes img (or just its possibly fractional box) to width x height, as render_ascii does."""
+    if box is not None:
+        return img.resize((width, height), Image.Resampling.LANCZOS, box=box)
+    if img.size != (width, height):
+        return img.resize((width, height), Image.Resampling.LANCZOS)
+    return img
+
+
+def render_ascii(source, width, height, charset, box=None):
+    """
+    Resizes the source to a width x height character grid (LANCZOS) and maps it to text.
+    Light pixels take the last characters of the ramp, dark pixels take the first ones.
+    An optional (possibly fractional) box samples only that region of the source.
+    """
+    if not isinstance(source, Image.Image):
+        arr = np.asarray(source)
+        if box is None and arr.shape[:2] == (height, width):
+            return map_luminance(to_luminance(arr), charset)
+        source = Image.fromarray(arr)
+
+    return map_luminance(to_luminance(resample(source, width, height, box)), charset)
+
+
+def fit_height(width, img_w, img_h):
+    """Grid height that keeps the image proportions for a given width, like the GUI's aspect lock."""
+    return max(1, int(width * (img_h / img_w) * CHAR_ASPECT))
+
+
+def render_state(img, state, mean=None):
+    """
+    Headless equivalent of the GUI pipeline for a serialize_state() style dict: crop, tone with the
+    ascii inversion folded in, resample (LANCZOS or area average) and map to text in its
+    "render_mode". Supports an optional "crop_box" (x0, y0, x1, y1) in source pixels. mean is the
+    contrast pivot (see SourceImage.contrast_mean), taken from img itself when not given.
+    """
+    c = state.get("contrast", 10) / 10.0
+    b = state.get("brightness", 10) / 10.0
+    invert = state.get("invert", False)
+    width, height = sample_size(state)
+
+    if mean is None:
+        mean = contrast_mean(img, invert)
+    lut = tone_lut(mean, c, b, invert, True)
+    box = state.get("crop_box")
+    if state.get("sampling", "lanczos") == "area":
+        box = box or (0, 0, img.width, img.height)
+        sat = build_integral(to_luminance(apply_tone(img, lut)))
+        return map_cells(sample_integral(sat, box, width, height), state)
+
+    if box:
+        img = img.crop(box)
+    return map_cells(to_luminance(resample(apply_tone(img, lut), width, height)), state)
@@ -0,0 +1,494 @@
+"""
+Exporters: write rendered ASCII art to text, ANSI, HTML, SVG or PNG files, optionally colored
+with CellColors (see color.py). Text, ANSI, HTML and SVG are plain Python. PNG glyphs are rasterized through Qt, which is only imported when it
+is actually requested so headless callers (the batch CLI) don't need PyQt6 for the other formats.
+"""
+import html
+import os
+import struct
+import zlib
+
+
+def theme_colors(is_inverted):
+    """Background and text colors matching the workspace theme."""
+    return ("#000000", "#ffffff") if is_inverted else ("#ffffff", "#000000")
+
+
+# Writers report progress at most this often (in lines / characters), see _progress_step
+_TXT_CHUNK = 1024 * 1024
+
+
+def _progress_step(total, steps=100):
+    return max(1, total // steps)
+
+
+def write_txt(path, ascii_text, progress=None):
+    """progress, when given, is called with the written fraction (0..1) as writing goes on."""
+    with open(path, 'w', encoding='utf-8') as f:
+        if progress is None:
+            f.write(ascii_text)
+            return
+        for start in range(0, len(ascii_text), _TXT_CHUNK):
+            progress(start / len(ascii_text))
+            f.write(ascii_text[start:start + _TXT_CHUNK])
+        progress(1.0)
+
+
+def write_ansi(path, ascii_text, colors, progress=None):
+    """Text with ANSI color escapes, one per run of same colored cells. Plain text when colors is None."""
+    if colors is not None:
+        from .color import to_ansi
+        ascii_text = to_ansi(ascii_text, colors)
+    write_txt(path, ascii_text, progress)
+
+
+def _color_classes(colors, prop, bg_prop):
+    """
+    CSS rules .cN{prop:#rrggbb} for the palette entries colors actually uses, plus .bN{bg_prop:...}
+    for the cell backgrounds of half-blocks.
+    """
+    import numpy as np
+    codes = colors.hex_codes()
+    rules = [f".c{i}{{{prop}:{codes[i]}}}" for i in np.unique(colors.indices).tolist()]
+    if colors.background is not None:
+        rules += [f".b{i}{{{bg_prop}:{codes[i]}}}" for i in np.unique(colors.background).tolist()]
+    return "".join(rules)
+
+
+def _run_class(colors, key):
+    fg, bg = colors.split_key(key)
+    return f"c{fg}" if bg is None else f"c{fg} b{bg}"
+
+
+def _color_runs(ascii_text, colors):
+    """(line, runs) pairs, runs being None for every line when colors is None. See CellColors.row_runs."""
+    if colors is None:
+        return ((line, None) for line in _iter_lines(ascii_text))
+    from .glyphs import text_to_codes
+    return zip(_iter_lines(ascii_text), colors.row_runs(text_to_codes(ascii_text)))
+
+
+def write_html(path, ascii_text, colors, font_family, font_size, is_inverted, progress=None):
+    """
+    A standalone HTML page holding the art in a <pre>, on the workspace theme. Colored art gets one
+    <span> per run of same colored cells, with a CSS class per palette entry.
+    """
+    bg_hex, t_color = theme_colors(is_inverted)
+    n_lines = ascii_text.count('\n') + 1
+    step = _progress_step(n_lines)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<style>\n')
+        f.write(f'body{{margin:0;background:{bg_hex}}}\n')
+        f.write(f"pre{{margin:0;font-family:'{font_family}',monospace;font-size:{font_size}px;line-height:1.2;color:{t_color}}}\n")
+        if colors is not None:
+            f.write(_color_classes(colors, "color", "background-color") + "\n")
+        f.write('</style>\n</head>\n<body>\n<pre>')
+        for i, (line, runs) in enumerate(_color_runs(ascii_text, colors)):
+            if progress and i % step == 0:
+                progress(i / n_lines)
+            if i:
+                f.write('\n')
+            if runs is None:
+                f.write(html.escape(line))
+            else:
+                f.write(''.join(f'<span class="{_run_class(colors, k)}">{html.escape(line[a:b])}</span>' for a, b, k in runs if a < len(line)))
+        f.write('</pre>\n</body>\n</html>\n')
+    if progress:
+        progress(1.0)
+
+
+# plain: one editable <tspan> per line. compact: space runs become dx offsets.
+# symbols: glyphs are outlined once and placed with <use>, independent of installed fonts
+SVG_MODES = ("plain", "compact", "symbols")
+
+
+def _iter_lines(text):
+    """Yields the lines of text one at a time, without building a list of all of them."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _num(v):
+    """Shortest decimal with at most 2 places, for the compact SVG modes."""
+    return f"{v:.2f}".rstrip("0").rstrip(".")
+
+
+def _svg_cell(font_size):
+    # Heuristic mapping for standard monospaced browser rendering
+    c_width = font_size * 0.60
+    c_height = font_size * 1.20 # Approximate line height
+    return c_width, c_height
+
+
+def svg_metrics(ascii_text, font_size):
+    """(cell width, line height, document width, document height) of an SVG export."""
+    n_lines = ascii_text.count('\n') + 1
+    max_chars = max([len(l) for l in _iter_lines(ascii_text)] + [1])
+    c_width, c_height = _svg_cell(font_size)
+    return c_width, c_height, c_width * max_chars, c_height * n_lines + c_height
+
+
+def write_svg(path, ascii_text, font_family, font_size, is_inverted, mode="plain", progress=None, colors=None):
+    """
+    Builds the SVG XML manually for true editable text, streaming it straight to the file line by
+    line. See SVG_MODES for the compact variants, "symbols" needs Qt to outline the glyphs.
+    progress, when given, is called with the written fraction (0..1) every few lines.
+    colors (CellColors) fills each run of same colored cells through a CSS class.
+    """
+    if mode not in SVG_MODES:
+        raise ValueError(f"Unknown SVG mode: {mode}")
+    bg_hex, t_color = theme_colors(is_inverted)
+    n_lines = ascii_text.count('\n') + 1
+    step = _progress_step(n_lines)
+    c_width, c_height, doc_w, doc_h = svg_metrics(ascii_text, font_size)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        if mode == "symbols":
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 {doc_w} {doc_h}" width="{doc_w}" height="{doc_h}">')
+        else:
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {doc_w} {doc_h}" width="{doc_w}" height="{doc_h}">')
+        f.write(f'\n  <rect width="100%" height="100%" fill="{bg_hex}"/>')
+        if colors is not None:
+            f.write(f'\n  <style>{_color_classes(colors, "fill", "fill")}</style>')
+            if colors.background is not None:
+                _write_svg_backgrounds(f, colors, font_size)
+
+        if mode == "symbols":
+            _write_svg_symbols(f, ascii_text, font_family, font_size, t_color, c_width, c_height, progress, step, colors)
+        else:
+            write_svg_text(f, ascii_text, font_family, font_size, t_color, mode, progress=progress, colors=colors)
+        f.write('\n</svg>')
+    if progress:
+        progress(1.0)
+
+
+def write_svg_text(f, ascii_text, font_family, font_size, t_color, mode="plain", indent="  ", progress=None, colors=None):
+    """
+    Writes the <text> element of a plain or compact SVG export to the open file f. With colors, the
+    runs of every line are nested tspans of the .cN classes the caller declared (see _color_classes).
+    """
+    c_width, c_height = _svg_cell(font_size)
+    n_lines = ascii_text.count('\n') + 1
+    step = _progress_step(n_lines)
+    f.write(f'\n{indent}<text x="0" y="0" font-family="{font_family}" font-size="{font_size}px" fill="{t_color}" xml:space="preserve">')
+    for i, (line, runs) in enumerate(_color_runs(ascii_text, colors)):
+        if progress and i % step == 0:
+            progress(i / n_lines)
+        # SVG Text renders from the baseline, meaning y=0 is cut off. Offset identically by line-height
+        y_pos = (i + 1) * c_height * 0.85
+        if runs is not None:
+            _write_svg_color_line(f, line, runs, colors, y_pos, c_width, mode == "compact", indent)
+            continue
+        if mode == "compact":
+            _write_svg_compact_line(f, line, y_pos, c_width, indent)
+            continue
+        escaped = html.escape(line)
+        if not escaped: escaped = " "
+        f.write(f'\n{indent}  <tspan x="0" y="{y_pos}">{escaped}</tspan>')
+    f.write(f'\n{indent}</text>')
+
+
+def _write_svg_compact_line(f, line, y_pos, c_width, indent="  "):
+    # Blank lines are dropped entirely, every line starts with an absolute x/y anyway
+    body = line.strip(" ")
+    if not body:
+        return
+    lead = len(line) - len(line.lstrip(" "))
+    parts = [f'<tspan x="{_num(lead * c_width)}" y="{_num(y_pos)}">']
+    pos = 0
+    # Inner runs only become dx offsets when that is shorter than the spaces themselves
+    while True:
+        run_start = body.find(" ", pos)
+        if run_start < 0:
+            parts.append(html.escape(body[pos:]))
+            break
+        run_end = run_start
+        while body[run_end] == " ":
+            run_end += 1
+        jump = f'</tspan><tspan dx="{_num((run_end - run_start) * c_width)}">'
+        if run_end - run_start > len(jump):
+            parts.append(html.escape(body[pos:run_start]) + jump)
+        else:
+            parts.append(html.escape(body[pos:run_end]))
+        pos = run_end
+    parts.append('</tspan>')
+    f.write(f'\n{indent}  ' + ''.join(parts))
+
+
+def _write_svg_color_line(f, line, runs, colors, y_pos, c_width, compact, indent="  "):
+    # Compact lines only drop their blank ends, inner spaces already sit inside the runs
+    if compact:
+        body = line.rstrip(" ")
+        if not body:
+            return
+        lead = len(body) - len(body.lstrip(" "))
+        x, y = _num(lead * c_width), _num(y_pos)
+    else:
+        body, lead, x, y = line, 0, "0", y_pos
+    spans = [f'<tspan class="c{colors.split_key(k)[0]}">{html.escape(body[max(a, lead):b])}</tspan>'
+             for a, b, k in runs if max(a, lead) < min(b, len(body))]
+    f.write(f'\n{indent}  <tspan x="{x}" y="{y}">{"".join(spans) or " "}</tspan>')
+
+
+def _write_svg_backgrounds(f, colors, font_size):
+    """One <rect> per run of cells sharing a background color, covering the em boxes of the text lines."""
+    import numpy as np
+    c_width, c_height = _svg_cell(font_size)
+    pitch = c_height * 0.85
+    bg = colors.background
+    f.write('\n  <g shape-rendering="crispEdges">')
+    for i in range(bg.shape[0]):
+        row = bg[i]
+        starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]]).tolist()
+        stops = starts[1:] + [len(row)]
+        # Same baseline as the text, em boxes reach about 0.8em above it
+        top = _num((i + 1) * pitch - 0.8 * font_size)
+        f.write('\n    ' + ''.join(f'<rect class="b{row[a]}" x="{_num(a * c_width)}" y="{top}" width="{_num((b - a) * c_width)}" height="{_num(pitch)}"/>'
+                                   for a, b in zip(starts, stops)))
+    f.write('\n  </g>')
+
+
+def _glyph_path_data(font, char):
+    """SVG path data of one glyph outline, origin on the baseline. Empty for blank glyphs."""
+    from PyQt6.QtGui import QPainterPath
+    path = QPainterPath()
+    path.addText(0, 0, font, char)
+    parts = []
+    i, n = 0, path.elementCount()
+    while i < n:
+        e = path.elementAt(i)
+        if e.isMoveTo():
+            parts.append(f"{'Z' if parts else ''}M{_num(e.x)} {_num(e.y)}")
+            i += 1
+        elif e.isLineTo():
+            parts.append(f"L{_num(e.x)} {_num(e.y)}")
+            i += 1
+        else:
+            c1, c2, end = e, path.elementAt(i + 1), path.elementAt(i + 2)
+            parts.append(f"C{_num(c1.x)} {_num(c1.y)} {_num(c2.x)} {_num(c2.y)} {_num(end.x)} {_num(end.y)}")
+            i += 3
+    return "".join(parts) + "Z" if parts else ""
+
+
+def _write_svg_symbols(f, ascii_text, font_family, font_size, t_color, c_width, c_height, progress, step, colors=None):
+    _ensure_qt_app()
+    font = make_font(font_family)
+    font.setPixelSize(font_size)
+
+    ids = {}
+    f.write('\n  <defs>')
+    for char in sorted(set(ascii_text) - {'\n', ' '}):
+        data = _glyph_path_data(font, char)
+        if data:
+            ids[char] = f"g{len(ids)}"
+            f.write(f'\n    <path id="{ids[char]}" d="{data}"/>')
+    f.write('\n  </defs>')
+
+    # Qt outlines glyphs with the odd-even rule
+    f.write(f'\n  <g fill="{t_color}" fill-rule="evenodd">')
+    n_lines = ascii_text.count('\n') + 1
+    for i, line in enumerate(_iter_lines(ascii_text)):
+        if progress and i % step == 0:
+            progress(i / n_lines)
+        if colors is None:
+            uses = [f'<use xlink:href="#{ids[c]}" x="{_num(col * c_width)}"/>' for col, c in enumerate(line) if c in ids]
+        else:
+            row = colors.indices[i].tolist() if line else []
+            uses = [f'<use class="c{row[col]}" xlink:href="#{ids[c]}" x="{_num(col * c_width)}"/>' for col, c in enumerate(line) if c in ids]
+        if uses:
+            f.write(f'\n    <g transform="translate(0 {_num((i + 1) * c_height * 0.85)})">{"".join(uses)}</g>')
+    f.write('\n  </g>')
+
+
+def _ensure_qt_app():
+    """PNG rendering needs a QGuiApplication for fonts, create an offscreen one when running headless."""
+    from PyQt6.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _ensure_qt_app.app = QGuiApplication([])
+
+
+def make_font(family):
+    """Fixed-pitch monospace QFont, same hints as the workspace output box."""
+    from PyQt6.QtGui import QFont
+    font = QFont(family)
+    font.setStyleHint(QFont.StyleHint.Monospace)
+    font.setFixedPitch(True)
+    return font
+
+
+# Pixel rows per PNG band are chosen so one band stays around this size
+PNG_BAND_BYTES = 32 * 1024 * 1024
+# zlib's deflate state at the default level and the pending output, roughly
+_ZLIB_BYTES = 1024 * 1024
+
+
+def png_canvas_size(ascii_text, cell_w, cell_h):
+    """Pixel size of a PNG export: the grid plus one spare cell each way."""
+    lines = ascii_text.split('\n')
+    max_chars = max([len(l) for l in lines] + [1])
+    return cell_w * max_chars + cell_w, cell_h * len(lines) + cell_h
+
+
+def _png_band_height(width, height):
+    return max(1, min(height, PNG_BAND_BYTES // width))
+
+
+def png_peak_bytes(ascii_text, cell_w, cell_h):
+    """
+    Estimated peak memory of write_png: one band of pixels, its filtered scanline copy and the
+    tiles being blitted into it, the (recolored) glyph atlas, the codepoint/slot grids and
+    zlib's state. Independent of the image height.
+    """
+    width, height = png_canvas_size(ascii_text, cell_w, cell_h)
+    band_h = _png_band_height(width, height)
+    glyphs = len(set(ascii_text) - {'\n'})
+    return 3 * band_h * (width + 1) + 2 * glyphs * cell_w * cell_h + len(ascii_text) * 8 + _ZLIB_BYTES
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _png_chunk(f, tag, data):
+    f.write(struct.pack(">I", len(data)))
+    f.write(tag)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(tag))))
+
+
+def write_png_stream(path, width, height, bands, palette=None, progress=None, rgb=False):
+    """
+    Writes an 8-bit PNG from an iterable of bands (2D uint8, width wide, height rows in total),
+    compressing each one through a single zlib stream as it arrives. Bands hold gray levels,
+    or indices into palette (up to 256 RGB triplets as bytes) when one is given, or are
+    (rows, width, 3) RGB pixels when rgb is set.
+    progress, when given, is called with the written fraction (0..1) before every band.
+    """
+    import numpy as np
+
+    with open(path, 'wb') as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        color_type = 2 if rgb else 0 if palette is None else 3
+        _png_chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        if palette is not None:
+            _png_chunk(f, b"PLTE", palette)
+
+        stream = zlib.compressobj()
+        scanlines = None
+        row_bytes = width * 3 if rgb else width
+        written = 0
+        for band in bands:
+            if progress:
+                progress(written / height)
+            h = band.shape[0]
+            if scanlines is None or scanlines.shape[0] < h:
+                # Every scanline starts with its filter type byte, 0 (None)
+                scanlines = np.zeros((h, row_bytes + 1), dtype=np.uint8)
+            rows = scanlines[:h]
+            rows[:, 1:] = band.reshape(h, row_bytes)
+            data = stream.compress(rows)
+            if data:
+                _png_chunk(f, b"IDAT", data)
+            written += h
+        if written != height:
+            raise ValueError(f"PNG bands cover {written} rows, expected {height}")
+        _png_chunk(f, b"IDAT", stream.flush())
+        _png_chunk(f, b"IEND", b"")
+    if progress:
+        progress(1.0)
+
+
+def write_png(path, ascii_text, font, font_size, is_inverted, progress=None, colors=None):
+    """
+    Rasterizes the art cell by cell: every distinct character is drawn once into a glyph atlas,
+    then horizontal bands of the image are composed from it and streamed to the PNG, so peak
+    memory is one band (see png_peak_bytes) whatever the resolution. font may be a QFont or a family name.
+    progress, when given, is called with the written fraction (0..1) before every band.
+    colors (CellColors) makes it an RGB PNG, every glyph blended from the background into its cell's color.
+    """
+    _ensure_qt_app()
+    import numpy as np
+    from PyQt6.QtGui import QFont
+    from .glyphs import GlyphAtlas, text_to_codes, coverage_lut, hex_to_rgb
+
+    font = make_font(font) if isinstance(font, str) else QFont(font)
+    font.setPointSize(font_size)
+    atlas = GlyphAtlas(font)
+    cw, ch = atlas.cell_width, atlas.cell_height
+    width, height = png_canvas_size(ascii_text, cw, ch)
+
+    codes = text_to_codes(ascii_text)
+    slots = atlas.slots(codes)
+    rows, cols = codes.shape
+    # The grid sits centered in the spare cell around it
+    x0, y0 = cw // 2, ch // 2
+    grid_h = rows * ch
+    if colors is not None:
+        _write_png_colored(path, width, height, atlas, slots, colors, theme_colors(is_inverted)[0], progress)
+        return
+
+    # Colors are applied to the atlas once rather than to every pixel: gray themes store gray
+    # levels directly, anything else stores coverage as palette indices
+    bg_hex, t_color = theme_colors(is_inverted)
+    lut = coverage_lut(hex_to_rgb(bg_hex), hex_to_rgb(t_color))
+    if (lut == lut[:, :1]).all():
+        masks, background, palette = lut[:, 0][atlas.masks], lut[0, 0], None
+    else:
+        masks, background, palette = atlas.masks, 0, lut.tobytes()
+
+    def bands():
+        band_h = _png_band_height(width, height)
+        buf = np.zeros((band_h, width), dtype=np.uint8)
+        for top in range(0, height, band_h):
+            band = buf[:min(band_h, height - top)]
+            band[:] = background
+            a, b = max(top, y0), min(top + band.shape[0], y0 + grid_h)
+            if a < b and cols:
+                atlas.compose_rows_into(band[a - top:b - top, x0:x0 + cols * cw], slots, a - y0, masks)
+            yield band
+
+    write_png_stream(path, width, height, bands(), palette, progress)
+
+
+def _write_png_colored(path, width, height, atlas, slots, colors, bg_hex, progress):
+    import numpy as np
+    from .glyphs import colorize, colorize_pairs, palette_coverage_luts, hex_to_rgb
+
+    cw, ch = atlas.cell_width, atlas.cell_height
+    rows, cols = slots.shape
+    x0, y0 = cw // 2, ch // 2
+    grid_h = rows * ch
+    luts = palette_coverage_luts(hex_to_rgb(bg_hex), colors.palette)
+    indices = colors.indices
+    fg_rgb, bg_rgb = colors.rgb(), colors.background_rgb()
+
+    def bands():
+        # Coverage band plus its RGB copy and the per pixel palette indices colorize gathers through,
+        # color pairs blend in 16 bits from two gathered RGB copies
+        band_h = _png_band_height(width * (8 if bg_rgb is None else 24), height)
+        coverage = np.zeros((band_h, width), dtype=np.uint8)
+        for top in range(0, height, band_h):
+            h = min(band_h, height - top)
+            band = np.empty((h, width, 3), dtype=np.uint8)
+            band[:] = luts[0, 0]
+            a, b = max(top, y0), min(top + h, y0 + grid_h)
+            if a < b and cols:
+                cov = coverage[:b - a, :cols * cw]
+                atlas.compose_rows_into(cov, slots, a - y0, atlas.masks)
+                if bg_rgb is None:
+                    band[a - top:b - top, x0:x0 + cols * cw] = colorize(cov, indices, luts, cw, ch, a - y0)
+                else:
+                    band[a - top:b - top, x0:x0 + cols * cw] = colorize_pairs(cov, fg_rgb, bg_rgb, cw, ch, a - y0)
+            yield band
+
+    write_png_stream(path, width, height, bands(), None, progress, rgb=True)
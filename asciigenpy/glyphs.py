@@ -0,0 +1,179 @@
+"""
+Glyph Atlas: rasterizes every distinct character of a font once and composes character grids
+from the cached cells with NumPy, without any text layout pass.
+Qt is only imported when glyphs are actually rasterized.
+"""
+import numpy as np
+
+# Codepoints below this resolve to atlas slots through a dense table, rarer ones through a dict
+_DENSE_LIMIT = 0x10000
+
+
+def text_to_codes(text):
+    """
+    Splits text into a (rows, cols) uint32 codepoint grid, padding short lines with spaces.
+    A single trailing newline (as produced by the engine) does not add an empty row.
+    """
+    lines = text.split("\n")
+    if len(lines) > 1 and lines[-1] == "":
+        lines.pop()
+    cols = max(len(line) for line in lines)
+    if cols == 0:
+        return np.zeros((0, 0), dtype=np.uint32)
+    if any(len(line) != cols for line in lines):
+        lines = [line.ljust(cols) for line in lines]
+    flat = np.frombuffer("".join(lines).encode("utf-32-le"), dtype="<u4")
+    return flat.reshape(len(lines), cols)
+
+
+class GlyphAtlas:
+    """
+    Coverage masks (0 = background, 255 = ink) of every glyph used so far, all sharing one cell.
+    font is a QFont, scale the device pixel ratio the masks are rendered at. Glyphs wider than the
+    cell (e.g. from fallback fonts) are clipped to it, so the grid always stays aligned.
+    """
+    def __init__(self, font, scale=1.0):
+        from PyQt6.QtGui import QFont, QFontMetrics
+        self.font = QFont(font)
+        self.scale = scale
+        # Integer metrics, same cell the exporters always used
+        fm = QFontMetrics(self.font)
+        self.cell_width = max(1, round(fm.horizontalAdvance("A") * scale))
+        self.cell_height = max(1, round(fm.lineSpacing() * scale))
+        self._ascent = fm.ascent()
+        self.masks = np.zeros((0, self.cell_height, self.cell_width), dtype=np.uint8)
+        self._dense = np.full(_DENSE_LIMIT, -1, dtype=np.int32)
+        self._sparse = {}
+
+    def __len__(self):
+        return len(self.masks)
+
+    def _slot(self, cp):
+        return int(self._dense[cp]) if cp < _DENSE_LIMIT else self._sparse.get(cp, -1)
+
+    def slots(self, codes):
+        """Maps an array of codepoints to atlas slots, rasterizing glyphs seen for the first time."""
+        codes = np.asarray(codes, dtype=np.uint32)
+        if codes.size == 0:
+            return np.zeros(codes.shape, dtype=np.int32)
+        if int(codes.max()) < _DENSE_LIMIT:
+            slots = self._dense[codes]
+            if (slots < 0).any():
+                self._add(np.unique(codes[slots < 0]).tolist())
+                slots = self._dense[codes]
+            return slots
+
+        unique, inverse = np.unique(codes, return_inverse=True)
+        missing = [int(cp) for cp in unique if self._slot(int(cp)) < 0]
+        if missing:
+            self._add(missing)
+        lookup = np.array([self._slot(int(cp)) for cp in unique], dtype=np.int32)
+        return lookup[inverse].reshape(codes.shape)
+
+    def _add(self, codepoints):
+        from PyQt6.QtCore import Qt, QPointF, QRectF
+        from PyQt6.QtGui import QImage, QPainter
+        from .ui.image_bridge import qimage_to_array
+
+        cw, ch = self.cell_width, self.cell_height
+        strip = QImage(cw * len(codepoints), ch, QImage.Format.Format_RGB32)
+        strip.fill(Qt.GlobalColor.black)
+        painter = QPainter(strip)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setFont(self.font)
+        painter.setPen(Qt.GlobalColor.white)
+        painter.scale(self.scale, self.scale)
+        for i, cp in enumerate(codepoints):
+            # Lone surrogates and control characters have nothing to draw
+            if cp < 0x20 or 0xD800 <= cp <= 0xDFFF:
+                continue
+            x = i * cw / self.scale
+            painter.setClipRect(QRectF(x, 0, cw / self.scale, ch / self.scale))
+            painter.drawText(QPointF(x, self._ascent), chr(cp))
+        painter.end()
+
+        # White on black: any color channel is the coverage
+        coverage = qimage_to_array(strip)[:, :cw * len(codepoints), 1]
+        masks = coverage.reshape(ch, len(codepoints), cw).transpose(1, 0, 2)
+
+        first = len(self.masks)
+        self.masks = np.concatenate([self.masks, masks])
+        for i, cp in enumerate(codepoints):
+            if cp < _DENSE_LIMIT:
+                self._dense[cp] = first + i
+            else:
+                self._sparse[cp] = first + i
+
+    def compose(self, slots):
+        """Tiles the masks of a (rows, cols) slot grid into one (rows * cell_height, cols * cell_width) coverage image."""
+        rows, cols = slots.shape
+        tiles = self.masks[slots]
+        return tiles.transpose(0, 2, 1, 3).reshape(rows * self.cell_height, cols * self.cell_width)
+
+    def compose_rows_into(self, out, slots, y0, masks=None):
+        """
+        Blits pixel rows y0 .. y0 + len(out) of the composed grid straight into out, a 2D uint8
+        array (or view) cols * cell_width wide. Bands may start and end mid cell, so memory stays
+        bounded by the band whatever the cell size. masks optionally replaces self.masks with a
+        recolored copy (e.g. lut[atlas.masks]) so the output needs no per-pixel mapping afterwards.
+        """
+        masks = self.masks if masks is None else masks
+        ch, cw = self.cell_height, self.cell_width
+        cols = slots.shape[1]
+        s0, s1 = out.strides
+        y, y1 = y0, y0 + out.shape[0]
+        while y < y1:
+            r, py = divmod(y, ch)
+            n = min(ch - py, y1 - y)
+            # Strided (n, cols, cw) view of the band rows, writes land in out itself even when it is a slice
+            cells = np.lib.stride_tricks.as_strided(out[y - y0:], (n, cols, cw), (s0, cw * s1, s1), writeable=True)
+            cells[:] = masks[:, py:py + n][slots[r]].transpose(1, 0, 2)
+            y += n
+
+
+def hex_to_rgb(color):
+    """'#rrggbb' -> (r, g, b)."""
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def coverage_lut(bg, fg):
+    """(256, 3) uint8 table blending the bg RGB color into fg by glyph coverage."""
+    bg = np.array(bg, dtype=np.float64)
+    fg = np.array(fg, dtype=np.float64)
+    t = np.arange(256)[:, None] / 255.0
+    return np.rint(bg + (fg - bg) * t).astype(np.uint8)
+
+
+def coverage_color_table(bg, fg):
+    """256 ARGB values blending bg into fg, turning a coverage image into an indexed color image."""
+    rgb = coverage_lut(bg, fg).astype(np.uint32)
+    return (0xFF000000 | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]).tolist()
+
+
+def palette_coverage_luts(bg, palette):
+    """coverage_lut for every color of a (n, 3) palette at once, as a (n, 256, 3) uint8 table."""
+    bg = np.array(bg, dtype=np.float64)
+    fg = np.asarray(palette, dtype=np.float64)[:, None, :]
+    t = np.arange(256)[None, :, None] / 255.0
+    return np.rint(bg + (fg - bg) * t).astype(np.uint8)
+
+
+def colorize(coverage, indices, luts, cell_w, cell_h, y0=0):
+    """
+    RGB image of a coverage image composed from a grid of cells, every cell blended through the
+    palette_coverage_luts entry its (rows, cols) palette index picks. coverage starts at pixel row
+    y0 of the grid and may end mid cell.
+    """
+    h, w = coverage.shape
+    rows = indices[(y0 + np.arange(h)) // cell_h]
+    return luts[rows[:, np.arange(w) // cell_w], coverage]
+
+
+def colorize_pairs(coverage, fg, bg, cell_w, cell_h, y0=0):
+    """Like colorize, for cells with their own background: fg and bg are (rows, cols, 3) uint8 colors of every cell."""
+    h, w = coverage.shape
+    rows, cols = (y0 + np.arange(h)) // cell_h, np.arange(w) // cell_w
+    cov = coverage[..., None].astype(np.uint16)
+    mixed = fg[rows][:, cols] * cov + bg[rows][:, cols] * (255 - cov)
+    return ((mixed + 127) // 255).astype(np.uint8)
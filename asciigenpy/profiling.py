@@ -0,0 +1,115 @@
+"""
+Stage Profiler: lightweight timers around the hot paths of the render loop.
+The last duration of every stage feeds the live status bar readout, and an opt-in recorder collects
+Chrome trace events (chrome://tracing, ui.perfetto.dev) so whole sessions can be inspected afterwards.
+While both are off an instrumented call only pays for one attribute check.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# Set to a file path to record a trace from startup, it is written when the window closes
+TRACE_ENV = "ASCIIGENPY_TRACE"
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Profiler:
+    """
+    Collects stage timings from any thread. `live` keeps the last duration per stage in `last`,
+    `recording` also appends complete ("X") trace events until stop_recording() hands them over.
+    """
+    def __init__(self):
+        self.live = False
+        self.recording = False
+        self.last = {}
+        self._events = []
+        self._threads = {}
+        self._origin = time.perf_counter()
+
+    @property
+    def active(self):
+        return self.live or self.recording
+
+    def start_recording(self):
+        self._events = []
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self.recording = True
+
+    def stop_recording(self):
+        """Stops recording and returns the trace events, thread name metadata included."""
+        self.recording = False
+        events, self._events = self._events, []
+        pid = os.getpid()
+        meta = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()]
+        return meta + events
+
+    def add(self, name, start, end, args=None):
+        """Records a finished stage, start and end being time.perf_counter() values."""
+        self.last[name] = (end - start) * 1000.0
+        if self.recording:
+            thread = threading.current_thread()
+            self._threads.setdefault(thread.ident, thread.name)
+            event = {
+                "name": name, "cat": "asciigenpy", "ph": "X",
+                "ts": round((start - self._origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "pid": os.getpid(), "tid": thread.ident,
+            }
+            if args:
+                event["args"] = args
+            # list.append is atomic under the GIL, render worker threads record concurrently
+            self._events.append(event)
+
+    def span(self, name, **args):
+        """Context manager timing its block as one stage."""
+        if not (self.live or self.recording):
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as one stage."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not (self.live or self.recording):
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.add(name, start, time.perf_counter())
+            return wrapper
+        return decorator
+
+
+def write_chrome_trace(path, events):
+    """Writes events in the Chrome Trace Event JSON format."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# Shared by the GUI and the render worker threads
+profiler = Profiler()
@@ -0,0 +1,134 @@
+"""
+Project Files: .agp projects are zip archives read and written straight from the zip stream.
+Format v2 stores the source file bytes as they are (uncompressed and content hashed) as the first
+entry, followed by the settings, the last rendered grid and a thumbnail of the source so a project
+opens with its output already on screen. Saves always go to a .part file renamed over the project,
+re-saving one whose source did not change copies its stored entry across as is. v1 projects
+(source.png + config.json) still load.
+"""
+import io
+import json
+import os
+import shutil
+import zipfile
+
+FORMAT_VERSION = 2
+
+MANIFEST = "manifest.json"
+CONFIG = "config.json"
+RENDER = "render.txt"
+THUMBNAIL = "thumbnail.png"
+V1_SOURCE = "source.png"
+
+# Longest side of the stored source thumbnail
+THUMBNAIL_SIZE = 512
+# Buffer size when copying a stored source entry between archives
+_COPY_CHUNK = 1024 * 1024
+
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif", "BMP": ".bmp", "TIFF": ".tif"}
+
+
+class Project:
+    """Project: the contents of an .agp file. render and thumbnail (PNG bytes) may be None."""
+    def __init__(self, state, source_data, source_digest=None, render=None, thumbnail=None, version=FORMAT_VERSION):
+        self.state = state
+        self.source_data = source_data
+        self.source_digest = source_digest
+        self.render = render
+        self.thumbnail = thumbnail
+        self.version = version
+
+
+def source_entry_name(image_format):
+    return "source" + _EXTENSIONS.get(image_format, "." + (image_format or "bin").lower())
+
+
+def read_project(path):
+    """Reads a v1 or v2 .agp project into a Project."""
+    with zipfile.ZipFile(path, 'r') as zf:
+        names = set(zf.namelist())
+        if MANIFEST in names:
+            manifest = json.loads(zf.read(MANIFEST))
+            version = manifest.get("version", FORMAT_VERSION)
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Project format v{version} is newer than this version of AsciigenPy supports.")
+            source = manifest["source"]
+            source_name, digest = source["name"], source.get("sha256")
+        else:
+            version, source_name, digest = 1, V1_SOURCE, None
+        if source_name not in names or CONFIG not in names:
+            raise ValueError("Invalid .agp project format.")
+
+        return Project(
+            state=json.loads(zf.read(CONFIG)),
+            source_data=zf.read(source_name),
+            source_digest=digest,
+            render=zf.read(RENDER).decode("utf-8") if RENDER in names else None,
+            thumbnail=zf.read(THUMBNAIL) if THUMBNAIL in names else None,
+            version=version,
+        )
+
+
+def make_thumbnail(img, size=THUMBNAIL_SIZE):
+    """PNG bytes of img shrunk to fit size x size."""
+    thumb = img.copy()
+    thumb.thumbnail((size, size))
+    buf = io.BytesIO()
+    thumb.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _stored_source(path, digest):
+    """Name of the source entry of an existing v2 project at path if it holds `digest`, else None."""
+    try:
+        with zipfile.ZipFile(path, 'r') as zf:
+            manifest = json.loads(zf.read(MANIFEST))
+            if manifest.get("version") != FORMAT_VERSION or manifest["source"].get("sha256") != digest:
+                return None
+            name = manifest["source"]["name"]
+            return name if zf.getinfo(name).compress_type == zipfile.ZIP_STORED else None
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def _write_metadata(zf, source_name, digest, image_format, state, render, thumbnail):
+    manifest = {"version": FORMAT_VERSION, "source": {"name": source_name, "sha256": digest, "format": image_format}}
+    zf.writestr(MANIFEST, json.dumps(manifest), zipfile.ZIP_DEFLATED)
+    zf.writestr(CONFIG, json.dumps(state), zipfile.ZIP_DEFLATED)
+    if render is not None:
+        zf.writestr(RENDER, render.encode("utf-8"), zipfile.ZIP_DEFLATED)
+    if thumbnail is not None:
+        # Already compressed
+        zf.writestr(THUMBNAIL, thumbnail, zipfile.ZIP_STORED)
+
+
+def write_project(path, state, source_data, digest, image_format, render=None, thumbnail=None):
+    """
+    Writes a v2 project. When path already holds this exact source (same sha256), its stored entry
+    is copied across raw instead of writing source_data again. Returns True when the source entry
+    was reused that way.
+    """
+    source_name = source_entry_name(image_format)
+    reuse = _stored_source(path, digest) == source_name
+
+    # Written next to the target and renamed, a failed save never damages the previous project
+    part = path + ".part"
+    try:
+        with zipfile.ZipFile(part, 'w') as zf:
+            if reuse:
+                with zipfile.ZipFile(path, 'r') as old:
+                    stored = old.getinfo(source_name)
+                    info = zipfile.ZipInfo(source_name, date_time=stored.date_time)
+                    info.compress_type = zipfile.ZIP_STORED
+                    # Lets zipfile pick zip64 headers up front for sources over 2 GB
+                    info.file_size = stored.file_size
+                    with old.open(stored) as src, zf.open(info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, _COPY_CHUNK)
+            else:
+                zf.writestr(source_name, source_data, zipfile.ZIP_STORED)
+            _write_metadata(zf, source_name, digest, image_format, state, render, thumbnail)
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+    return reuse
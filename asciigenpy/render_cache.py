@@ -0,0 +1,200 @@
+"""
+Render Cache: content addressed on-disk cache shared by the GUI and `convert`. Entries are keyed by
+the source's content hash plus the render settings, so reopening an image with the same settings
+skips decoding and rendering. Stores character grids (as a compact index grid plus its palette)
+and proxy images, evicting the least recently used entries once the size cap is exceeded.
+Safe to use from several threads and processes at once.
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import uuid
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_MAX_MB = 256
+
+_GRID_EXT = ".grid.npz"
+_IMAGE_EXT = ".image.npy"
+# Eviction frees a bit more than needed so the directory isn't scanned again on every write
+_EVICT_TO = 0.9
+
+
+def default_cache_dir():
+    """render-cache next to the QSettings("asciigenpy", "AsciigenPy") ini file, under the user's config root."""
+    if sys.platform == "win32":
+        root = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        root = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(root, "asciigenpy", "render-cache")
+
+
+def cache_key(*parts):
+    """Stable key for JSON-serializable parts, e.g. (source digest, serialize_state() dict, ...)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _encode_grid(text):
+    """Rectangular text -> (palette codepoints, index grid, trailing newline), or None if ragged."""
+    lines = text.split("\n")
+    trailing = len(lines) > 1 and lines[-1] == ""
+    if trailing:
+        lines.pop()
+    cols = len(lines[0])
+    if any(len(line) != cols for line in lines):
+        return None
+    codes = np.frombuffer("".join(lines).encode("utf-32-le"), dtype="<u4")
+    palette, indices = np.unique(codes, return_inverse=True)
+    dtype = np.uint8 if len(palette) <= 256 else np.uint16
+    return palette, indices.astype(dtype).reshape(len(lines), cols), trailing
+
+
+def _decode_grid(palette, indices, trailing):
+    rows, cols = indices.shape
+    grid = np.empty((rows, cols + 1), dtype="<u4")
+    grid[:, :cols] = palette[indices]
+    grid[:, cols] = ord("\n")
+    text = grid.tobytes().decode("utf-32-le")
+    return text if trailing else text[:-1]
+
+
+class RenderCache:
+    """
+    On-disk LRU cache under root, capped at max_bytes. A hit refreshes the entry's mtime, which is
+    what eviction orders by. Hit/miss counts are kept per entry kind ("grid", "image") for this process.
+    """
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.counts = {"grid": [0, 0], "image": [0, 0]}
+        self._lock = threading.Lock()
+        # Bytes on disk, scanned lazily on the first write
+        self._total = None
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, key[:2], key + ext)
+
+    def _count(self, kind, hit):
+        with self._lock:
+            self.counts[kind][0 if hit else 1] += 1
+
+    def _read(self, kind, key, ext, load):
+        path = self._path(key, ext)
+        try:
+            with open(path, "rb") as f:
+                value = load(f)
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            # Missing, evicted meanwhile by another process, or damaged
+            self._count(kind, False)
+            return None
+        self._count(kind, True)
+        return value
+
+    def _write(self, key, ext, save):
+        path = self._path(key, ext)
+        buf = io.BytesIO()
+        save(buf)
+        data = buf.getvalue()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique temp name, concurrent writers of the same entry simply race to the same content
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._total is not None:
+                self._total += len(data)
+        if self._usage() > self.max_bytes:
+            self.evict()
+
+    def get_grid(self, key):
+        """Cached text for key, or None."""
+        def load(f):
+            with np.load(f) as npz:
+                return _decode_grid(npz["palette"], npz["indices"], bool(npz["trailing"]))
+        return self._read("grid", key, _GRID_EXT, load)
+
+    def put_grid(self, key, text):
+        encoded = _encode_grid(text)
+        if encoded is None:
+            return
+        palette, indices, trailing = encoded
+        self._write(key, _GRID_EXT, lambda f: np.savez_compressed(f, palette=palette, indices=indices, trailing=trailing))
+
+    def get_image(self, key):
+        """Cached PIL image for key, or None."""
+        return self._read("image", key, _IMAGE_EXT, lambda f: Image.fromarray(np.load(f)))
+
+    def put_image(self, key, img):
+        # Raw pixels: loading them back is a plain read, no codec
+        self._write(key, _IMAGE_EXT, lambda f: np.save(f, np.asarray(img)))
+
+    def _entries(self):
+        """(mtime, size, path) of every entry on disk."""
+        entries = []
+        try:
+            subdirs = [d.path for d in os.scandir(self.root) if d.is_dir()]
+        except OSError:
+            return entries
+        for sub in subdirs:
+            try:
+                for e in os.scandir(sub):
+                    if e.name.endswith((_GRID_EXT, _IMAGE_EXT)):
+                        st = e.stat()
+                        entries.append((st.st_mtime, st.st_size, e.path))
+            except OSError:
+                continue
+        return entries
+
+    def _usage(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            return self._total
+
+    def evict(self, max_bytes=None):
+        """Deletes the least recently used entries until the cache fits max_bytes (default: the cap)."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = limit * _EVICT_TO if total > limit else total
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        with self._lock:
+            self._total = total
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        if self._usage() > max_bytes:
+            self.evict()
+
+    def clear(self):
+        self.evict(0)
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            counts = {kind: tuple(c) for kind, c in self.counts.items()}
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": sum(c[0] for c in counts.values()),
+            "misses": sum(c[1] for c in counts.values()),
+            "counts": counts,
+        }
@@ -0,0 +1,101 @@
+"""
+Stage Cache: in-memory LRU of intermediate pipeline results (toned image, resampled grid, luminance,
+text...) shared by every stage under one byte budget. Each stage's output is keyed by everything it
+was computed from, its upstream stage's key included, so an edit only recomputes the stages
+downstream of the parameter that changed. Safe to use from several threads at once.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_MAX_MB = 1024
+
+
+def value_nbytes(value):
+    """Approximate memory held by a stage result (PIL image, NumPy array or text)."""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, str):
+        # Worst case of CPython's compact strings, ASCII output uses a quarter of it
+        return 4 * len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is None:
+        raise TypeError(f"Cannot size a {type(value).__name__} stage result, pass nbytes")
+    return nbytes
+
+
+class StageCache:
+    """
+    LRU cache of (stage, key) -> result capped at max_bytes in total. Results larger than the whole
+    budget are handed back without being kept. Hit/miss counts are kept per stage name.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.counts = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, stage, key):
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            counts = self.counts.setdefault(stage, [0, 0])
+            if entry is None:
+                counts[1] += 1
+                return None
+            counts[0] += 1
+            self._entries.move_to_end((stage, key))
+            return entry[0]
+
+    def put(self, stage, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = value_nbytes(value)
+        with self._lock:
+            old = self._entries.pop((stage, key), None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[(stage, key)] = (value, nbytes)
+            self.nbytes += nbytes
+            self._evict()
+
+    def compute(self, stage, key, fn, nbytes=None):
+        """
+        Cached result of stage for key, or fn() stored under it. Two threads missing the same key
+        both compute it, the later put simply replaces the earlier one. nbytes may be a callable
+        sizing the result.
+        """
+        value = self.get(stage, key)
+        if value is None:
+            value = fn()
+            self.put(stage, key, value, nbytes(value) if callable(nbytes) else nbytes)
+        return value
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "counts": {stage: tuple(c) for stage, c in self.counts.items()},
+            }
@@ -0,0 +1,92 @@
+"""
+Structure Matching: picks every character by the shape of its cell rather than by its average
+brightness alone. Each charset glyph is rasterized in the output font and reduced to a 3x3 grid of
+ink coverage, cells are sampled on the same grid and take the nearest glyph, weighing its shape
+against the tone a ramp would give the cell, a block of cells per matrix product. Glyph features
+are cached per set of characters and font, so reordering or repeating characters of a charset
+reuses them. Qt is only imported to rasterize a new set.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# Coverage regions per glyph, across and down, i.e. the luminance samples the mode takes per cell
+FEATURE_GRID = 3
+# Font of the workspace output, used when a state names none
+DEFAULT_FONT_FAMILY = "Consolas"
+# Glyphs are rasterized this large so thin strokes still register in every region they cross
+_RASTER_POINT_SIZE = 48
+# How far tone outweighs shape: a tone off by d costs _TONE_WEIGHT ** 2 times as much as every
+# region's shape being off by d
+_TONE_WEIGHT = 4
+# Cells matched per matrix product, keeps the (cells, glyphs) distance block at a few MB
+_MATCH_BLOCK = 16384
+
+
+def glyph_features(charset, font_family=DEFAULT_FONT_FAMILY):
+    """
+    (codepoints, features) of the distinct characters of charset: a (n,) uint32 array and (n,
+    FEATURE_GRID ** 2) float32 vectors. A vector is the glyph's coverage per region (row-major,
+    scaled so the most inked region of the set is 1) about its own mean, shifted by _TONE_WEIGHT
+    times its tone: its rank by ink in the set, spread over 0 .. 1 like the steps of a ramp.
+    Both arrays are read-only and shared between calls.
+    """
+    return _glyph_features("".join(sorted(set(charset))), font_family)
+
+
+@lru_cache(maxsize=16)
+def _glyph_features(chars, font_family):
+    from .export import _ensure_qt_app, make_font
+    from .glyphs import GlyphAtlas
+
+    _ensure_qt_app()
+    font = make_font(font_family)
+    font.setPointSize(_RASTER_POINT_SIZE)
+    atlas = GlyphAtlas(font)
+    codes = np.array([ord(c) for c in chars], dtype=np.uint32)
+    slots = atlas.slots(codes)
+    masks = atlas.masks[slots].astype(np.float32)
+
+    # Mean coverage of near-equal bands of pixel rows and columns
+    n, ch, cw = masks.shape
+    rows = np.linspace(0, ch, FEATURE_GRID + 1).astype(int)
+    cols = np.linspace(0, cw, FEATURE_GRID + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(masks, rows[:-1], axis=1), cols[:-1], axis=2)
+    coverage = (sums / np.outer(np.diff(rows), np.diff(cols))).reshape(n, -1)
+    coverage /= max(coverage.max(), 1e-6)
+
+    # Raw coverage would favor sparse glyphs on every smooth cell, the tone keeps the ramp's spread
+    ink = coverage.mean(axis=1)
+    tone = np.zeros(n, dtype=np.float32)
+    tone[np.argsort(ink, kind="stable")] = np.linspace(0, 1, n)
+    features = coverage - ink[:, None] + _TONE_WEIGHT * tone[:, None]
+
+    codes.setflags(write=False)
+    features.setflags(write=False)
+    return codes, features
+
+
+def map_structure(lum, charset, font_family=DEFAULT_FONT_FAMILY):
+    """
+    Matches every FEATURE_GRID x FEATURE_GRID block of a luminance grid to the charset glyph whose
+    features are nearest, light samples asking for ink like the ramp does. Returns a (rows, cols)
+    uint32 codepoint grid.
+    """
+    codes, features = glyph_features(charset, font_family)
+    g = FEATURE_GRID
+    lum = np.asarray(lum, dtype=np.uint8)
+    rows, cols = lum.shape[0] // g, lum.shape[1] // g
+    cells = lum[:rows * g, :cols * g].reshape(rows, g, cols, g).transpose(0, 2, 1, 3).reshape(-1, g * g)
+
+    # |c - f|^2 without the |c|^2 term, which is the same for every glyph
+    weights = features.T * np.float32(-2)
+    norms = (features ** 2).sum(axis=1)
+    best = np.empty(len(cells), dtype=np.intp)
+    for i in range(0, len(cells), _MATCH_BLOCK):
+        block = cells[i:i + _MATCH_BLOCK].astype(np.float32) * np.float32(1 / 255)
+        # Cells get the same split as the glyphs: their shape about the mean, plus the weighted mean as tone
+        block += (_TONE_WEIGHT - 1) * block.mean(axis=1, keepdims=True)
+        dist = block @ weights
+        dist += norms
+        best[i:i + _MATCH_BLOCK] = dist.argmin(axis=1)
+    return codes[best].reshape(rows, cols)
@@ -1,20 +1,20 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
                              QLabel, QComboBox, QSpinBox, 
                              QPushButton, QDialogButtonBox)
-from PyQt6.QtGui import QTextDocument, QFont
+from PyQt6.QtGui import QFont, QFontMetrics
 from PyQt6.QtCore import Qt
 
+from ..export import png_canvas_size, png_peak_bytes, format_bytes
+
 class ExportOptionsDialog(QDialog):
     def __init__(self, parent=None, ascii_text="", base_font=None, default_ext=".png"):
         super().__init__(parent)
         self.setWindowTitle("Export Settings")
         self.setModal(True)
-        self.setFixedSize(350, 180)
+        self.setFixedSize(420, 215)
         
         self.ascii_text = ascii_text
         self.base_font = base_font
-        self.lines = self.ascii_text.split('\n')
-        self.max_chars = max([len(l) for l in self.lines] + [1])
 
         layout = QVBoxLayout(self)
 
@@ -24,9 +24,24 @@ class ExportOptionsDialog(QDialog):
         self.ext_combo = QComboBox()
         self.ext_combo.addItems([".png", ".svg"])
         self.ext_combo.setCurrentText(default_ext)
+        self.ext_combo.currentTextChanged.connect(self._update_resolution_label)
         ext_layout.addWidget(self.ext_combo)
         layout.addLayout(ext_layout)
 
+        # SVG layout, see export.SVG_MODES
+        svg_layout = QHBoxLayout()
+        svg_layout.addWidget(QLabel("SVG Mode:"))
+        self.svg_combo = QComboBox()
+        self.svg_modes = {
+            "Plain Text": "plain",
+            "Compact (space runs as offsets)": "compact",
+            "Outlined Glyphs (no font needed)": "symbols"
+        }
+        self.svg_combo.addItems(list(self.svg_modes.keys()))
+        self.svg_combo.setToolTip("Compact files are smaller and load faster. Outlined glyphs render identically without the font installed.")
+        svg_layout.addWidget(self.svg_combo)
+        layout.addLayout(svg_layout)
+
         # Resolution / Font Size
         size_layout = QHBoxLayout()
         lbl_size = QLabel("Font Size:")
@@ -40,11 +55,19 @@ class ExportOptionsDialog(QDialog):
         size_layout.addWidget(self.size_spin)
         layout.addLayout(size_layout)
         
-        # Real-time resolution display
+        # Real-time resolution and memory display
+        info_layout = QHBoxLayout()
         self.res_label = QLabel("Final Resolution: 0x0")
         self.res_label.setStyleSheet("color: gray;")
         self.res_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.res_label)
+        info_layout.addWidget(self.res_label)
+        
+        self.mem_label = QLabel("")
+        self.mem_label.setStyleSheet("color: gray;")
+        self.mem_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.mem_label.setToolTip("PNGs are rendered and written in horizontal bands, so memory does not grow with the image height.")
+        info_layout.addWidget(self.mem_label)
+        layout.addLayout(info_layout)
         
         # Initial calculation
         self._update_resolution_label()
@@ -60,20 +83,24 @@ class ExportOptionsDialog(QDialog):
         if not self.base_font or not self.ascii_text: return
         font_size = self.size_spin.value()
         
-        from PyQt6.QtGui import QFontMetrics
-        doc = QTextDocument()
         font = QFont(self.base_font)
         font.setPointSize(font_size)
-        doc.setDefaultFont(font)
         
+        # Same cell metrics the PNG exporter uses
         fm = QFontMetrics(font)
-        doc_w = fm.horizontalAdvance("A") * (self.max_chars) + (fm.horizontalAdvance("A"))
-        doc_h = fm.lineSpacing() * (len(self.lines)) + (fm.lineSpacing())
+        cell_w, cell_h = fm.horizontalAdvance("A"), fm.lineSpacing()
+        doc_w, doc_h = png_canvas_size(self.ascii_text, cell_w, cell_h)
         
         self.res_label.setText(f"Final Resolution: {doc_w}x{doc_h}")
+        self.svg_combo.setEnabled(self.ext_combo.currentText() == ".svg")
+        if self.ext_combo.currentText() == ".png":
+            self.mem_label.setText(f"Peak Memory: ~{format_bytes(png_peak_bytes(self.ascii_text, cell_w, cell_h))}")
+        else:
+            self.mem_label.setText("")
 
     def get_options(self):
         return {
             "ext": self.ext_combo.currentText(),
             "font_size": self.size_spin.value(),
+            "svg_mode": self.svg_modes[self.svg_combo.currentText()],
         }
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class ExportCancelled(Exception):
+    """Raised from a job's progress callback once the export was cancelled."""
+
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(int, float)
+    # job id, target path, error message (or None), cancelled
+    done = pyqtSignal(int, str, object, bool)
+
+
+class _ExportTask(QRunnable):
+    # Progress signals are throttled, writers may report thousands of times per second
+    MIN_INTERVAL = 0.05
+
+    def __init__(self, job_id, path, fn, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.path = path
+        self.fn = fn
+        self.signals = signals
+        self.cancel_event = threading.Event()
+        self._last_report = 0.0
+
+    def report(self, fraction):
+        if self.cancel_event.is_set():
+            raise ExportCancelled()
+        now = time.monotonic()
+        if now - self._last_report >= self.MIN_INTERVAL or fraction >= 1.0:
+            self._last_report = now
+            self.signals.progress.emit(self.job_id, fraction)
+
+    def run(self):
+        # Written next to the target and renamed at the end, so a cancelled or failed
+        # export never leaves a truncated file behind (or clobbers an existing one)
+        part = self.path + ".part"
+        error, cancelled = None, False
+        try:
+            self.fn(part, self.report)
+            os.replace(part, self.path)
+        except ExportCancelled:
+            cancelled = True
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        finally:
+            if os.path.exists(part):
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
+        self.signals.done.emit(self.job_id, self.path, error, cancelled)
+
+
+class ExportQueue(QObject):
+    """
+    Background Export Jobs: runs file exports on a thread pool so the window never freezes.
+    Unlike the render lanes nothing is ever dropped, every submitted export runs (several of them
+    concurrently) until it finishes, fails or is cancelled. Jobs must only use the snapshot they
+    were given and report through the progress callback, which is also their cancellation point.
+    """
+    progress = pyqtSignal(float)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._signals = _JobSignals()
+        self._signals.progress.connect(self._on_progress)
+        self._signals.done.connect(self._on_done)
+        self._next_id = 0
+        self._tasks = {}
+        self._fractions = {}
+
+    def submit(self, path, fn):
+        """Queues fn(path, progress) and returns its job id. progress(fraction) raises once cancelled."""
+        self._next_id += 1
+        task = _ExportTask(self._next_id, path, fn, self._signals)
+        task.setAutoDelete(False)
+        self._tasks[task.job_id] = task
+        self._fractions[task.job_id] = 0.0
+        self.pool.start(task)
+        self._emit_progress()
+        return task.job_id
+
+    def cancel_all(self):
+        for task in self._tasks.values():
+            task.cancel_event.set()
+
+    def active_count(self):
+        return len(self._tasks)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _emit_progress(self):
+        if self._fractions:
+            self.progress.emit(sum(self._fractions.values()) / len(self._fractions))
+
+    def _on_progress(self, job_id, fraction):
+        if job_id in self._fractions:
+            self._fractions[job_id] = fraction
+            self._emit_progress()
+
+    def _on_done(self, job_id, path, error, cancelled):
+        self._tasks.pop(job_id, None)
+        self._fractions.pop(job_id, None)
+        if cancelled:
+            self.cancelled.emit(path)
+        elif error:
+            self.failed.emit(path, error)
+        else:
+            self.finished.emit(path)
+        self._emit_progress()
@@ -0,0 +1,267 @@
+import math
+import numpy as np
+from PyQt6.QtWidgets import QAbstractScrollArea, QApplication, QFrame, QMenu
+from PyQt6.QtCore import Qt, QEvent, QPointF, QRect, QRectF
+from PyQt6.QtGui import QColor, QImage, QKeySequence, QPainter, QPalette
+
+from ..glyphs import GlyphAtlas, text_to_codes, coverage_color_table, colorize, colorize_pairs, palette_coverage_luts
+
+
+class GlyphGridView(QAbstractScrollArea):
+    """
+    ASCII Output Canvas: read-only monospace character grid painted from a cached glyph atlas.
+    Only the cells inside the exposed part of the viewport are composed on paint, and a new frame
+    only invalidates the rows that actually changed, so large grids skip the QTextDocument
+    layout pass entirely. Keeps the read-only QTextEdit API the controller relies on
+    (setPlainText / toPlainText / selectAll / copy) along with mouse selection. Cells can be tinted
+    with per cell colors (set_cell_colors), the exposed cells are then colorized on paint.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+
+        self._text = ""
+        self._lines = [""]
+        self._codes = np.zeros((0, 0), dtype=np.uint32)
+        self._slots = np.zeros((0, 0), dtype=np.int32)
+        self._atlas = None
+        self._cell_colors = None
+        self._color_luts = None
+        # Selection ends as (line, column) text positions, column being a gap between characters
+        self._anchor = None
+        self._cursor = None
+        self.set_colors("#ffffff", "#000000")
+
+    # --- QTextEdit compatible API ---
+
+    def setPlainText(self, text):
+        old_slots, old_atlas = self._slots, self._atlas
+        had_selection = self.hasSelection()
+        self._text = text
+        self._lines = text.split("\n")
+        self._codes = text_to_codes(text)
+        atlas = self._ensure_atlas()
+        self._slots = atlas.slots(self._codes)
+        self._anchor = self._cursor = None
+        # Colors belong to the previous text
+        self._cell_colors = self._color_luts = None
+
+        if old_slots.shape != self._slots.shape:
+            self._update_scrollbars()
+            self.viewport().update()
+        elif had_selection or atlas is not old_atlas:
+            self.viewport().update()
+        else:
+            # Same grid size: only rows with a changed cell are repainted
+            changed = np.flatnonzero((old_slots != self._slots).any(axis=1))
+            for start, stop in self._row_runs(changed):
+                self.viewport().update(self._rows_rect(start, stop))
+
+    def toPlainText(self):
+        return self._text
+
+    def selectAll(self):
+        self._anchor = (0, 0)
+        self._cursor = (len(self._lines) - 1, len(self._lines[-1]))
+        self.viewport().update()
+
+    def hasSelection(self):
+        return self._anchor is not None and self._anchor != self._cursor
+
+    def selectedText(self):
+        if not self.hasSelection():
+            return ""
+        (l0, c0), (l1, c1) = sorted((self._anchor, self._cursor))
+        if l0 == l1:
+            return self._lines[l0][c0:c1]
+        parts = [self._lines[l0][c0:]] + self._lines[l0 + 1:l1] + [self._lines[l1][:c1]]
+        return "\n".join(parts)
+
+    def copy(self):
+        if self.hasSelection():
+            QApplication.clipboard().setText(self.selectedText())
+
+    def set_colors(self, bg, fg):
+        """Background and text colors, as anything QColor accepts."""
+        self._bg = QColor(bg)
+        fg = QColor(fg)
+        self._color_table = coverage_color_table(self._bg.getRgb()[:3], fg.getRgb()[:3])
+        if self._cell_colors is not None:
+            self._color_luts = palette_coverage_luts(self._bg.getRgb()[:3], self._cell_colors.palette)
+        self.viewport().update()
+
+    def set_cell_colors(self, colors):
+        """Per cell text colors (CellColors) for the current text, None for the theme color. Reset by setPlainText."""
+        if colors is not None and colors.shape != self._slots.shape:
+            colors = None
+        self._cell_colors = colors
+        self._color_luts = None if colors is None else palette_coverage_luts(self._bg.getRgb()[:3], colors.palette)
+        # Cells with their own background blend between two per cell colors instead
+        self._pair_rgb = None if colors is None or colors.background is None else (colors.rgb(), colors.background_rgb())
+        self.viewport().update()
+
+    def cell_colors(self):
+        return self._cell_colors
+
+    # --- Geometry ---
+
+    def _ensure_atlas(self):
+        """Glyph atlas for the current font and screen scale, rebuilt (with the slot grid) when either changes."""
+        scale = self.devicePixelRatioF()
+        if self._atlas is None or self._atlas.scale != scale or self._atlas.font != self.font():
+            self._atlas = GlyphAtlas(self.font(), scale)
+            self._slots = self._atlas.slots(self._codes)
+            self._update_scrollbars()
+        return self._atlas
+
+    def _cell_size(self):
+        atlas = self._ensure_atlas()
+        return atlas.cell_width / atlas.scale, atlas.cell_height / atlas.scale
+
+    def _update_scrollbars(self):
+        if self._atlas is None:
+            return
+        cw, ch = self._cell_size()
+        rows, cols = self._slots.shape
+        view = self.viewport().size()
+        self.horizontalScrollBar().setRange(0, max(0, math.ceil(cols * cw - view.width())))
+        self.horizontalScrollBar().setPageStep(view.width())
+        self.horizontalScrollBar().setSingleStep(max(1, round(cw)))
+        self.verticalScrollBar().setRange(0, max(0, math.ceil(rows * ch - view.height())))
+        self.verticalScrollBar().setPageStep(view.height())
+        self.verticalScrollBar().setSingleStep(max(1, round(ch)))
+
+    def _rows_rect(self, start, stop):
+        _, ch = self._cell_size()
+        top = start * ch - self.verticalScrollBar().value()
+        return QRect(0, math.floor(top), self.viewport().width(), math.ceil((stop - start) * ch) + 1)
+
+    @staticmethod
+    def _row_runs(rows):
+        """Groups sorted row indices into (start, stop) runs of consecutive rows."""
+        runs = []
+        for r in rows.tolist():
+            if runs and runs[-1][1] == r:
+                runs[-1][1] = r + 1
+            else:
+                runs.append([r, r + 1])
+        return runs
+
+    def _position_at(self, pos):
+        """Text position (line, column gap) closest to a viewport point."""
+        cw, ch = self._cell_size()
+        line = int((pos.y() + self.verticalScrollBar().value()) // ch)
+        line = max(0, min(len(self._lines) - 1, line))
+        col = round((pos.x() + self.horizontalScrollBar().value()) / cw)
+        return line, max(0, min(len(self._lines[line]), col))
+
+    # --- Events ---
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._ensure_atlas()
+            self.viewport().update()
+        super().changeEvent(event)
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().scroll(dx, dy)
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = event.rect()
+        painter.fillRect(rect, self._bg)
+
+        atlas = self._ensure_atlas()
+        rows, cols = self._slots.shape
+        cw, ch = self._cell_size()
+        sx = self.horizontalScrollBar().value()
+        sy = self.verticalScrollBar().value()
+
+        # Virtualized: only the cells under the exposed rect are composed
+        c0 = max(0, int((rect.left() + sx) // cw))
+        c1 = min(cols, math.ceil((rect.right() + 1 + sx) / cw))
+        r0 = max(0, int((rect.top() + sy) // ch))
+        r1 = min(rows, math.ceil((rect.bottom() + 1 + sy) / ch))
+        if c0 < c1 and r0 < r1:
+            coverage = atlas.compose(self._slots[r0:r1, c0:c1])
+            if self._cell_colors is None:
+                img = QImage(coverage.data, coverage.shape[1], coverage.shape[0], coverage.strides[0], QImage.Format.Format_Indexed8)
+                img.setColorTable(self._color_table)
+            else:
+                # Kept alive in a local until drawn, QImage doesn't own the buffer
+                if self._pair_rgb is None:
+                    pixels = colorize(coverage, self._cell_colors.indices[r0:r1, c0:c1], self._color_luts,
+                                      atlas.cell_width, atlas.cell_height)
+                else:
+                    fg, bg = self._pair_rgb
+                    pixels = colorize_pairs(coverage, fg[r0:r1, c0:c1], bg[r0:r1, c0:c1], atlas.cell_width, atlas.cell_height)
+                img = QImage(pixels.data, pixels.shape[1], pixels.shape[0], pixels.strides[0], QImage.Format.Format_RGB888)
+            img.setDevicePixelRatio(atlas.scale)
+            painter.drawImage(QPointF(c0 * cw - sx, r0 * ch - sy), img)
+
+        if self.hasSelection():
+            self._paint_selection(painter, cw, ch, sx, sy)
+        painter.end()
+
+    def _paint_selection(self, painter, cw, ch, sx, sy):
+        highlight = QColor(self.palette().color(QPalette.ColorRole.Highlight))
+        highlight.setAlpha(110)
+        (l0, c0), (l1, c1) = sorted((self._anchor, self._cursor))
+        first = max(l0, int(sy // ch))
+        last = min(l1, int((sy + self.viewport().height()) // ch))
+        for line in range(first, last + 1):
+            start = c0 if line == l0 else 0
+            end = c1 if line == l1 else len(self._lines[line])
+            painter.fillRect(QRectF(start * cw - sx, line * ch - sy, (end - start) * cw, ch), highlight)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._anchor = self._cursor = self._position_at(event.position())
+            self.viewport().update()
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton and self._anchor is not None:
+            self._cursor = self._position_at(event.position())
+            self.viewport().update()
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            event.accept()
+        else:
+            super().mouseReleaseEvent(event)
+
+    def event(self, event):
+        # Claim Copy / Select All before the window's menu shortcuts see them, like QTextEdit does
+        if event.type() == QEvent.Type.ShortcutOverride:
+            if (event.matches(QKeySequence.StandardKey.Copy) and self.hasSelection()) \
+                    or event.matches(QKeySequence.StandardKey.SelectAll):
+                event.accept()
+                return True
+        return super().event(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            self.copy()
+        elif event.matches(QKeySequence.StandardKey.SelectAll):
+            self.selectAll()
+        else:
+            super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        act_copy = menu.addAction("Copy", self.copy)
+        act_copy.setEnabled(self.hasSelection())
+        menu.addAction("Select All", self.selectAll)
+        menu.exec(event.globalPos())
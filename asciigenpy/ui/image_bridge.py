@@ -0,0 +1,105 @@
+"""
+Image Bridge: moves pixels between QImage, PIL and NumPy without going through an image codec.
+Memory is shared wherever the pixel layout allows it, otherwise a single raw copy is made.
+"""
+import sys
+import numpy as np
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+_Format = QImage.Format
+# 32-bit QImage formats store one native-endian 0xAARRGGBB word per pixel
+_XRGB = "BGRX" if sys.byteorder == "little" else "XRGB"
+
+# QImage formats PIL unpacks straight into an RGB image. Alpha is dropped, like convert("RGB") does.
+_RGB_RAWMODES = {
+    _Format.Format_RGB32: _XRGB,
+    _Format.Format_ARGB32: _XRGB,
+    _Format.Format_RGB888: "RGB",
+    _Format.Format_BGR888: "BGR",
+    _Format.Format_RGBX8888: "RGBX",
+    _Format.Format_RGBA8888: "RGBX",
+}
+
+_ARRAY_FORMATS = {1: _Format.Format_Grayscale8, 3: _Format.Format_RGB888, 4: _Format.Format_RGBA8888}
+
+
+class _QImageBuffer:
+    """Exposes QImage pixels through the NumPy array interface. Arrays built on it keep the image alive."""
+    def __init__(self, qimage, shape, strides):
+        # Shallow copy: the pixels are shared, but a later write to the caller's image detaches
+        # that image instead of changing what the view sees
+        self.qimage = QImage(qimage)
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": shape,
+            "strides": strides,
+            "typestr": "|u1",
+            "data": (int(self.qimage.constBits()), True),
+        }
+
+
+def _qimage_bytes(qimage):
+    """Flat uint8 view of all scanlines, padding included."""
+    return np.asarray(_QImageBuffer(qimage, (qimage.sizeInBytes(),), (1,)))
+
+
+def qimage_to_array(qimage):
+    """
+    Read-only (height, width) or (height, width, bytes per pixel) uint8 view of a QImage's pixels,
+    strided by its scanlines. No copy is made. Channel order is the format's byte order, e.g.
+    B, G, R, A for Format_ARGB32 on little-endian machines.
+    """
+    depth = qimage.depth()
+    if depth % 8:
+        raise ValueError(f"Cannot view a {depth}-bit QImage as bytes")
+    bpp = depth // 8
+    h, w, bpl = qimage.height(), qimage.width(), qimage.bytesPerLine()
+    if bpp == 1:
+        shape, strides = (h, w), (bpl, 1)
+    else:
+        shape, strides = (h, w, bpp), (bpl, bpp, 1)
+    return np.asarray(_QImageBuffer(qimage, shape, strides))
+
+
+def array_to_qimage(arr):
+    """
+    Wraps a (height, width) gray or (height, width, 3 | 4) RGB(A) uint8 array as a QImage without
+    copying. The QImage keeps a reference to the array, but copies made on the C++ side (e.g. a
+    QImage sent through a queued signal) do not, convert to a QPixmap or .copy() first.
+    """
+    arr = np.asarray(arr)
+    channels = 1 if arr.ndim == 2 else arr.shape[2]
+    if arr.dtype != np.uint8 or channels not in _ARRAY_FORMATS:
+        raise ValueError(f"Unsupported array for a QImage: {arr.dtype} {arr.shape}")
+    # Scanlines may be padded, but pixels within a scanline must be packed
+    if arr.strides[1] != channels or (arr.ndim == 3 and arr.strides[2] != 1):
+        arr = np.ascontiguousarray(arr)
+    h, w = arr.shape[:2]
+    return QImage(arr, w, h, arr.strides[0], _ARRAY_FORMATS[channels])
+
+
+def qimage_to_pil(qimage):
+    """
+    Converts a QImage to an RGB PIL image with a single raw unpack of its scanlines. Formats PIL
+    cannot unpack directly (premultiplied, indexed, 16-bit...) are converted by Qt first.
+    """
+    fmt = qimage.format()
+    size = (qimage.width(), qimage.height())
+    if fmt == _Format.Format_Grayscale8:
+        return Image.frombytes("L", size, _qimage_bytes(qimage), "raw", "L", qimage.bytesPerLine(), 1).convert("RGB")
+    if fmt not in _RGB_RAWMODES:
+        fmt = _Format.Format_ARGB32 if qimage.hasAlphaChannel() else _Format.Format_RGB32
+        qimage = qimage.convertToFormat(fmt)
+    # frombytes, not frombuffer: the latter maps RGBX rows as is and would hand back an RGBX image
+    return Image.frombytes("RGB", size, _qimage_bytes(qimage), "raw", _RGB_RAWMODES[fmt], qimage.bytesPerLine(), 1)
+
+
+def pil_to_qimage(img):
+    """
+    Converts a PIL image to an RGB888 QImage. PIL's pixel storage cannot be shared, so its rows are
+    copied once into a NumPy array that the QImage then wraps (see array_to_qimage for lifetimes).
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return array_to_qimage(np.asarray(img))
@@ -2,11 +2,16 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QApplication
 from PyQt6.QtCore import Qt, QRectF, QPointF, QSizeF
 from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor, QPainterPath
 
+from ..profiling import profiler
+
 class SourceLabel(QWidget):
     """Core Canvas for AsciigenPy: Handles native top-layer drawing for crop area"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.original_pixmap = QPixmap()
+        # Size of the full resolution source. The pixmap may be a smaller proxy of it, 
+        # but selection_rect is always expressed in source pixels
+        self.source_size = QSizeF()
         self.selection_rect = QRectF()
         self.interaction_state = None
         self.drag_start_pos = QPointF()
@@ -36,6 +41,11 @@ class SourceLabel(QWidget):
             (pos.y() - self._offset.y()) / self._scale_factor
         )
 
+    def image_size(self):
+        if self.source_size.isValid() and not self.source_size.isEmpty():
+            return self.source_size
+        return QSizeF(self.original_pixmap.size())
+
     def get_hit_area(self, pos):
         if self.selection_rect.isNull():
             return 'create'
@@ -75,8 +85,8 @@ class SourceLabel(QWidget):
             return
 
         img_pos = self.map_to_image(pos)
-        img_w = self.original_pixmap.width()
-        img_h = self.original_pixmap.height()
+        img_w = self.image_size().width()
+        img_h = self.image_size().height()
         
         if self.interaction_state == 'create':
             self.selection_rect = QRectF(self.drag_start_pos, img_pos).normalized()
@@ -130,6 +140,7 @@ class SourceLabel(QWidget):
         elif hasattr(app, 'trigger_update'):
             app.trigger_update()
 
+    @profiler.timed("paintEvent")
     def paintEvent(self, event):
         if self.original_pixmap.isNull():
             return
@@ -139,17 +150,17 @@ class SourceLabel(QWidget):
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         
         widget_size = self.size()
-        pixmap_size = self.original_pixmap.size()
+        image_size = self.image_size()
         
-        if pixmap_size.width() == 0 or pixmap_size.height() == 0:
+        if image_size.width() == 0 or image_size.height() == 0:
             return
             
-        scale_x = widget_size.width() / pixmap_size.width()
-        scale_y = widget_size.height() / pixmap_size.height()
+        scale_x = widget_size.width() / image_size.width()
+        scale_y = widget_size.height() / image_size.height()
         self._scale_factor = min(scale_x, scale_y)
         
-        new_w = pixmap_size.width() * self._scale_factor
-        new_h = pixmap_size.height() * self._scale_factor
+        new_w = image_size.width() * self._scale_factor
+        new_h = image_size.height() * self._scale_factor
         
         self._offset = QPointF((widget_size.width() - new_w) / 2, (widget_size.height() - new_h) / 2)
         
@@ -187,17 +198,19 @@ class SourceWindow(QWidget):
         layout.addWidget(self.label)
         layout.setContentsMargins(0, 0, 0, 0)
 
-    def set_image(self, path=None, pixmap=None):
+    def set_image(self, path=None, pixmap=None, source_size=None):
         if path:
             pixmap = QPixmap(path)
         if pixmap:
             self.label.original_pixmap = pixmap
+            self.label.source_size = QSizeF(*source_size) if source_size else QSizeF()
             self.label.selection_rect = QRectF()
             self.label.update()
         
         screen = QApplication.primaryScreen().availableGeometry()
-        w = min(pixmap.width(), screen.width() // 2)
-        h = min(pixmap.height(), screen.height() // 2)
+        image_size = self.label.image_size()
+        w = min(int(image_size.width()), screen.width() // 2)
+        h = min(int(image_size.height()), screen.height() // 2)
         self.resize(w, h)
             
         if hasattr(self.parent_app, 'preview_is_open') and self.parent_app.preview_is_open:
@@ -1,10 +1,14 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QSlider, QLabel, QTextEdit, 
+                             QPushButton, QSlider, QLabel, 
                              QLineEdit, QGroupBox, QComboBox, QCheckBox, QStyle,
                              QMenuBar, QMenu, QSpinBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QAction
 
+from ..engine import CHARSET_PRESETS
+from ..export import theme_colors
+from .glyph_grid import GlyphGridView
+
 class AsciigenUI(QWidget):
     """
     AsciigenUI: Responsible solely for creating, styling, and placing Qt widgets.
@@ -81,15 +85,62 @@ class AsciigenUI(QWidget):
         self.aspect_cb.setChecked(True)
         ascii_layout.addWidget(self.aspect_cb)
         
+        ascii_layout.addWidget(QLabel("Sampling:"))
+        self.sampling_combo = QComboBox()
+        self.sampling_modes = {
+            "Lanczos (Sharp)": "lanczos",
+            "Area Average (Fast Crop)": "area"
+        }
+        self.sampling_combo.addItems(list(self.sampling_modes.keys()))
+        self.sampling_combo.setToolTip("Area Average samples a summed-area table, so crop drags cost the same on any image size.")
+        ascii_layout.addWidget(self.sampling_combo)
+        
+        ascii_layout.addWidget(QLabel("Render Mode:"))
+        self.render_mode_combo = QComboBox()
+        self.render_modes = {
+            "Character Ramp": "ramp",
+            "Braille (2x4 Dots)": "braille",
+            "Half Blocks (▀ fg/bg)": "halfblock",
+            "Structure (Glyph Shapes)": "structure"
+        }
+        self.render_mode_combo.addItems(list(self.render_modes.keys()))
+        self.render_mode_combo.setToolTip("Braille packs a 2x4 grid of dots into every character, 8x the detail of the ramp. "
+                                          "Half Blocks split every character into two square pixels, colored independently in color mode. "
+                                          "Structure picks the charset character whose shape best matches the cell, so edges follow the image.")
+        ascii_layout.addWidget(self.render_mode_combo)
+        
+        ascii_layout.addWidget(QLabel("Color:"))
+        self.color_combo = QComboBox()
+        self.color_modes = {
+            "Monochrome": "none",
+            "Truecolor (24-bit)": "truecolor",
+            "Truecolor (18-bit, compact)": "truecolor-18",
+            "256 Colors": "256",
+            "16 Colors": "16"
+        }
+        self.color_combo.addItems(list(self.color_modes.keys()))
+        self.color_combo.setToolTip("Tints every character with the average color of its cell, for ANSI, HTML, SVG and PNG exports. "
+                                    "Compact truecolor drops the 2 low bits of every channel, so neighbouring cells share more "
+                                    "escape sequences and spans at the cost of some banding.")
+        ascii_layout.addWidget(self.color_combo)
+        
+        ascii_layout.addWidget(QLabel("Dithering:"))
+        self.dither_combo = QComboBox()
+        self.dither_modes = {
+            "None": "none",
+            "Floyd–Steinberg": "floyd-steinberg",
+            "Atkinson": "atkinson",
+            "Bayer 8x8 (Ordered)": "bayer"
+        }
+        self.dither_combo.addItems(list(self.dither_modes.keys()))
+        self.dither_combo.setToolTip("Spreads the rounding error between neighbouring characters so gradients don't band. "
+                                     "Atkinson keeps more contrast, Bayer gives a stable pattern for animations.")
+        ascii_layout.addWidget(self.dither_combo)
+        
         ascii_layout.addWidget(QLabel("Charset Ramp:"))
         self.charset_combo = QComboBox()
-        self.charset_presets = {
-            "Standard (10 chars)": " .:-=+*#%@",
-            "Detailed (70 chars)": " .'`^\",:;Il!i><~+_-?][}{1)(|\\/tfjrxnuvczXYUJCLQ0OZmwqpdbkhao*#MW&8%B@$",
-            "Blocks": " ░▒▓█",
-            "Binary": " 01",
-            "Custom": " .:-=+*#%@"
-        }
+        self.charset_presets = dict(CHARSET_PRESETS)
+        self.charset_presets["Custom"] = CHARSET_PRESETS["Standard (10 chars)"]
         self.charset_combo.addItems(list(self.charset_presets.keys()))
         ascii_layout.addWidget(self.charset_combo)
 
@@ -102,14 +153,13 @@ class AsciigenUI(QWidget):
         sidebar.addStretch()
 
         # 4. ASCII Preview Workspace
-        self.output = QTextEdit()
-        self.output.setReadOnly(True)
+        # Read-only glyph grid, paints changed rows from a glyph atlas instead of relaying out a text document
+        self.output = GlyphGridView()
         # Force a fixed-pitch monospace font that works natively across systems 
         sys_font = QFont("Consolas", 8)
         sys_font.setStyleHint(QFont.StyleHint.Monospace)
         sys_font.setFixedPitch(True)
         self.output.setFont(sys_font)
-        self.output.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
         
         content_layout.addWidget(self.output, 4)
         main_layout.addLayout(content_layout)
@@ -177,9 +227,16 @@ class AsciigenUI(QWidget):
         self.act_exp_txt = QAction("Text Document (.txt)", self.parent_window)
         self.act_exp_png = QAction("Image (.png)", self.parent_window)
         self.act_exp_svg = QAction("Vector (.svg)", self.parent_window)
+        self.act_exp_ans = QAction("ANSI Text (.ans)", self.parent_window)
+        self.act_exp_html = QAction("Web Page (.html)", self.parent_window)
         self.menu_export.addAction(self.act_exp_txt)
         self.menu_export.addAction(self.act_exp_png)
         self.menu_export.addAction(self.act_exp_svg)
+        self.menu_export.addAction(self.act_exp_ans)
+        self.menu_export.addAction(self.act_exp_html)
+        self.menu_export.addSeparator()
+        self.act_exp_all = QAction("All Formats (.txt, .png, .svg)...", self.parent_window)
+        self.menu_export.addAction(self.act_exp_all)
         
         self.menu_file.addSeparator()
         self.act_exit = QAction("Exit", self.parent_window)
@@ -208,10 +265,30 @@ class AsciigenUI(QWidget):
         self.act_invert_processing.setCheckable(True)
         self.act_invert_processing.setChecked(False)
         self.menu_view.addAction(self.act_invert_processing)
+        
+        self.menu_view.addSeparator()
+        
+        self.act_show_timings = QAction("Show Stage Timings", self.parent_window)
+        self.act_show_timings.setCheckable(True)
+        self.act_show_timings.setChecked(False)
+        self.menu_view.addAction(self.act_show_timings)
+        
+        self.act_record_trace = QAction("Record Performance Trace", self.parent_window)
+        self.act_record_trace.setCheckable(True)
+        self.act_record_trace.setChecked(False)
+        self.act_record_trace.setToolTip("Records every stage until unchecked, then saves a Chrome trace (.json).")
+        self.menu_view.addAction(self.act_record_trace)
+        
+        self.menu_cache = self.menu_view.addMenu("Render Cache")
+        self.act_cache_stats = QAction("Show Statistics...", self.parent_window)
+        self.act_cache_limit = QAction("Set Disk Limit...", self.parent_window)
+        self.act_stage_cache_limit = QAction("Set Memory Limit...", self.parent_window)
+        self.act_cache_clear = QAction("Clear", self.parent_window)
+        self.menu_cache.addAction(self.act_cache_stats)
+        self.menu_cache.addAction(self.act_cache_limit)
+        self.menu_cache.addAction(self.act_stage_cache_limit)
+        self.menu_cache.addAction(self.act_cache_clear)
 
     def apply_theme(self, is_inverted):
-        """Changes the output text edit color scheme dynamically."""
-        if is_inverted:
-            self.output.setStyleSheet("background-color: #000; color: #fff; border: none;")
-        else:
-            self.output.setStyleSheet("background-color: #fff; color: #000; border: none;")
+        """Changes the output grid color scheme dynamically."""
+        self.output.set_colors(*theme_colors(is_inverted))
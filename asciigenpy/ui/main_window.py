@@ -1,17 +1,47 @@
-import sys
 import os
 import io
 import pyperclip
-from PyQt6.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QFileDialog, QMessageBox, QLabel, QProgressBar, QPushButton,
+                             QInputDialog)
 from PyQt6.QtCore import Qt, QTimer, QSettings, QRectF
-from PyQt6.QtGui import QPixmap, QImage, QPainter
-from PyQt6.QtSvg import QSvgGenerator
-from PIL import Image, ImageEnhance, ImageOps
-from ascii_magic import AsciiArt
+from PyQt6.QtGui import QPixmap, QFont
+from PIL import Image
 
+from ..engine import (resample, tone_lut, apply_tone, SourceImage,
+                      to_luminance, map_cells, sample_size, text_state, colored_half_blocks, build_integral,
+                      integral_level, sample_integral, ImagePyramid, CHAR_ASPECT, CELL_SAMPLES)
+from ..export import write_txt, write_ansi, write_html, write_svg, write_png, format_bytes
+from ..color import grid_colors
+from ..dither import DIFFUSION_MODES, DRAFT_MODE
+from ..project import read_project, write_project, make_thumbnail
+from ..render_cache import RenderCache, cache_key, DEFAULT_MAX_MB
+from ..stage_cache import StageCache, DEFAULT_MAX_MB as STAGE_CACHE_MAX_MB
+from ..profiling import profiler, write_chrome_trace, TRACE_ENV
 from .inspector import SourceWindow
+from .render_worker import RenderWorker
+from .export_jobs import ExportQueue
+from .image_bridge import pil_to_qimage, qimage_to_pil
 from .layout import AsciigenUI
 
+# Source pixels kept per output cell (per axis) when working against the proxy image
+PROXY_OVERSAMPLE = 2
+# Upper bound for the cached mipmap pyramid of the toned source
+PYRAMID_MAX_BYTES = 512 * 1024 * 1024
+# Area sampling builds its summed-area table (8 bytes per pixel) from the first pyramid level within this
+INTEGRAL_MAX_BYTES = 256 * 1024 * 1024
+# A render following another within this many ms counts as a moving input: error diffusion is drafted
+# with ordered dithering and only runs once the input has been still this long
+SETTLE_MS = 250
+# Stages shown in the status bar readout (profiler stage name, label)
+TIMING_STAGES = (
+    ("render_preview", "Preview"),
+    ("apply_image_modifiers", "Modifiers"),
+    ("render_ascii", "ASCII"),
+    ("setPlainText", "Text"),
+    ("paintEvent", "Paint"),
+)
+
+
 class AsciigenPy(QMainWindow):
     """
     Main Controller: Handles application logic, settings persistence, 
@@ -44,16 +74,74 @@ class AsciigenPy(QMainWindow):
         self.preview_dock.visibilityChanged.connect(self._sync_preview_toggle)
         
         self.is_inverted = False
+        # Lazily decoded SourceImage, the full resolution is only decoded once something needs it
+        self.source_image = None
+        # Reduced working copy of the source used for interactive edits (may be the full decode itself)
+        self.proxy_pil = None
+        # Bumped whenever the source or the proxy is swapped, stage cache keys name the images by them
+        self._source_gen = 0
+        self._proxy_gen = 0
         self.update_timer = QTimer()
         self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.process_ascii)
+        # Runs while renders keep coming, the settled render replaces a drafted one
+        self.settle_timer = QTimer()
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self._on_settled)
+        self._draft_shown = False
+        # The on-disk cache is only read by the first render of each source and proxy, edits go through
+        # the stage cache. Grids are written once the input settles: (cache key, text) of the shown one
+        self._grid_cache_gen = None
+        self._latest_grid_key = None
+        self._unsaved_grid = None
 
         self.preview_timer = QTimer()
         self.preview_timer.setSingleShot(True)
         self.preview_timer.timeout.connect(self.update_image_preview)
         
+        # Grids and proxies of previously seen sources and settings, shared with `convert`
+        self.render_cache = RenderCache(max_bytes=self.settings.value("render_cache_mb", DEFAULT_MAX_MB, type=int) * 1024 * 1024)
+        # Intermediate results of the current source (toned image, pyramid, resampled grid, luminance,
+        # text) keyed by their inputs, so an edit only recomputes the stages after what changed
+        self.stage_cache = StageCache(max_bytes=self.settings.value("stage_cache_mb", STAGE_CACHE_MAX_MB, type=int) * 1024 * 1024)
+
+        # Heavy rendering runs off the GUI thread, only the newest finished result is displayed
+        self.render_worker = RenderWorker(self)
+        self.render_worker.finished.connect(self._on_render_finished)
+        self.render_worker.failed.connect(self._on_render_failed)
+
+        # Exports run in the background from a frozen copy of the output, several at once
+        self.export_queue = ExportQueue(self)
+        self.export_queue.progress.connect(self._on_export_progress)
+        self.export_queue.finished.connect(self._on_export_finished)
+        self.export_queue.failed.connect(self._on_export_failed)
+        self.export_queue.cancelled.connect(self._on_export_cancelled)
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 1000)
+        self.export_progress.setMaximumWidth(160)
+        self.export_progress.setTextVisible(False)
+        self.export_progress.hide()
+        self.export_cancel_btn = QPushButton("Cancel")
+        self.export_cancel_btn.setToolTip("Cancel all running exports")
+        self.export_cancel_btn.clicked.connect(self.export_queue.cancel_all)
+        self.export_cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.export_progress)
+        self.statusBar().addPermanentWidget(self.export_cancel_btn)
+        
         self._is_modified = False
         self.current_project_path = None
+        
+        # Live stage timings, polled from the profiler so worker threads never touch the widget
+        self.timing_label = QLabel()
+        self.timing_label.setStyleSheet("color: gray;")
+        self.timing_label.hide()
+        self.statusBar().addPermanentWidget(self.timing_label)
+        self.timing_timer = QTimer()
+        self.timing_timer.timeout.connect(self._refresh_timings)
+        # Opt-in session trace from startup, written on close
+        self._trace_env_path = os.environ.get(TRACE_ENV)
+        if self._trace_env_path:
+            profiler.start_recording()
 
         self._connect_signals()
         self.ui.apply_theme(self.is_inverted)
@@ -70,12 +158,22 @@ class AsciigenPy(QMainWindow):
         self.ui.act_exp_txt.triggered.connect(self.export_txt)
         self.ui.act_exp_png.triggered.connect(lambda: self.export_image(".png"))
         self.ui.act_exp_svg.triggered.connect(lambda: self.export_image(".svg"))
+        self.ui.act_exp_ans.triggered.connect(lambda: self.export_txt(".ans"))
+        self.ui.act_exp_html.triggered.connect(lambda: self.export_txt(".html"))
+        self.ui.act_exp_all.triggered.connect(self.export_all)
         
         self.ui.act_copy.triggered.connect(self.to_clip)
         self.ui.act_paste.triggered.connect(self.paste_image)
         
         self.ui.act_toggle_preview.triggered.connect(self.toggle_preview)
         self.ui.act_invert_processing.triggered.connect(self.toggle_invert)
+        self.ui.act_show_timings.toggled.connect(self.toggle_timings)
+        self.ui.act_record_trace.toggled.connect(self.toggle_trace_recording)
+        self.ui.act_show_timings.setChecked(self.settings.value("show_timings", False, type=bool))
+        self.ui.act_cache_stats.triggered.connect(self.show_cache_stats)
+        self.ui.act_cache_limit.triggered.connect(self.set_cache_limit)
+        self.ui.act_stage_cache_limit.triggered.connect(self.set_stage_cache_limit)
+        self.ui.act_cache_clear.triggered.connect(self.clear_render_cache)
         
         self._populate_recent_images()
         self._populate_recent_projects()
@@ -97,6 +195,10 @@ class AsciigenPy(QMainWindow):
         self.ui.h_slider.valueChanged.connect(self.trigger_update)
         self.ui.aspect_cb.stateChanged.connect(self.aspect_changed)
         self.ui.aspect_cb.stateChanged.connect(self.trigger_update)
+        self.ui.sampling_combo.currentTextChanged.connect(self.trigger_update)
+        self.ui.render_mode_combo.currentTextChanged.connect(self.on_render_mode_changed)
+        self.ui.color_combo.currentTextChanged.connect(self.trigger_update)
+        self.ui.dither_combo.currentTextChanged.connect(self.trigger_update)
         self.ui.charset_combo.currentTextChanged.connect(self.on_charset_preset_changed)
         self.ui.charset_input.textEdited.connect(self.on_charset_custom_edited)
 
@@ -113,21 +215,91 @@ class AsciigenPy(QMainWindow):
         self.preview_is_open = is_visible
         self.ui.act_toggle_preview.setChecked(is_visible)
 
+    def toggle_timings(self, enabled):
+        profiler.live = enabled
+        self.settings.setValue("show_timings", enabled)
+        self.timing_label.setVisible(enabled)
+        if enabled:
+            profiler.last.clear()
+            self._refresh_timings()
+            self.timing_timer.start(250)
+        else:
+            self.timing_timer.stop()
+
+    def _refresh_timings(self):
+        last = profiler.last
+        parts = [f"{label} {last[name]:.1f} ms" for name, label in TIMING_STAGES if name in last]
+        stats = self.render_cache.counts["grid"]
+        parts.append(f"Cache {stats[0]} hits / {stats[1]} misses")
+        self.timing_label.setText("  |  ".join(parts))
+
+    def show_cache_stats(self):
+        stats = self.render_cache.stats()
+        lines = [f"Location: {self.render_cache.root}",
+                 f"Entries: {stats['entries']} ({format_bytes(stats['bytes'])} of {format_bytes(stats['max_bytes'])})"]
+        for kind, label in (("grid", "ASCII grids"), ("image", "Proxy images")):
+            hits, misses = stats["counts"][kind]
+            lines.append(f"{label}: {hits} hits, {misses} misses this session")
+        stages = self.stage_cache.stats()
+        lines += ["", f"In memory: {stages['entries']} stage results ({format_bytes(stages['bytes'])} of {format_bytes(stages['max_bytes'])})"]
+        for stage, (hits, misses) in sorted(stages["counts"].items()):
+            lines.append(f"{stage.capitalize()}: {hits} hits, {misses} misses")
+        QMessageBox.information(self, "Render Cache", "\n".join(lines))
+
+    def set_cache_limit(self):
+        current = self.render_cache.max_bytes // (1024 * 1024)
+        mb, ok = QInputDialog.getInt(self, "Render Cache", "Size limit (MB):", current, 0, 1024 * 1024)
+        if ok:
+            self.settings.setValue("render_cache_mb", mb)
+            self.render_cache.set_max_bytes(mb * 1024 * 1024)
+
+    def set_stage_cache_limit(self):
+        current = self.stage_cache.max_bytes // (1024 * 1024)
+        mb, ok = QInputDialog.getInt(self, "Render Cache", "Memory limit for intermediate stages (MB):", current, 0, 1024 * 1024)
+        if ok:
+            self.settings.setValue("stage_cache_mb", mb)
+            self.stage_cache.set_max_bytes(mb * 1024 * 1024)
+
+    def clear_render_cache(self):
+        self.render_cache.clear()
+        self.statusBar().showMessage("Render cache cleared", 3000)
+
+    def toggle_trace_recording(self, enabled):
+        if enabled:
+            profiler.start_recording()
+            self.statusBar().showMessage("Recording performance trace...", 3000)
+            return
+        
+        events = profiler.stop_recording()
+        last_dir = self.settings.value("last_dir", "")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Performance Trace", last_dir, "Chrome Trace (*.json)"
+        )
+        if not path:
+            return
+        if not path.endswith('.json'): path += '.json'
+        try:
+            write_chrome_trace(path, events)
+            self.statusBar().showMessage(f"Trace with {len(events)} events saved to {os.path.basename(path)}", 5000)
+        except Exception as e:
+            QMessageBox.critical(self, "Trace Failed", f"Could not save trace:\n{e}")
+
     def aspect_changed(self):
-        if self.ui.aspect_cb.isChecked() and self.img_pil:
+        if self.ui.aspect_cb.isChecked() and self.source_image:
             self.sync_width(self.ui.w_slider.value())
             
     def _get_char_aspect(self):
-        # Monospace terminal chars are roughly 2:1 aspect ratio (twice as tall as they are wide)
-        return 0.5 
+        # Monospace terminal chars are roughly 2:1 aspect ratio (twice as tall as they are wide).
+        # Sliders count characters in every render mode, half-blocks sample two square pixels per character
+        return CHAR_ASPECT
 
     def sync_width(self, val):
-        if not self.ui.aspect_cb.isChecked() or not self.img_pil: return
+        if not self.ui.aspect_cb.isChecked() or not self.source_image: return
         rect = self.source_win.selection_rect
         if not rect.isNull() and rect.width() > 5 and rect.height() > 5:
             img_aspect = rect.height() / rect.width()
         else:
-            img_w, img_h = self.img_pil.size
+            img_w, img_h = self.source_image.size
             img_aspect = img_h / img_w
             
         new_h = int(val * img_aspect * self._get_char_aspect())
@@ -137,12 +309,12 @@ class AsciigenPy(QMainWindow):
         self.ui.h_label.setText(f"Height: {self.ui.h_slider.value()}")
 
     def sync_height(self, val):
-        if not self.ui.aspect_cb.isChecked() or not self.img_pil: return
+        if not self.ui.aspect_cb.isChecked() or not self.source_image: return
         rect = self.source_win.selection_rect
         if not rect.isNull() and rect.width() > 5 and rect.height() > 5:
             img_aspect = rect.width() / rect.height()
         else:
-            img_w, img_h = self.img_pil.size
+            img_w, img_h = self.source_image.size
             img_aspect = img_w / img_h
             
         new_w = int(val * img_aspect / self._get_char_aspect())
@@ -151,6 +323,16 @@ class AsciigenPy(QMainWindow):
         self.ui.w_slider.blockSignals(False)
         self.ui.w_label.setText(f"Width: {self.ui.w_slider.value()}")
 
+    def on_render_mode_changed(self, text):
+        # Braille and half-block cells are dot patterns, the charset ramp doesn't apply to them.
+        # Structure matching picks from the charset by shape, it has no levels to dither to
+        mode = self.ui.render_modes[text]
+        uses_charset = mode in ("ramp", "structure")
+        self.ui.charset_combo.setEnabled(uses_charset)
+        self.ui.charset_input.setEnabled(uses_charset)
+        self.ui.dither_combo.setEnabled(mode != "structure")
+        self.trigger_update()
+
     def on_charset_preset_changed(self, text):
         if text != "Custom":
             self.ui.charset_input.setText(self.ui.charset_presets[text])
@@ -181,32 +363,12 @@ class AsciigenPy(QMainWindow):
         clipboard = QApplication.clipboard()
         mime_data = clipboard.mimeData()
         if mime_data.hasImage():
-            from PyQt6.QtCore import QByteArray, QBuffer, QIODevice
             qimage = clipboard.image()
             if not qimage.isNull():
-                byte_array = QByteArray()
-                buffer = QBuffer(byte_array)
-                buffer.open(QIODevice.OpenModeFlag.WriteOnly)
-                qimage.save(buffer, "PNG")
-                
-                pil_buffer = io.BytesIO(byte_array.data())
-                self.img_pil = Image.open(pil_buffer).convert("RGB")
-                
-                old_crop = None
-                if hasattr(self.ui, 'crop_lock_cb') and self.ui.crop_lock_cb.isChecked():
-                    old_crop = QRectF(self.ui.crop_x.value(), self.ui.crop_y.value(), self.ui.crop_w.value(), self.ui.crop_h.value())
-                
-                self.source_win.set_image(pixmap=QPixmap.fromImage(qimage))
-                self._apply_image_bounds(old_crop)
-                
+                # Raw scanline copy, no PNG round trip
+                self._show_source(SourceImage.from_image(qimage_to_pil(qimage)))
                 self.current_project_path = None
                 self.mark_modified()
-                
-                if not self.ui.act_toggle_preview.isChecked():
-                    self.ui.act_toggle_preview.setChecked(True)
-                    self.toggle_preview()
-                if self.ui.aspect_cb.isChecked():
-                    self.sync_width(self.ui.w_slider.value())
                 self.update_image_preview()
         else:
             self.ui.output.setPlainText("CLIPBOARD ERROR: No valid image found in clipboard.")
@@ -234,6 +396,10 @@ class AsciigenPy(QMainWindow):
             "height": self.ui.h_slider.value(),
             "keep_aspect": self.ui.aspect_cb.isChecked(),
             "charset": self.ui.charset_input.text(),
+            "sampling": self.ui.sampling_modes[self.ui.sampling_combo.currentText()],
+            "render_mode": self.ui.render_modes[self.ui.render_mode_combo.currentText()],
+            "color_mode": self.ui.color_modes[self.ui.color_combo.currentText()],
+            "dither": self.ui.dither_modes[self.ui.dither_combo.currentText()],
             "invert": self.is_inverted
         }
         
@@ -248,6 +414,18 @@ class AsciigenPy(QMainWindow):
         self.ui.h_slider.setValue(state.get("height", 60))
         self.ui.aspect_cb.setChecked(state.get("keep_aspect", True))
         self.ui.charset_input.setText(state.get("charset", self.ui.charset_presets["Standard (10 chars)"]))
+        for label, mode in self.ui.sampling_modes.items():
+            if mode == state.get("sampling", "lanczos"):
+                self.ui.sampling_combo.setCurrentText(label)
+        for label, mode in self.ui.render_modes.items():
+            if mode == state.get("render_mode", "ramp"):
+                self.ui.render_mode_combo.setCurrentText(label)
+        for label, mode in self.ui.color_modes.items():
+            if mode == state.get("color_mode", "none"):
+                self.ui.color_combo.setCurrentText(label)
+        for label, mode in self.ui.dither_modes.items():
+            if mode == state.get("dither", "none"):
+                self.ui.dither_combo.setCurrentText(label)
         
         self.is_inverted = state.get("invert", False)
         if self.is_inverted != self.ui.act_invert_processing.isChecked():
@@ -259,7 +437,7 @@ class AsciigenPy(QMainWindow):
         self.trigger_update()
 
     def save_project(self):
-        if not self.img_pil:
+        if not self.source_image:
             QMessageBox.warning(self, "No Image", "You must load an image before saving a project.")
             return
             
@@ -277,21 +455,12 @@ class AsciigenPy(QMainWindow):
         self.settings.setValue("last_dir", os.path.dirname(path))
         
         try:
-            state = self.serialize_state()
-            
-            # Package into a custom extension ZIP
-            import tempfile, json, zipfile
-            with tempfile.TemporaryDirectory() as tmpdir:
-                img_path = os.path.join(tmpdir, "source.png")
-                self.img_pil.save(img_path, "PNG")
-                
-                conf_path = os.path.join(tmpdir, "config.json")
-                with open(conf_path, "w") as f:
-                    json.dump(state, f)
-                    
-                with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                    zf.write(img_path, "source.png")
-                    zf.write(conf_path, "config.json")
+            data, image_format = self.source_image.encoded()
+            # The grid is only cached when it is up to date with the settings being saved
+            up_to_date = not (self.update_timer.isActive() or self.render_worker.is_busy() or self._draft_shown)
+            write_project(path, self.serialize_state(), data, self.source_image.digest, image_format,
+                          render=self.ui.output.toPlainText() if up_to_date else None,
+                          thumbnail=make_thumbnail(self.proxy_pil))
                     
             self._add_recent_project(path)
             self.current_project_path = path
@@ -312,26 +481,23 @@ class AsciigenPy(QMainWindow):
             self.load_project(path)
             
     def load_project(self, path):
-        import tempfile, json, zipfile
         try:
-            with zipfile.ZipFile(path, 'r') as zf:
-                if 'source.png' not in zf.namelist() or 'config.json' not in zf.namelist():
-                    raise ValueError("Invalid .agp project format.")
-                    
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    zf.extract('source.png', tmpdir)
-                    zf.extract('config.json', tmpdir)
-                    
-                    # 1. Load the raw image back into the application natively
-                    img_path = os.path.join(tmpdir, "source.png")
-                    self.load_image(img_path)
-                    
-                    # 2. Inject the extracted state exactly as it was saved
-                    conf_path = os.path.join(tmpdir, "config.json")
-                    with open(conf_path, "r") as f:
-                        state = json.load(f)
-                        
-                    self.deserialize_state(state)
+            project = read_project(path)
+            source = SourceImage(data=project.source_data, digest=project.source_digest)
+            
+            # The stored thumbnail stands in for the proxy until the real one is decoded on the render worker
+            thumbnail = None
+            if project.thumbnail is not None:
+                thumbnail = Image.open(io.BytesIO(project.thumbnail)).convert("RGB")
+            self._show_source(source, thumbnail)
+            self.deserialize_state(project.state)
+            if thumbnail is not None:
+                self._submit_proxy(self._proxy_scale())
+            if project.render is not None:
+                # Cached grid shows instantly, the real proxy re-renders it once it is ready
+                self.ui.output.setPlainText(project.render)
+                if thumbnail is not None:
+                    self.update_timer.stop()
                     
             self._add_recent_project(path)
             self.current_project_path = path
@@ -346,8 +512,9 @@ class AsciigenPy(QMainWindow):
     def load_dialog(self):
         last_dir = self.settings.value("last_dir", "")
         # Prevent default OS shortcuts firing during file load state
+        # Animations open as a still of their first frame, the animate command converts all of them
         path, _ = QFileDialog.getOpenFileName(
-            self, "Import Asset", last_dir, "Images (*.png *.jpg *.jpeg *.webp)"
+            self, "Import Asset", last_dir, "Still images, first frame of animations (*.png *.jpg *.jpeg *.webp *.gif)"
         )
         if path:
             self.settings.setValue("last_dir", os.path.dirname(path))
@@ -401,8 +568,8 @@ class AsciigenPy(QMainWindow):
             act.triggered.connect(lambda checked, p=path: self.load_project(p))
 
     def _apply_image_bounds(self, override_crop=None):
-        if self.img_pil:
-            w, h = self.img_pil.size
+        if self.source_image:
+            w, h = self.source_image.size
             self.ui.crop_x.setMaximum(w)
             self.ui.crop_y.setMaximum(h)
             self.ui.crop_w.setMaximum(w)
@@ -418,25 +585,68 @@ class AsciigenPy(QMainWindow):
             else:
                 self.on_crop_changed()
 
+    def _set_source_image(self, source, proxy=None):
+        """Swaps the SourceImage and rebuilds everything derived from it. proxy may stand in for the real one."""
+        self.render_worker.cancel()
+        # The last grid of the previous source is kept even if it had not settled yet
+        self._persist_grid()
+        self.source_image = source
+        self._source_gen += 1
+        self._proxy_gen += 1
+        # Nothing of the previous source can be reused, in-flight jobs only add entries under its old generation
+        self.stage_cache.clear()
+        self.proxy_pil = proxy if proxy is not None else self._build_proxy(source, self._proxy_scale())
+
+    def _build_proxy(self, source, scale):
+        """source.proxy(scale) through the render cache, so reopened images skip decoding. Runs on any thread."""
+        # Pasted images have no file bytes to identify them cheaply
+        if source.data is None or scale >= 1:
+            return source.proxy(scale)
+        key = cache_key("proxy", source.digest, scale)
+        proxy = self.render_cache.get_image(key)
+        if proxy is None:
+            proxy = source.proxy(scale)
+            self.render_cache.put_image(key, proxy)
+        return proxy
+
+    def _proxy_scale(self):
+        """Smallest source -> proxy scale that still covers the current output grid and the inspector."""
+        img_w, img_h = self.source_image.size
+        sx, sy = CELL_SAMPLES[self.ui.render_modes[self.ui.render_mode_combo.currentText()]]
+        grid_scale = PROXY_OVERSAMPLE * max(self.ui.w_slider.value() * sx / img_w, self.ui.h_slider.value() * sy / img_h)
+        
+        # The inspector never opens larger than half the screen (see SourceWindow.set_image)
+        screen = QApplication.primaryScreen()
+        geo = screen.availableGeometry()
+        dpr = screen.devicePixelRatio()
+        inspector_scale = min(geo.width() * dpr / 2 / img_w, geo.height() * dpr / 2 / img_h)
+        return max(grid_scale, inspector_scale)
+
+    def _proxy_pixmap(self):
+        return QPixmap.fromImage(pil_to_qimage(self.proxy_pil))
+
     def load_image(self, path):
-        self.img_pil = Image.open(path).convert("RGB")
+        self._show_source(SourceImage.open(path))
+        self.current_project_path = None
+        self.mark_modified()
+        self.update_image_preview()
+
+    def _show_source(self, source, proxy=None):
+        """Makes source the workspace image and points the inspector and crop controls at it."""
+        self._set_source_image(source, proxy)
         
         old_crop = None
         if hasattr(self.ui, 'crop_lock_cb') and self.ui.crop_lock_cb.isChecked():
             old_crop = QRectF(self.ui.crop_x.value(), self.ui.crop_y.value(), self.ui.crop_w.value(), self.ui.crop_h.value())
             
-        self.source_win.set_image(path)
+        self.source_win.set_image(pixmap=self._proxy_pixmap(), source_size=source.size)
         self._apply_image_bounds(old_crop)
         
-        self.current_project_path = None
-        self.mark_modified()
-        
         if not self.ui.act_toggle_preview.isChecked():
             self.ui.act_toggle_preview.setChecked(True)
             self.toggle_preview()
         if self.ui.aspect_cb.isChecked():
             self.sync_width(self.ui.w_slider.value())
-        self.update_image_preview()
 
     def apply_manual_crop(self):
         x = self.ui.crop_x.value()
@@ -466,11 +676,12 @@ class AsciigenPy(QMainWindow):
         self.ui.crop_w.blockSignals(False)
         self.ui.crop_h.blockSignals(False)
         
-        if self.ui.aspect_cb.isChecked() and self.img_pil:
+        if self.ui.aspect_cb.isChecked() and self.source_image:
             self.sync_width(self.ui.w_slider.value())
         self.trigger_update()
 
-    def apply_image_modifiers(self, img):
+    @profiler.timed("apply_image_modifiers")
+    def apply_image_modifiers(self, img, state, for_ascii=False):
         """
         STANDARD IMAGE PIPELINE:
         ========================
@@ -478,44 +689,106 @@ class AsciigenPy(QMainWindow):
         MUST be implemented inside this method. Do NOT put isolated modifiers directly in process_ascii. 
         This guarantees that the UI preview window and the ASCII generation engine 
         are always 100% synchronized in how they process the image.
+        
+        Invert, contrast and brightness are compiled into one 256-entry tone curve and applied 
+        in a single pass. With for_ascii=True the engine's luminosity inversion is folded into 
+        that same curve, so crops of the source can be fed to the engine directly.
+        
+        Runs on the render worker: it must only read the snapshot from _snapshot_render_state.
         """
-        c = self.ui.c_slider.value() / 10.0
-        b = self.ui.b_slider.value() / 10.0
+        c = state["contrast"] / 10.0
+        b = state["brightness"] / 10.0
+        invert = state["invert"]
+
+        # The contrast pivot comes from the whole source image, exactly like ImageEnhance.Contrast,
+        # from the same fixed decode convert uses
+        mean = state["source"].contrast_mean(invert)
         
-        # We process the labels here too so they always stay synced with the state
-        self.ui.c_label.setText(f"Contrast: {c}")
-        self.ui.b_label.setText(f"Brightness: {b}")
+        return apply_tone(img, tone_lut(mean, c, b, invert, for_ascii))
 
-        if self.is_inverted:
-            img = ImageOps.invert(img)
-        img = ImageEnhance.Contrast(img).enhance(c)
-        img = ImageEnhance.Brightness(img).enhance(b)
+    def _snapshot_render_state(self):
+        """Captures everything a render job needs on the GUI thread, so worker jobs never touch widgets."""
+        state = self.serialize_state()
+        
+        rect = self.source_win.selection_rect
+        if not rect.isNull() and rect.width() > 5 and rect.height() > 5:
+            state["crop_box"] = (int(rect.x()), int(rect.y()), int(rect.right()), int(rect.bottom()))
+        else:
+            state["crop_box"] = None
+        # Everything the grid depends on, the proxy included since renders sample it. Colors aren't stored on disk
+        source = self.source_image
+        state["cache_key"] = cache_key("grid", source.digest, text_state(state), self.proxy_pil.size) if source.data is not None else None
+        state["source"] = self.source_image
+        state["proxy"] = self.proxy_pil
+        state["source_gen"] = self._source_gen
+        state["proxy_gen"] = self._proxy_gen
         
-        return img
+        # We process the labels here too so they always stay synced with the state being rendered
+        self.ui.c_label.setText(f"Contrast: {state['contrast'] / 10.0}")
+        self.ui.b_label.setText(f"Brightness: {state['brightness'] / 10.0}")
+        self.ui.w_label.setText(f"Width: {state['width']}")
+        self.ui.h_label.setText(f"Height: {state['height']}")
+        return state
 
+    @profiler.timed("update_image_preview")
     def update_image_preview(self):
-        """Re-generates the inspector preview pixmap through the standard pipeline."""
-        if self.img_pil:
-            try:
-                # Apply the standard pipeline to the base image for the inspector and cache it globally
-                self.processed_img_pil = self.apply_image_modifiers(self.img_pil.copy())
-                
-                # Fast PIL -> QPixmap conversion
-                if self.processed_img_pil.mode != "RGB":
-                    self.processed_img_pil = self.processed_img_pil.convert("RGB")
-                    
-                data = self.processed_img_pil.tobytes("raw", "RGB")
-                qimage = QImage(data, self.processed_img_pil.width, self.processed_img_pil.height, self.processed_img_pil.width * 3, QImage.Format.Format_RGB888)
-                
-                # Update the background texture (does not reset the window size or crop selection)
-                self.source_win.label.original_pixmap = QPixmap.fromImage(qimage)
-                self.source_win.label.update()
-            except Exception as e:
-                self.ui.output.setPlainText(f"PREVIEW ERROR: {e}")
-                
+        """Queues a re-generation of the inspector preview pixmap through the standard pipeline."""
+        self._submit_preview()
         # Continues the cascade to compute the ASCII text rendering
         self.trigger_update()
 
+    def _submit_preview(self):
+        if self.source_image:
+            state = self._snapshot_render_state()
+            self.render_worker.submit("preview", lambda checkpoint: self._render_preview(state, checkpoint))
+
+    @profiler.timed("render_preview")
+    def _render_preview(self, state, checkpoint):
+        """Render worker: applies the standard pipeline to the proxy image for the inspector."""
+        processed, _ = self._toned(("proxy", state["proxy_gen"]), state["proxy"], state)
+        if processed.mode != "RGB":
+            processed = processed.convert("RGB")
+        checkpoint()
+        
+        # QImage is safe to build off the GUI thread (QPixmap is not), it keeps its pixel buffer alive
+        return processed, pil_to_qimage(processed)
+
+    def _rebuild_proxy(self, source, scale, checkpoint):
+        """Render worker: grows the proxy once the output grid outgrows it."""
+        return source, self._build_proxy(source, scale)
+
+    def _on_render_finished(self, kind, result):
+        if kind == "ascii":
+            text, colors, key = result
+            with profiler.span("setPlainText", chars=len(text)):
+                self.ui.output.setPlainText(text)
+                if colors is not None:
+                    self.ui.output.set_cell_colors(colors)
+            self._unsaved_grid = (key, text) if key else None
+            # Intermediate states of an edit never reach the disk
+            if not self.settle_timer.isActive():
+                self._persist_grid()
+        elif kind == "preview":
+            # Cache the processed image globally and update the background texture 
+            # (does not reset the window size or crop selection)
+            self.processed_img_pil, qimage = result
+            self.source_win.label.original_pixmap = QPixmap.fromImage(qimage)
+            self.source_win.label.update()
+        elif kind == "proxy":
+            source, proxy = result
+            if source is self.source_image:
+                self.proxy_pil = proxy
+                self._proxy_gen += 1
+                # A sharper proxy is not an edit, re-render without marking the project modified
+                self._submit_preview()
+                self.process_ascii()
+
+    def _on_render_failed(self, kind, message):
+        if kind in ("preview", "proxy"):
+            self.ui.output.setPlainText(f"PREVIEW ERROR: {message}")
+        else:
+            self.ui.output.setPlainText(f"ASCII ENGINE ERROR: {message}")
+
     def update_title(self):
         title = "AsciigenPy Workspace"
         if hasattr(self, 'current_project_path') and self.current_project_path:
@@ -538,55 +811,160 @@ class AsciigenPy(QMainWindow):
         # Use a short debounce (35ms) to keep image transformations and ASCII rendering feeling real-time and smooth
         self.update_timer.start(35)
 
+    @profiler.timed("process_ascii")
     def process_ascii(self):
-        if not hasattr(self, 'processed_img_pil') or not self.processed_img_pil:
+        if not self.source_image:
             return
-            
-        try:
-            rect = self.source_win.selection_rect
-            if not rect.isNull() and rect.width() > 5 and rect.height() > 5:
-                crop_box = (int(rect.x()), int(rect.y()), int(rect.right()), int(rect.bottom()))
-                working_img = self.processed_img_pil.crop(crop_box)
-            else:
-                working_img = self.processed_img_pil.copy()
+        state = self._snapshot_render_state()
+        # Error diffusion can't keep up with a dragged slider, draft with ordered dithering until it stops
+        self._draft_shown = self.settle_timer.isActive() and state["dither"] in DIFFUSION_MODES
+        if self._draft_shown:
+            state["dither"] = DRAFT_MODE
+            state["cache_key"] = None
+        self._latest_grid_key = state["cache_key"]
+        gen = (self._source_gen, self._proxy_gen)
+        state["read_cache"] = gen != self._grid_cache_gen
+        self._grid_cache_gen = gen
+        self.settle_timer.start(SETTLE_MS)
+        self.render_worker.submit("ascii", lambda checkpoint: self._render_ascii(state, checkpoint))
+        
+        # The grid outgrew the proxy: renders fall back to the source until a larger one is built
+        scale = self._proxy_scale()
+        if self.proxy_pil.size != self.source_image.size and self.proxy_pil.width < self.source_image.width * scale - 1:
+            self._submit_proxy(scale)
 
-            w = self.ui.w_slider.value()
-            h = self.ui.h_slider.value()
-            
-            self.ui.w_label.setText(f"Width: {w}")
-            self.ui.h_label.setText(f"Height: {h}")
-
-            try:
-                # ascii_magic inherently maps Dark (0) -> index 0 (Space) and Light (255) -> index N (@).
-                # To map the user's conceptual "White = Nothing, Dark = Something" pattern directly 
-                # onto the visual state of the Preview Window, we must always invert the luminosity 
-                # simply as an adapter for ascii_magic's scale expectation.
-                working_img = ImageOps.invert(working_img)
-                    
-                charset = self.ui.charset_input.text()
-
-                if hasattr(AsciiArt, 'from_pillow_image'):
-                    resized_img = working_img.resize((w, h), Image.Resampling.LANCZOS)
-                    art_resized = AsciiArt.from_pillow_image(resized_img)
-                else:
-                    resized_img = working_img.resize((w, h), Image.Resampling.LANCZOS)
-                    res_io = io.BytesIO()
-                    resized_img.save(res_io, format='PNG')
-                    res_io.seek(0)
-                    art_resized = AsciiArt.from_image(res_io)
-
-                try:
-                    res = art_resized.to_ascii(columns=w, char=charset, width_ratio=1.0)
-                except TypeError:
-                    res = art_resized.to_ascii(columns=w, chars=charset, width_ratio=1.0)
-                
-                self.ui.output.setPlainText(res)
-            except Exception as inner_e:
-                self.ui.output.setPlainText(f"ASCII ENGINE ERROR: {inner_e}")
+    def _on_settled(self):
+        if self._draft_shown:
+            self.process_ascii()
+        else:
+            self._persist_grid()
 
-            
-        except Exception as e:
-            self.ui.output.setPlainText(f"RUNTIME ERROR: {e}")
+    def _persist_grid(self):
+        """Writes the shown grid to the render cache from the render worker, if it is the latest settled one."""
+        if self._unsaved_grid is None or self._draft_shown:
+            return
+        key, text = self._unsaved_grid
+        if key != self._latest_grid_key:
+            return
+        self._unsaved_grid = None
+        self.render_worker.submit("persist", lambda checkpoint: self.render_cache.put_grid(key, text))
+
+    def _submit_proxy(self, scale):
+        source = self.source_image
+        self.render_worker.submit("proxy", lambda checkpoint: self._rebuild_proxy(source, scale, checkpoint))
+
+    @profiler.timed("render_ascii")
+    def _render_ascii(self, state, checkpoint):
+        """
+        Render worker: the grid for these settings, from the render cache on the first render of a
+        source or proxy, else through the stage cache. Returns (text, CellColors or None in
+        monochrome, the render cache key a fresh grid is to be stored under or None).
+        """
+        key = state["cache_key"]
+        text = self.render_cache.get_grid(key) if key and state["read_cache"] else None
+        fresh = text is None
+        if fresh:
+            text = self._compute_ascii(state, checkpoint)
+        colors = None
+        if state["color_mode"] != "none":
+            checkpoint()
+            colors = self._compute_colors(state)
+        return text, colors, key if fresh else None
+
+    def _proxy_box(self, state):
+        """The crop box (source pixels) mapped onto the proxy."""
+        source, proxy = state["source"], state["proxy"]
+        box = state["crop_box"] or (0, 0, source.width, source.height)
+        sx = proxy.width / source.width
+        sy = proxy.height / source.height
+        return (box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy)
+
+    def _compute_colors(self, state):
+        """
+        Render worker: quantized average color of every cell, through the "colors" stage. Averaged
+        from the proxy toned like the preview, zooming in past it doesn't sharpen colors much.
+        """
+        toned, tone_key = self._toned(("proxy", state["proxy_gen"]), state["proxy"], state)
+        box = self._proxy_box(state)
+        key = (tone_key, box, state["width"], state["height"], state["render_mode"] == "halfblock", state["color_mode"])
+        return self.stage_cache.compute("colors", key, lambda: grid_colors(toned, state, box))
+
+    def _compute_ascii(self, state, checkpoint):
+        """Render worker: crops, tones and maps the proxy (or the source, when zoomed in past it) to text."""
+        source, proxy = state["source"], state["proxy"]
+        # Luminance samples behind the grid, several per character in Braille mode
+        w, h = sample_size(state)
+        box = state["crop_box"] or (0, 0, source.width, source.height)
+        
+        if state["sampling"] == "area":
+            return self._render_ascii_area(state, box, w, h, checkpoint)
+        
+        # The engine maps Dark (0) -> index 0 (Space) and Light (255) -> index N (@).
+        # To map the user's conceptual "White = Nothing, Dark = Something" pattern directly 
+        # onto the visual state of the Preview Window, we must always invert the luminosity 
+        # simply as an adapter for the engine's scale expectation. That inversion is folded 
+        # into the same tone curve the preview uses (apply_image_modifiers with for_ascii=True).
+        #
+        # Crop boxes are in source pixels, map them onto the proxy and check it still has enough detail
+        proxy_box = self._proxy_box(state)
+        if proxy.size != source.size and (proxy_box[2] - proxy_box[0]) >= PROXY_OVERSAMPLE * w \
+                and (proxy_box[3] - proxy_box[1]) >= PROXY_OVERSAMPLE * h:
+            working_img, tone_key = self._toned(("proxy", state["proxy_gen"]), proxy, state, for_ascii=True)
+            checkpoint()
+            return self._map_stages(state, (tone_key, proxy_box, w, h), lambda: resample(working_img, w, h, proxy_box))
+
+        # Zoomed in past the proxy: resample from the smallest pyramid level of the source that still has the detail
+        return self._map_stages(state, (self._pyramid_key(state), state["crop_box"], w, h),
+                                lambda: self._get_pyramid(state, checkpoint).resize((w, h), state["crop_box"]))
+
+    def _toned(self, image_key, img, state, for_ascii=False):
+        """Render worker: apply_image_modifiers through the "tone" stage. Returns the image and its stage key."""
+        key = (image_key, state["contrast"], state["brightness"], state["invert"], for_ascii)
+        return self.stage_cache.compute("tone", key, lambda: self.apply_image_modifiers(img, state, for_ascii)), key
+
+    def _map_stages(self, state, key, resize):
+        """
+        Render worker: the "resample" -> "luminance" -> "text" stages for key (toned image, box, grid size).
+        resize only runs when none of them is cached, changing just the charset only re-maps the luminance.
+        """
+        lum = self.stage_cache.compute("luminance", key, lambda: to_luminance(self.stage_cache.compute("resample", key, resize)))
+        return self.stage_cache.compute("text", key + self._mapping_key(state), lambda: map_cells(lum, state))
+
+    def _mapping_key(self, state):
+        """Everything the "text" stage depends on besides the luminance grid."""
+        return (state["render_mode"], state["charset"], state["dither"], colored_half_blocks(state))
+
+    def _pyramid_key(self, state):
+        return ("source", state["source_gen"], state["contrast"], state["brightness"], state["invert"])
+
+    def _get_pyramid(self, state, checkpoint):
+        """Render worker: mipmap pyramid of the toned source, cached per tone parameters in the "pyramid" stage."""
+        def build():
+            # First zoom past the proxy: this is where a lazily loaded source gets its full decode
+            pyramid = ImagePyramid(self.apply_image_modifiers(state["source"].full(), state, for_ascii=True), PYRAMID_MAX_BYTES)
+            checkpoint()
+            return pyramid
+        # Levels are added lazily, the budget is taken for the whole chain (a third more than the base) up front
+        return self.stage_cache.compute("pyramid", self._pyramid_key(state), build, lambda pyramid: pyramid.nbytes * 4 // 3)
+
+    def _render_ascii_area(self, state, box, w, h, checkpoint):
+        """Render worker: area-averages the crop from a summed-area table of the toned source."""
+        key = self._pyramid_key(state)
+        def build():
+            # Built once per tone change, crop drags only sample it. A full resolution table of a
+            # 150 MP source would outgrow the cache, those come from the first pyramid level that fits
+            pyramid = self._get_pyramid(state, checkpoint)
+            k = integral_level(pyramid.base.size, min(INTEGRAL_MAX_BYTES, self.stage_cache.max_bytes // 4))
+            lum = to_luminance(pyramid.level(k))
+            checkpoint()
+            return build_integral(lum), 2 ** k
+        grid_key = (("area", key), box, w, h)
+        def sample():
+            sat, f = self.stage_cache.compute("integral", key, build, lambda entry: entry[0].nbytes)
+            checkpoint()
+            return sample_integral(sat, tuple(v / f for v in box), w, h)
+        lum = self.stage_cache.compute("luminance", grid_key, sample)
+        return self.stage_cache.compute("text", grid_key + self._mapping_key(state), lambda: map_cells(lum, state))
 
     def to_clip(self):
         try:
@@ -598,34 +976,42 @@ class AsciigenPy(QMainWindow):
                                 "Please ensure you have a clipboard utility installed for your operating system "
                                 "(e.g., 'wl-clipboard' or 'xclip' on Linux).")
 
-    def export_txt(self):
+    def export_txt(self, ext=".txt"):
+        """Text exports: plain .txt, or .ans / .html carrying the cell colors (plain as well in monochrome)."""
+        ascii_text = self.ui.output.toPlainText()
+        colors = self.ui.output.cell_colors()
         last_dir = self.settings.value("last_dir", "")
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Export as Text", last_dir, "Text Document (*.txt)"
-        )
+        title, filter_str = {
+            ".txt": ("Export as Text", "Text Document (*.txt)"),
+            ".ans": ("Export as ANSI Text", "ANSI Text (*.ans)"),
+            ".html": ("Export as Web Page", "Web Page (*.html)"),
+        }[ext]
+        path, _ = QFileDialog.getSaveFileName(self, title, last_dir, filter_str)
         if path:
-            if not path.endswith('.txt'): path += '.txt'
+            if not path.endswith(ext): path += ext
             self.settings.setValue("last_dir", os.path.dirname(path))
-            try:
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(self.ui.output.toPlainText())
-                self.statusBar().showMessage(f"Exported to {os.path.basename(path)}", 5000)
-            except Exception as e:
-                QMessageBox.critical(self, "Export Failed", f"Could not export text:\n{e}")
+            font = QFont(self.ui.output.font())
+            self._queue_export(path, ext, ascii_text, font, font.pointSize(), None, colors)
 
-    def export_image(self, initial_ext):
-        if not self.ui.output.toPlainText().strip():
+    def _export_options(self, ascii_text, initial_ext):
+        """Runs the export options dialog, returns its options or None when cancelled."""
+        if not ascii_text.strip():
             QMessageBox.warning(self, "Empty Workspace", "There is no ASCII art to export!")
-            return
-            
+            return None
         from .export_dialog import ExportOptionsDialog
-        dialog = ExportOptionsDialog(self, ascii_text=self.ui.output.toPlainText(), base_font=self.ui.output.font(), default_ext=initial_ext)
+        dialog = ExportOptionsDialog(self, ascii_text=ascii_text, base_font=self.ui.output.font(), default_ext=initial_ext)
         if not dialog.exec():
+            return None
+        return dialog.get_options()
+
+    def export_image(self, initial_ext):
+        # Snapshot before any dialog, the output keeps updating while it is open
+        ascii_text = self.ui.output.toPlainText()
+        colors = self.ui.output.cell_colors()
+        opts = self._export_options(ascii_text, initial_ext)
+        if opts is None:
             return
-            
-        opts = dialog.get_options()
         ext = opts['ext']
-        font_size = opts['font_size']
         
         last_dir = self.settings.value("last_dir", "")
         filter_str = "PNG Image (*.png)" if ext == ".png" else "SVG Vector (*.svg)"
@@ -634,78 +1020,64 @@ class AsciigenPy(QMainWindow):
         if not path: return
         if not path.endswith(ext): path += ext
         self.settings.setValue("last_dir", os.path.dirname(path))
-        
-        try:
-            # Match colors directly to the UI theme
-            bg_color = Qt.GlobalColor.black if self.is_inverted else Qt.GlobalColor.white
-            text_color = "white" if self.is_inverted else "black"
-                
-            ascii_text = self.ui.output.toPlainText()
-            lines = ascii_text.split('\n')
-            max_chars = max([len(l) for l in lines] + [1])
-            
-            if ext == ".png":
-                # Render via QTextDocument for PNG
-                from PyQt6.QtGui import QTextDocument, QFont, QFontMetrics
-                doc = QTextDocument()
-                font = self.ui.output.font()
-                font.setPointSize(font_size)
-                doc.setDefaultFont(font)
-                
-                # Use setHtml to hard-force the text color through standard CSS
-                doc.setHtml(f"<pre style='color:{text_color}; margin:0;'>{ascii_text}</pre>")
-                
-                fm = QFontMetrics(font)
-                doc_w = fm.horizontalAdvance("A") * (max_chars) + (fm.horizontalAdvance("A"))
-                doc_h = fm.lineSpacing() * (len(lines)) + (fm.lineSpacing())
-                doc.setTextWidth(doc_w)
-                
-                img = QImage(int(doc_w), int(doc_h), QImage.Format.Format_ARGB32)
-                img.fill(bg_color if bg_color != Qt.GlobalColor.transparent else Qt.GlobalColor.transparent)
-                painter = QPainter(img)
-                doc.drawContents(painter)
-                painter.end()
-                img.save(path)
-                
-            elif ext == ".svg":
-                # Build custom SVG XML Manually for true editable text
-                import html
-                
-                # Heuristic mapping for standard monospaced browser rendering
-                c_width = font_size * 0.60
-                c_height = font_size * 1.20 # Approximate line height
-                doc_w = c_width * max_chars
-                doc_h = c_height * len(lines) + c_height
-                
-                bg_hex = "transparent"
-                if bg_color == Qt.GlobalColor.white: bg_hex = "#ffffff"
-                elif bg_color == Qt.GlobalColor.black: bg_hex = "#000000"
-                
-                t_color = "#000000" if text_color == "black" else "#ffffff"
-                
-                svg_lines = []
-                svg_lines.append(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {doc_w} {doc_h}" width="{doc_w}" height="{doc_h}">')
-                if bg_hex != "transparent":
-                    svg_lines.append(f'  <rect width="100%" height="100%" fill="{bg_hex}"/>')
-                
-                svg_lines.append(f'  <text x="0" y="0" font-family="{self.ui.output.font().family()}" font-size="{font_size}px" fill="{t_color}" xml:space="preserve">')
-                
-                for i, line in enumerate(lines):
-                    # SVG Text renders from the baseline, meaning y=0 is cut off. Offset identically by line-height
-                    y_pos = (i + 1) * c_height * 0.85
-                    escaped = html.escape(line)
-                    if not escaped: escaped = " "
-                    svg_lines.append(f'    <tspan x="0" y="{y_pos}">{escaped}</tspan>')
-                    
-                svg_lines.append('  </text>')
-                svg_lines.append('</svg>')
-                
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write("\n".join(svg_lines))
-                
-            self.statusBar().showMessage(f"Exported to {os.path.basename(path)}", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "Export Failed", f"Could not export {ext}:\n{e}")
+        self._queue_export(path, ext, ascii_text, QFont(self.ui.output.font()), opts['font_size'], opts['svg_mode'], colors)
+
+    def export_all(self):
+        """Exports the current frame as .txt, .png and .svg side by side, all from one snapshot."""
+        ascii_text = self.ui.output.toPlainText()
+        colors = self.ui.output.cell_colors()
+        opts = self._export_options(ascii_text, ".png")
+        if opts is None:
+            return
+
+        last_dir = self.settings.value("last_dir", "")
+        path, _ = QFileDialog.getSaveFileName(self, "Export All Formats", last_dir, "Base File Name (*)")
+        if not path: return
+        base = os.path.splitext(path)[0] if path.lower().endswith(('.txt', '.png', '.svg')) else path
+        self.settings.setValue("last_dir", os.path.dirname(base))
+        font = QFont(self.ui.output.font())
+        for ext in (".txt", ".png", ".svg"):
+            self._queue_export(base + ext, ext, ascii_text, font, opts['font_size'], opts['svg_mode'], colors)
+
+    def _queue_export(self, path, ext, ascii_text, font, font_size, svg_mode, colors=None):
+        # Everything the job needs is bound here, it never reads the live widgets
+        is_inverted = self.is_inverted
+        if ext == ".txt":
+            job = lambda target, progress: write_txt(target, ascii_text, progress)
+        elif ext == ".ans":
+            job = lambda target, progress: write_ansi(target, ascii_text, colors, progress)
+        elif ext == ".html":
+            job = lambda target, progress: write_html(target, ascii_text, colors, font.family(), font_size, is_inverted, progress)
+        elif ext == ".png":
+            # Colors match the UI theme (see export.theme_colors)
+            job = lambda target, progress: write_png(target, ascii_text, font, font_size, is_inverted, progress, colors)
+        else:
+            job = lambda target, progress: write_svg(target, ascii_text, font.family(), font_size, is_inverted, svg_mode, progress, colors)
+        self.export_queue.submit(path, job)
+        self.export_progress.show()
+        self.export_cancel_btn.show()
+        self.statusBar().showMessage(f"Exporting {os.path.basename(path)}...", 3000)
+
+    def _on_export_progress(self, fraction):
+        self.export_progress.setValue(round(fraction * 1000))
+
+    def _export_done(self):
+        if self.export_queue.active_count() == 0:
+            self.export_progress.hide()
+            self.export_cancel_btn.hide()
+            self.export_progress.setValue(0)
+
+    def _on_export_finished(self, path):
+        self._export_done()
+        self.statusBar().showMessage(f"Exported to {os.path.basename(path)}", 5000)
+
+    def _on_export_cancelled(self, path):
+        self._export_done()
+        self.statusBar().showMessage(f"Export of {os.path.basename(path)} cancelled", 5000)
+
+    def _on_export_failed(self, path, message):
+        self._export_done()
+        QMessageBox.critical(self, "Export Failed", f"Could not export {os.path.basename(path)}:\n{message}")
 
     def closeEvent(self, event):
         if getattr(self, '_is_modified', False):
@@ -723,7 +1095,23 @@ class AsciigenPy(QMainWindow):
             elif reply == QMessageBox.StandardButton.Cancel:
                 event.ignore()
                 return
+
+        if self.export_queue.active_count():
+            reply = QMessageBox.question(
+                self, 'Exports Running',
+                "Some exports are still running. Cancel them and quit?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+            self.export_queue.cancel_all()
+            self.export_queue.wait()
                 
+        self.render_worker.cancel()
+        if self._trace_env_path and profiler.recording:
+            write_chrome_trace(self._trace_env_path, profiler.stop_recording())
         self.source_win.close()
         QApplication.quit()
         super().closeEvent(event)
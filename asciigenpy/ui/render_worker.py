@@ -0,0 +1,108 @@
+import threading
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class RenderCancelled(Exception):
+    """Raised from a job's checkpoint once its result is no longer wanted."""
+
+
+class _TaskSignals(QObject):
+    # kind, generation, result, error message (or None), cancelled
+    done = pyqtSignal(str, int, object, object, bool)
+
+
+class _RenderTask(QRunnable):
+    def __init__(self, kind, generation, fn, signals):
+        super().__init__()
+        self.kind = kind
+        self.generation = generation
+        self.fn = fn
+        self.signals = signals
+        self.cancel_event = threading.Event()
+
+    def checkpoint(self):
+        if self.cancel_event.is_set():
+            raise RenderCancelled()
+
+    def run(self):
+        result, error, cancelled = None, None, False
+        try:
+            result = self.fn(self.checkpoint)
+        except RenderCancelled:
+            cancelled = True
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        # Always report back so the lane is released, the worker filters what is shown
+        self.signals.done.emit(self.kind, self.generation, result, error, cancelled)
+
+
+class RenderWorker(QObject):
+    """
+    Background Render Queue: runs render jobs on a thread pool, one serial lane per job kind.
+    Every submission gets a generation number. A job still waiting when a newer one of the same kind
+    arrives is dropped without running, cancelled jobs abort at their next checkpoint, and results
+    are only delivered if they are newer than the last one shown, so the GUI thread never blocks
+    and never goes back in time.
+    """
+    finished = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._signals = _TaskSignals()
+        self._signals.done.connect(self._on_task_done)
+        self._generation = 0
+        self._running = {}
+        self._pending = {}
+        self._shown = {}
+
+    def submit(self, kind, fn):
+        """
+        Queues fn(checkpoint) for the given lane and returns its generation.
+        fn runs off the GUI thread: it must only use the state it was given and should call
+        checkpoint() between expensive stages so it can be cancelled mid-flight.
+        """
+        self._generation += 1
+        if kind in self._running:
+            # Replaces (drops) whatever was already waiting behind the running job
+            self._pending[kind] = (self._generation, fn)
+        else:
+            self._start(kind, self._generation, fn)
+        return self._generation
+
+    def cancel(self, kind=None):
+        """Drops pending jobs and asks running ones to stop, for one lane or all of them."""
+        kinds = [kind] if kind else list(set(self._running) | set(self._pending))
+        for k in kinds:
+            self._pending.pop(k, None)
+            task = self._running.get(k)
+            if task:
+                task.cancel_event.set()
+            # Anything older than this point must never reach the screen
+            self._shown[k] = self._generation
+
+    def is_busy(self):
+        return bool(self._running or self._pending)
+
+    def _start(self, kind, generation, fn):
+        task = _RenderTask(kind, generation, fn, self._signals)
+        task.setAutoDelete(False)
+        self._running[kind] = task
+        self.pool.start(task)
+
+    def _on_task_done(self, kind, generation, result, error, cancelled):
+        task = self._running.get(kind)
+        if task and task.generation == generation:
+            del self._running[kind]
+        if kind in self._pending:
+            self._start(kind, *self._pending.pop(kind))
+
+        if cancelled or generation <= self._shown.get(kind, 0):
+            return
+        self._shown[kind] = generation
+        if error:
+            self.failed.emit(kind, error)
+        else:
+            self.finished.emit(kind, result)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from asciigenpy import cli
+from asciigenpy.engine import SourceImage
+
+STATE = {
+    "contrast": 10,
+    "brightness": 10,
+    "width": 40,
+    "height": 20,
+    "keep_aspect": True,
+    "charset": " .:-=+*#%@",
+    "sampling": "lanczos",
+    "render_mode": "ramp",
+    "color_mode": "none",
+    "dither": "none",
+    "invert": False,
+}
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setattr(cli, "_job", {})
+    src = tmp_path / "src.png"
+    rng = np.random.default_rng(0)
+    Image.fromarray(rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)).save(src)
+    out = tmp_path / "out"
+    out.mkdir()
+
+    def init(**overrides):
+        cli._init_worker(dict(STATE, **overrides), ["txt"], str(out), "Consolas", 12, "plain", cache_mb=16)
+    return str(src), out, init
+
+
+def test_monochrome_cache_hit_never_decodes(job, monkeypatch):
+    src, out, init = job
+    init()
+    _, hit = cli.convert_file(src)
+    assert hit is False
+    first = (out / "src.txt").read_text(encoding="utf-8")
+
+    def no_decode(self, scale=1.0):
+        raise AssertionError("cache hit decoded the source")
+    monkeypatch.setattr(SourceImage, "decode", no_decode)
+    _, hit = cli.convert_file(src)
+    assert hit is True
+    assert (out / "src.txt").read_text(encoding="utf-8") == first
+
+
+def test_color_cache_hit_still_decodes_for_colors(job, monkeypatch):
+    src, out, init = job
+    init(color_mode="256")
+    cli.convert_file(src)
+
+    decodes = []
+    original = SourceImage.decode
+    monkeypatch.setattr(SourceImage, "decode", lambda self, scale=1.0: decodes.append(scale) or original(self, scale))
+    _, hit = cli.convert_file(src)
+    assert hit is True
+    assert decodes
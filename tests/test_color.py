@@ -0,0 +1,29 @@
+import numpy as np
+
+from asciigenpy.color import quantize_colors, to_ansi
+
+
+def _gradient():
+    ramp = np.arange(256, dtype=np.uint8)
+    return np.stack([ramp, ramp[::-1], np.full(256, 77, dtype=np.uint8)], axis=1)[None]
+
+
+def test_truecolor_keeps_every_bit():
+    rgb = _gradient()
+    colors = quantize_colors(rgb, "truecolor")
+    assert np.array_equal(colors.rgb(), rgb)
+    assert len(colors.palette) == 256
+
+
+def test_compact_truecolor_drops_two_bits():
+    colors = quantize_colors(_gradient(), "truecolor-18")
+    assert len(colors.palette) == 64
+    assert colors.rgb()[0, -1, 0] == 255
+
+
+def test_truecolor_coalesces_exact_matches_only():
+    rgb = np.array([[[10, 20, 30], [10, 20, 30], [10, 20, 31], [10, 20, 31]]], dtype=np.uint8)
+    ansi = to_ansi("abcd", quantize_colors(rgb, "truecolor"))
+    assert ansi == "\x1b[38;2;10;20;30mab\x1b[38;2;10;20;31mcd\x1b[0m"
+    compact = to_ansi("abcd", quantize_colors(rgb, "truecolor-18"))
+    assert compact.count("\x1b[38;2;") == 1
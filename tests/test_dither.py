@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from asciigenpy.dither import MAX_LEVELS, dither, level_values
+from asciigenpy.engine import charset_lut, map_cells
+
+METHODS = ("floyd-steinberg", "atkinson", "bayer")
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("levels", [2, 10, 70, 200, 255])
+def test_flat_white_reaches_the_last_level(method, levels):
+    out = dither(np.full((24, 40), 255, dtype=np.uint8), method, levels)
+    assert (out == level_values(levels)[-1]).all()
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("levels", [2, 70, 200])
+def test_flat_black_stays_at_the_first_level(method, levels):
+    assert (dither(np.zeros((24, 40), dtype=np.uint8), method, levels) == 0).all()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_flat_white_maps_to_the_last_character(method):
+    charset = " .'`^\",:;Il!i><~+_-?][}{1)(|\\/tfjrxnuvczXYUJCLQ0OZmwqpdbkhao*#MW&8%B@$"
+    state = {"render_mode": "ramp", "charset": charset, "dither": method}
+    text = map_cells(np.full((6, 10), 255, dtype=np.uint8), state)
+    assert set(text) == {charset[-1], "\n"}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_charset_longer_than_max_levels(method):
+    charset = "".join(chr(0x4E00 + i) for i in range(300))
+    lum = np.tile(np.arange(256, dtype=np.uint8), (8, 1))
+    # As many levels as luminance values or more: nothing left to diffuse
+    assert (dither(lum, method, len(charset)) == lum).all()
+    text = map_cells(lum, {"render_mode": "ramp", "charset": charset, "dither": method})
+    expected = map_cells(lum, {"render_mode": "ramp", "charset": charset, "dither": "none"})
+    assert text == expected
+
+
+def test_level_values_map_back_to_their_level():
+    for levels in (2, 10, 70, 200, MAX_LEVELS):
+        charset = "".join(chr(0x4E00 + i) for i in range(levels))
+        lut = charset_lut(charset)
+        assert [ord(charset[k]) for k in range(levels)] == lut[level_values(levels)].tolist()
+    with pytest.raises(ValueError):
+        level_values(MAX_LEVELS + 1)
+
+
+@pytest.mark.parametrize("method", ["floyd-steinberg", "atkinson"])
+def test_error_diffusion_keeps_the_mean_and_is_deterministic(method):
+    ramp = np.tile(np.linspace(0, 255, 300), (120, 1)).astype(np.uint8)
+    out = dither(ramp, method, 2)
+    assert set(np.unique(out).tolist()) <= {0, 255}
+    assert abs(out.mean() - ramp.mean()) < 1.5
+    assert (out == dither(ramp, method, 2)).all()
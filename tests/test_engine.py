@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageEnhance, ImageOps
+
+from asciigenpy.color import quantize_pairs, render_colors, to_ansi
+from asciigenpy.engine import CHARSET_PRESETS, DEFAULT_CHARSET, map_braille, map_half_blocks, render_state
+
+
+def _image(seed, size=(97, 61), mode="RGB"):
+    """Gradient plus noise, so every part of the ramp shows up."""
+    rng = np.random.default_rng(seed)
+    h, w = size[1], size[0]
+    base = np.linspace(0, 255, w)[None, :, None] * np.linspace(0.3, 1, h)[:, None, None]
+    pixels = np.clip(base + rng.integers(-40, 40, (h, w, 3)), 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels).convert(mode)
+
+
+CASES = [
+    (0, "RGB", {"width": 40, "height": 12, "charset": CHARSET_PRESETS["Standard (10 chars)"]}),
+    (1, "RGB", {"width": 80, "height": 30, "charset": CHARSET_PRESETS["Detailed (70 chars)"], "contrast": 17, "brightness": 8}),
+    (2, "L", {"width": 33, "height": 20, "charset": CHARSET_PRESETS["Blocks"], "invert": True}),
+    (3, "RGB", {"width": 50, "height": 15, "charset": "", "contrast": 4, "crop_box": (10, 5, 80, 50)}),
+    (4, "RGB", {"width": 120, "height": 60, "charset": CHARSET_PRESETS["Binary"], "brightness": 25}),
+]
+
+
+def _ascii_magic(img, state):
+    """The pre-engine GUI path: tone with ImageOps/ImageEnhance, crop, invert, LANCZOS, ascii_magic."""
+    from ascii_magic import AsciiArt
+
+    if state.get("invert"):
+        img = ImageOps.invert(img)
+    img = ImageEnhance.Contrast(img).enhance(state.get("contrast", 10) / 10.0)
+    img = ImageEnhance.Brightness(img).enhance(state.get("brightness", 10) / 10.0)
+    if state.get("crop_box"):
+        img = img.crop(state["crop_box"])
+    w, h = state["width"], state["height"]
+    art = AsciiArt.from_pillow_image(ImageOps.invert(img).resize((w, h), Image.Resampling.LANCZOS))
+    return art.to_ascii(columns=w, char=state["charset"], width_ratio=1.0)
+
+
+@pytest.mark.parametrize("seed, mode, state", CASES)
+def test_ramp_matches_ascii_magic(seed, mode, state):
+    pytest.importorskip("ascii_magic")
+    img = _image(seed, mode=mode)
+    assert render_state(img, state) == _ascii_magic(img, state)
+
+
+def test_ramp_golden():
+    # Generated by the pre-engine ascii_magic path
+    state = {"width": 16, "height": 6, "charset": CHARSET_PRESETS["Standard (10 chars)"]}
+    assert render_state(_image(5, (48, 30)), state) == GOLDEN_RAMP
+
+
+def test_empty_charset_falls_back_to_ascii_magic_ramp():
+    grid = Image.fromarray(np.arange(256, dtype=np.uint8)[None, :].repeat(2, axis=0))
+    text = render_state(grid, {"width": 256, "height": 1, "charset": ""})
+    assert set(text.strip("\n")) <= set(DEFAULT_CHARSET)
+    assert text[0] == DEFAULT_CHARSET[-1] and text[255] == DEFAULT_CHARSET[0]
+
+
+@pytest.mark.parametrize("row, col, codepoint", [
+    (0, 0, 0x2801), (1, 0, 0x2802), (2, 0, 0x2804), (0, 1, 0x2808),
+    (1, 1, 0x2810), (2, 1, 0x2820), (3, 0, 0x2840), (3, 1, 0x2880),
+])
+def test_braille_dot_bits(row, col, codepoint):
+    lum = np.zeros((4, 4), dtype=np.uint8)
+    lum[row, col] = 255
+    assert map_braille(lum) == chr(codepoint) + "\u2800\n"
+
+
+def test_braille_golden():
+    state = {"width": 12, "height": 4, "render_mode": "braille"}
+    assert render_state(_image(6, (64, 40)), state) == GOLDEN_BRAILLE
+
+
+def test_half_block_pairs():
+    lum = np.array([[0, 255, 0, 255], [0, 0, 255, 255]], dtype=np.uint8)
+    assert map_half_blocks(lum) == " \u2580\u2584\u2588\n"
+
+
+def test_half_block_golden():
+    state = {"width": 12, "height": 4, "render_mode": "halfblock"}
+    assert render_state(_image(6, (64, 40)), state) == GOLDEN_HALF_BLOCKS
+
+
+def test_colored_half_blocks_coalesce_pairs():
+    red, blue, black = (255, 0, 0), (0, 0, 255), (0, 0, 0)
+    rgb = np.array([[red, red, blue], [black, black, black]], dtype=np.uint8)
+    colors = quantize_pairs(rgb, "truecolor")
+    # Only the foreground changes at the third cell
+    assert to_ansi("\u2580" * 3 + "\n", colors) == \
+        "\x1b[38;2;255;0;0;48;2;0;0;0m\u2580\u2580\x1b[38;2;0;0;255m\u2580\x1b[0m\n"
+
+
+def test_colored_half_blocks_golden():
+    img = _image(7, (16, 12))
+    state = {"width": 4, "height": 2, "render_mode": "halfblock", "color_mode": "16"}
+    text = render_state(img, state)
+    assert text == "\u2580\u2580\u2580\u2580\n" * 2
+    assert to_ansi(text, render_colors(img, state)) == (
+        "\x1b[30;40m\u2580\u2580\x1b[100m\u2580\x1b[90m\u2580\x1b[0m\n"
+        "\x1b[30;40m\u2580\x1b[90;100m\u2580\u2580\x1b[47m\u2580\x1b[0m\n"
+    )
+
+
+GOLDEN_RAMP = (
+    "%%%%#######****+\n"
+    "%%%%#####**+++==\n"
+    "%%%###***+++===-\n"
+    "%%%##**+++===--:\n"
+    "%%%#***++==--::.\n"
+    "%%##**++=--::.. \n"
+)
+
+GOLDEN_BRAILLE = (
+    "\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\n"
+    "\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u287f\u283f\u2800\n"
+    "\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u287f\u2803\u2800\u2800\u2800\n"
+    "\u28ff\u28ff\u28ff\u28ff\u28ff\u28ff\u286f\u2800\u2800\u2800\u2800\u2800\n"
+)
+
+GOLDEN_HALF_BLOCKS = (
+    "\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\n"
+    "\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2580 \n"
+    "\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2588\u2580   \n"
+    "\u2588\u2588\u2588\u2588\u2588\u2588\u2580     \n"
+)
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from asciigenpy import export
+
+ART = "a<&> a\n >a&< \n"
+
+
+def _atlas(size=12):
+    pytest.importorskip("PyQt6.QtGui")
+    from asciigenpy.glyphs import GlyphAtlas
+
+    export._ensure_qt_app()
+    font = export.make_font("Consolas")
+    font.setPointSize(size)
+    return GlyphAtlas(font)
+
+
+def _cells(path, atlas):
+    """(rows, cols, cell_h, cell_w) pixels of the grid in a PNG export."""
+    cw, ch = atlas.cell_width, atlas.cell_height
+    px = np.asarray(Image.open(path))
+    rows, cols = 2, 6
+    grid = px[ch // 2:ch // 2 + rows * ch, cw // 2:cw // 2 + cols * cw]
+    return grid.reshape(rows, ch, cols, cw).transpose(0, 2, 1, 3)
+
+
+def test_png_blits_every_glyph_from_the_atlas(tmp_path):
+    atlas = _atlas()
+    path = str(tmp_path / "art.png")
+    export.write_png(path, ART, "Consolas", 12, False)
+
+    with Image.open(path) as img:
+        assert img.size == export.png_canvas_size(ART, atlas.cell_width, atlas.cell_height)
+    cells = _cells(path, atlas)
+    # Black on white: spaces stay background, markup characters are drawn as they are
+    assert (cells[0, 4] == 255).all() and (cells[1, 0] == 255).all()
+    for col in (0, 1, 2, 3):
+        assert cells[0, col].min() < 128
+    assert np.array_equal(cells[0, 0], cells[0, 5])
+    assert np.array_equal(cells[0, 1], cells[1, 4])
+    assert np.array_equal(cells[0, 2], cells[1, 3])
+
+
+def test_png_cells_are_the_atlas_masks(tmp_path):
+    atlas = _atlas()
+    path = str(tmp_path / "art.png")
+    export.write_png(path, ART, "Consolas", 12, True)
+    # White on black: pixels are the coverage itself
+    cells = _cells(path, atlas)
+    slots = atlas.slots(np.array([ord(c) for c in "a<&>"]))
+    for col, slot in enumerate(slots):
+        assert np.array_equal(cells[0, col], atlas.masks[slot])
+
+
+@pytest.mark.parametrize("colored", [False, True])
+def test_png_bands_mid_cell_match_one_band(tmp_path, monkeypatch, colored):
+    atlas = _atlas()
+    colors = None
+    if colored:
+        from asciigenpy.color import quantize_colors
+        rgb = np.random.default_rng(0).integers(0, 256, (2, 6, 3), dtype=np.uint8)
+        colors = quantize_colors(rgb, "truecolor")
+    whole, banded = str(tmp_path / "whole.png"), str(tmp_path / "banded.png")
+    export.write_png(whole, ART, "Consolas", 12, False, colors=colors)
+    # 3 pixel rows per band, so bands start and end inside cells
+    width = export.png_canvas_size(ART, atlas.cell_width, atlas.cell_height)[0]
+    monkeypatch.setattr(export, "PNG_BAND_BYTES", 3 * width * (8 if colored else 1))
+    fractions = []
+    export.write_png(banded, ART, "Consolas", 12, False, progress=fractions.append, colors=colors)
+    assert len(fractions) > atlas.cell_height and fractions[-1] == 1.0
+    assert np.array_equal(np.asarray(Image.open(whole)), np.asarray(Image.open(banded)))
+
+
+def test_png_peak_memory_is_one_band():
+    # Past one band, only the codepoint/slot grids grow with the height
+    line = "x" * 1000 + "\n"
+    tall, taller = line * 1000, line * 2000
+    assert export.png_peak_bytes(taller, 7, 14) - export.png_peak_bytes(tall, 7, 14) == (len(taller) - len(tall)) * 8
+
+
+def test_png_stream_checks_the_row_count(tmp_path):
+    bands = [np.zeros((3, 5), dtype=np.uint8)] * 2
+    with pytest.raises(ValueError):
+        export.write_png_stream(str(tmp_path / "short.png"), 5, 7, bands)
+    export.write_png_stream(str(tmp_path / "gray.png"), 5, 6, bands)
+    assert Image.open(str(tmp_path / "gray.png")).size == (5, 6)
+
+
+SPACED = "ab" + " " * 40 + "c&d\n\n    <e>\n"
+
+
+def _svg(tmp_path, mode, text=SPACED):
+    import xml.etree.ElementTree as ET
+
+    path = str(tmp_path / f"{mode}.svg")
+    export.write_svg(path, text, "Consolas", 10, False, mode=mode)
+    with open(path, encoding="utf-8") as f:
+        data = f.read()
+    return data, ET.fromstring(data)
+
+
+def test_svg_plain_keeps_every_line(tmp_path):
+    _, root = _svg(tmp_path, "plain")
+    spans = root.findall(".//{http://www.w3.org/2000/svg}tspan")
+    assert [s.text for s in spans] == ["ab" + " " * 40 + "c&d", " ", "    <e>", " "]
+
+
+def test_svg_compact_turns_space_runs_into_offsets(tmp_path):
+    plain, _ = _svg(tmp_path, "plain")
+    compact, root = _svg(tmp_path, "compact")
+    assert len(compact) < len(plain)
+    spans = root.findall(".//{http://www.w3.org/2000/svg}tspan")
+    c_width = 10 * 0.6
+    assert [(s.get("x"), s.get("dx"), s.text) for s in spans] == [
+        ("0", None, "ab"), (None, export._num(40 * c_width), "c&d"), (export._num(4 * c_width), None, "<e>"),
+    ]
+
+
+def test_svg_symbols_outline_each_glyph_once(tmp_path):
+    pytest.importorskip("PyQt6.QtGui")
+    _, root = _svg(tmp_path, "symbols", "abab\nba a\n")
+    ns = "{http://www.w3.org/2000/svg}"
+    assert len(root.findall(f".//{ns}defs/{ns}path")) == 2
+    assert len(root.findall(f".//{ns}use")) == 7
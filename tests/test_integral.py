@@ -0,0 +1,24 @@
+import numpy as np
+from PIL import Image
+
+from asciigenpy.engine import ImagePyramid, build_integral, integral_level, sample_integral
+
+
+def test_integral_level_fits_the_budget():
+    for size, max_bytes in (((14142, 10607), 256 << 20), ((1001, 999), 1 << 20), ((640, 480), 1)):
+        k = integral_level(size, max_bytes)
+        level = ImagePyramid(Image.new("L", size)).level(k)
+        assert build_integral(np.asarray(level)).nbytes <= max_bytes or max(level.size) == 1
+        if k:
+            coarser = ImagePyramid(Image.new("L", size)).level(k - 1)
+            assert build_integral(np.asarray(coarser)).nbytes > max_bytes
+    assert integral_level((6000, 4000), 256 << 20) == 0
+
+
+def test_pyramid_level_table_matches_full_resolution():
+    rng = np.random.default_rng(5)
+    lum = np.repeat(np.repeat(rng.integers(0, 256, (60, 80), dtype=np.uint8), 4, axis=0), 4, axis=1)
+    full = sample_integral(build_integral(lum), (40, 20, 280, 200), 30, 15)
+    level = np.asarray(ImagePyramid(Image.fromarray(lum)).level(2))
+    coarse = sample_integral(build_integral(level), (10, 5, 70, 50), 30, 15)
+    assert np.array_equal(full, coarse)
@@ -0,0 +1,36 @@
+import hashlib
+import os
+import zipfile
+
+from asciigenpy.project import read_project, write_project
+
+SOURCE = os.urandom(4096)
+DIGEST = hashlib.sha256(SOURCE).hexdigest()
+
+
+def test_resave_copies_the_stored_source(tmp_path):
+    path = str(tmp_path / "a.agp")
+    assert not write_project(path, {"width": 80}, SOURCE, DIGEST, "PNG", render="ab")
+    # source_data isn't read when the project already holds this source
+    assert write_project(path, {"width": 120}, None, DIGEST, "PNG", render="cd")
+
+    project = read_project(path)
+    assert project.source_data == SOURCE
+    assert project.source_digest == DIGEST
+    assert project.state == {"width": 120}
+    assert project.render == "cd"
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert zf.infolist()[0].compress_type == zipfile.ZIP_STORED
+    assert os.listdir(tmp_path) == ["a.agp"]
+
+
+def test_failed_save_keeps_the_previous_project(tmp_path):
+    path = str(tmp_path / "a.agp")
+    write_project(path, {"width": 80}, SOURCE, DIGEST, "PNG")
+    try:
+        write_project(path, {"width": object()}, SOURCE, DIGEST, "PNG")
+    except TypeError:
+        pass
+    assert read_project(path).state == {"width": 80}
+    assert os.listdir(tmp_path) == ["a.agp"]
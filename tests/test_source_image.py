@@ -0,0 +1,35 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from asciigenpy.engine import SourceImage, contrast_mean
+
+
+def _jpeg(size=(640, 480)):
+    rng = np.random.default_rng(3)
+    y = np.linspace(0, 1, size[1])[:, None, None]
+    pixels = (y * 200 + rng.integers(0, 55, (size[1], size[0], 3))).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def test_contrast_mean_ignores_earlier_decodes():
+    data = _jpeg()
+    means = []
+    for scale in (None, 0.125, 0.5, 1.0):
+        source = SourceImage(data=data)
+        if scale is not None:
+            source.decode(scale)
+        means.append((source.contrast_mean(False), source.contrast_mean(True)))
+    assert len(set(means)) == 1
+
+
+def test_contrast_mean_uses_the_full_image_for_other_formats():
+    img = Image.fromarray(np.random.default_rng(4).integers(0, 256, (50, 70, 3), dtype=np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    source = SourceImage(data=buf.getvalue())
+    assert source.contrast_mean(True) == contrast_mean(img, True)
+    assert SourceImage.from_image(img).contrast_mean(False) == contrast_mean(img, False)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from asciigenpy.stage_cache import StageCache, value_nbytes
+
+
+def _array(kb):
+    return np.zeros(kb * 1024, dtype=np.uint8)
+
+
+def test_compute_only_runs_on_a_miss():
+    cache = StageCache(max_bytes=1 << 20)
+    calls = []
+    for _ in range(3):
+        assert cache.compute("text", ("a", 1), lambda: calls.append(1) or "ab") == "ab"
+    assert calls == [1]
+    assert cache.stats()["counts"]["text"] == (2, 1)
+
+
+def test_least_recently_used_entries_go_first():
+    cache = StageCache(max_bytes=300 * 1024)
+    for key in "abc":
+        cache.put("luminance", key, _array(100))
+    cache.get("luminance", "a")
+    cache.put("luminance", "d", _array(100))
+    assert cache.get("luminance", "b") is None
+    assert all(cache.get("luminance", key) is not None for key in "acd")
+    assert cache.nbytes == 300 * 1024
+
+
+def test_results_over_the_budget_are_not_kept():
+    cache = StageCache(max_bytes=100 * 1024)
+    cache.put("pyramid", "small", _array(50))
+    big = cache.compute("pyramid", "big", lambda: _array(200))
+    assert big.nbytes == 200 * 1024
+    assert cache.get("pyramid", "big") is None
+    assert cache.get("pyramid", "small") is not None
+
+
+def test_shrinking_the_budget_evicts():
+    cache = StageCache(max_bytes=1 << 20)
+    for key in range(4):
+        cache.put("resample", key, _array(100))
+    cache.set_max_bytes(250 * 1024)
+    assert cache.stats()["entries"] == 2
+    assert cache.get("resample", 3) is not None
+
+
+def test_nbytes_can_be_given_for_other_results():
+    cache = StageCache(max_bytes=1 << 20)
+    cache.compute("integral", "k", lambda: (_array(10), 2), lambda entry: entry[0].nbytes)
+    assert cache.nbytes == 10 * 1024
+    with pytest.raises(TypeError):
+        value_nbytes((1, 2))
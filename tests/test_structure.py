@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from asciigenpy.engine import CHARSET_PRESETS, render_state
+from asciigenpy.structure import glyph_features, map_structure
+
+# Glyphs are rasterized with Qt
+pytest.importorskip("PyQt6.QtGui")
+
+DETAILED = CHARSET_PRESETS["Detailed (70 chars)"]
+
+
+def _cell(*rows):
+    return np.array(rows, dtype=np.uint8) * 255
+
+
+def test_vertical_stroke_picks_the_bar():
+    assert map_structure(_cell([0, 1, 0], [0, 1, 0], [0, 1, 0]), DETAILED)[0, 0] == ord("|")
+
+
+def test_strokes_of_the_same_tone_pick_different_glyphs():
+    strokes = [_cell([0, 1, 0], [0, 1, 0], [0, 1, 0]), _cell([0, 0, 0], [1, 1, 1], [0, 0, 0]),
+               _cell([1, 0, 0], [0, 1, 0], [0, 0, 1])]
+    assert len(set(map_structure(np.hstack(strokes), DETAILED)[0].tolist())) == 3
+
+
+def test_flat_cells_follow_the_ramp():
+    codes, features = glyph_features(DETAILED)
+    rank = {int(c): float(f.mean()) for c, f in zip(codes, features)}
+    flat = np.hstack([np.full((3, 3), v, dtype=np.uint8) for v in range(0, 256, 15)])
+    tones = [rank[int(c)] for c in map_structure(flat, DETAILED)[0]]
+    assert tones == sorted(tones)
+    assert chr(map_structure(flat[:, :3], DETAILED)[0, 0]) == " "
+
+
+def test_features_are_shared_between_charset_orders():
+    assert glyph_features(DETAILED)[1] is glyph_features(DETAILED[::-1] + DETAILED[:5])[1]
+
+
+def test_render_state_grid():
+    img = np.zeros((60, 90), dtype=np.uint8)
+    img[:, 40:45] = 255
+    text = render_state(Image.fromarray(img), {"width": 9, "height": 4, "render_mode": "structure", "charset": DETAILED})
+    lines = text.split("\n")[:-1]
+    assert len(lines) == 4 and all(len(line) == 9 for line in lines)
+    # The ascii inversion makes the white stroke the only light column, everything else is dense ink
+    assert len({line[4] for line in lines}) == 1 and lines[0][4] != lines[0][0]